@@ -0,0 +1,103 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import asyncio
+from logging import getLogger
+from time import monotonic
+from typing import Awaitable, Callable
+
+__all__ = "AutoZapis",
+logger = getLogger(__name__)
+
+DOMYSLNA_ZWLOKA = 60  # W sekundach, zapis następuje po takim czasie bez kolejnych zmian w spisie
+DOMYSLNY_LIMIT = 600  # W sekundach, maksymalny czas od pierwszej niezapisanej zmiany do zapisu
+
+
+class AutoZapis:
+    """Zapisuje w tle zmienione spisy przy pomocy jednego wspólnego taska.
+    Seria zmian w krótkim czasie jest łączona w jeden zapis, wykonywany po upływie zwłoki od ostatniej zmiany,
+    lecz nie później niż po upływie limitu od pierwszej niezapisanej zmiany. Każdy spis zapisywany jest osobno."""
+
+    def __init__(self, zapisz_spis: Callable[[int | None], Awaitable[bool | None]],
+                 zwloka: float = DOMYSLNA_ZWLOKA, limit: float = DOMYSLNY_LIMIT):
+        self._zapisz_spis = zapisz_spis  # Zwraca None w przypadku niepowodzenia zapisu
+        self.zwloka = zwloka
+        self.limit = limit
+        # Spis -> (czas pierwszej, czas ostatniej niezapisanej zmiany) według monotonic()
+        self._zmiany: dict[int | None, tuple[float, float]] = {}
+        self._obudz = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.czas_ostatniego_zapisu: float | None = None  # W sekundach, None - jeszcze nie zapisywano
+        self.zapisy = 0  # Ilość automatycznych zapisów od uruchomienia
+
+    def zglos_zmiane(self, serwer: int | None):
+        """Informuje o zmianie w danym spisie, przesuwając jego zapis o czas zwłoki (nie dalej niż do limitu)"""
+        teraz = monotonic()
+        pierwsza = self._zmiany[serwer][0] if serwer in self._zmiany else teraz
+        self._zmiany[serwer] = pierwsza, teraz
+        if pierwsza == teraz:  # Nowy termin zapisu może być wcześniejszy od aktualnie oczekiwanego
+            self._obudz.set()
+
+    def _termin(self, serwer: int | None) -> float:
+        """Zwraca czas (według monotonic()), w którym należy zapisać dany spis"""
+        pierwsza, ostatnia = self._zmiany[serwer]
+        return min(ostatnia + self.zwloka, pierwsza + self.limit)
+
+    def uruchom(self):
+        """Startuje task zapisujący spisy, wymaga działającej pętli zdarzeń"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._petla(), name="AutoZapis")
+
+    def zatrzymaj(self):
+        """Zatrzymuje task zapisujący spisy, niezapisane zmiany pozostają w dziennikach spisów"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _petla(self):
+        """Czeka na najbliższy termin zapisu i zapisuje spisy, których termin upłynął"""
+        while True:
+            self._obudz.clear()
+            teraz = monotonic()
+            for serwer in [s for s in self._zmiany if self._termin(s) <= teraz]:
+                del self._zmiany[serwer]  # Zmiany dokonane w trakcie zapisu zostaną zgłoszone ponownie
+                start = monotonic()
+                try:
+                    wynik = await self._zapisz_spis(serwer)
+                except Exception as e:  # Task nie może przestać działać z powodu jednego błędu
+                    logger.exception(f"Nie udało się automatycznie zapisać spisu {serwer}!", exc_info=e)
+                    wynik = None
+                if wynik is None:  # Ponowna próba po upływie zwłoki (nie od razu, np. przy braku połączenia)
+                    teraz = monotonic()
+                    self._zmiany.setdefault(serwer, (teraz, teraz))
+                elif wynik:
+                    self.czas_ostatniego_zapisu = monotonic() - start
+                    self.zapisy += 1
+                    logger.debug(f"Automatycznie zapisano spis {serwer} w {self.czas_ostatniego_zapisu:.3f} s")
+
+            czas = None  # Brak zmian - oczekiwanie do następnego zgłoszenia
+            if self._zmiany:
+                czas = max(min(map(self._termin, self._zmiany)) - monotonic(), 0)
+            try:
+                await asyncio.wait_for(self._obudz.wait(), czas)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,260 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from .dziennik import *
+from .format_zapisu import zapisz_styl, wczytaj_styl
+from .przedmiot import Przedmioty
+from .zadanie import Ogloszenie, ZadanieDomowe
+
+__all__ = "BazaSQLite", "ZmianySpisu"
+logger = getLogger(__name__)
+
+WERSJA_SCHEMATU = 1  # Zapisywana w PRAGMA user_version
+GLOWNY_SPIS = 0  # Wartość kolumny serwer dla głównego spisu (ID serwerów Discorda nigdy nie są zerem)
+SCHEMAT = """
+CREATE TABLE IF NOT EXISTS stany (
+    serwer INTEGER PRIMARY KEY,
+    ostatni_zapis REAL NOT NULL,
+    uzycia_spis INTEGER NOT NULL,
+    nastepne_id INTEGER NOT NULL,
+    edytor INTEGER,
+    serwery_ze_spisem TEXT NOT NULL  -- Lista JSON
+);
+CREATE TABLE IF NOT EXISTS zadania (
+    serwer INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    przedmiot TEXT,  -- Nazwa członka enumeracji Przedmioty, NULL dla ogłoszeń
+    termin_usuniecia INTEGER NOT NULL,  -- Znaczniki czasu w sekundach
+    prawdziwy_termin INTEGER,
+    utworzono INTEGER NOT NULL,
+    autor INTEGER NOT NULL,
+    tresc TEXT NOT NULL,
+    PRIMARY KEY (serwer, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS zadania_termin ON zadania (termin_usuniecia);
+CREATE INDEX IF NOT EXISTS zadania_serwer ON zadania (serwer, termin_usuniecia);
+CREATE INDEX IF NOT EXISTS zadania_przedmiot ON zadania (serwer, przedmiot, termin_usuniecia);
+CREATE INDEX IF NOT EXISTS zadania_autor ON zadania (serwer, autor, termin_usuniecia);
+CREATE TABLE IF NOT EXISTS style (
+    serwer INTEGER NOT NULL,
+    uzytkownik INTEGER NOT NULL,
+    styl TEXT NOT NULL,  -- Obiekt JSON w formacie zapisz_styl
+    PRIMARY KEY (serwer, uzytkownik)
+) WITHOUT ROWID;
+"""
+KOLUMNY_ZADAN = "id, przedmiot, termin_usuniecia, prawdziwy_termin, utworzono, autor, tresc"
+WSTAW_ZADANIE = f"INSERT OR REPLACE INTO zadania (serwer, {KOLUMNY_ZADAN}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+WSTAW_STYL = "INSERT OR REPLACE INTO style (serwer, uzytkownik, styl) VALUES (?, ?, ?)"
+USUN_ZADANIE = "DELETE FROM zadania WHERE serwer = ? AND id = ?"
+
+
+class ZmianySpisu(NamedTuple):
+    """Zmiany jednego spisu, zapisywane w jednej transakcji razem ze zmianami pozostałych spisów"""
+
+    serwer: int | None
+    pola: dict  # Zapisywane pola stanu (jak w StanBota.__getstate__), lista_zadan i style tylko przy pełnym zapisie
+    wpisy: list[tuple] | None  # Wpisy dziennika od poprzedniego zapisu, None - pola zastępują całą zawartość spisu
+
+
+def _klucz(serwer: int | None) -> int:
+    """Zamienia ID serwera na wartość kolumny serwer"""
+    return GLOWNY_SPIS if serwer is None else serwer
+
+
+def _wiersz(serwer: int, zadanie: Ogloszenie) -> tuple:
+    """Zwraca wiersz tabeli zadania dla zadania lub ogłoszenia"""
+    if isinstance(zadanie, ZadanieDomowe):
+        return (serwer, zadanie.id, zadanie.przedmiot.name, zadanie.termin_usuniecia_ts, zadanie.prawdziwy_termin_ts,
+                zadanie.utworzono_ts, zadanie.autor, zadanie.tresc)
+    return serwer, zadanie.id, None, zadanie.termin_usuniecia_ts, None, zadanie.utworzono_ts, zadanie.autor, \
+        zadanie.tresc
+
+
+def _zadanie(id_zadania: str, przedmiot: str | None, termin_usuniecia: int, prawdziwy_termin: int | None,
+             utworzono: int, autor: int, tresc: str) -> Ogloszenie:
+    """Odtwarza zadanie lub ogłoszenie z wiersza tabeli zadania (bez kolumny serwer)"""
+    if przedmiot is None:
+        zadanie = Ogloszenie.__new__(Ogloszenie)
+        zadanie.__setstate__((termin_usuniecia, tresc, autor, utworzono, id_zadania))
+    else:
+        zadanie = ZadanieDomowe.__new__(ZadanieDomowe)
+        zadanie.__setstate__((termin_usuniecia, tresc, autor, utworzono, id_zadania, Przedmioty[przedmiot],
+                              prawdziwy_termin))
+    return zadanie
+
+
+class BazaSQLite:
+    """Opcjonalny magazyn stanów spisów w lokalnej bazie SQLite w trybie WAL.
+    Każda zmiana spisu nanoszona jest na tabele zadań i stylów w transakcji, która po zatwierdzeniu jest trwała
+    (synchronous=FULL), więc w przeciwieństwie do zapisów na kanale nie czeka na zapis całego spisu.
+    Tabela zadań posiada indeksy według serwera (i ID), terminu usunięcia, przedmiotu oraz autora, używane przez
+    zapytania o zadania po terminie, filtrowane listy zadań i wyszukiwanie po ID. Metody wykonują blokujące
+    operacje na pliku, więc powinny być wywoływane poza pętlą zdarzeń (np. przez asyncio.to_thread)."""
+
+    def __init__(self, sciezka: str | os.PathLike):
+        self.sciezka = Path(sciezka)
+        self._polaczenie: sqlite3.Connection | None = None  # Otwierane przy pierwszym użyciu, w wątku roboczym
+        self._blokada = threading.Lock()  # Połączenie jest współdzielone przez wątki asyncio.to_thread
+
+    def _polacz(self) -> sqlite3.Connection:
+        """Zwraca połączenie z bazą, przy pierwszym wywołaniu tworząc plik i schemat bazy"""
+        if self._polaczenie is None:
+            self.sciezka.parent.mkdir(parents=True, exist_ok=True)
+            polaczenie = sqlite3.connect(self.sciezka, isolation_level=None, check_same_thread=False)
+            try:
+                if (wersja := polaczenie.execute("PRAGMA user_version").fetchone()[0]) > WERSJA_SCHEMATU:
+                    raise ValueError(f"Baza {self.sciezka} ma nieobsługiwaną wersję schematu {wersja}")
+                polaczenie.execute("PRAGMA journal_mode=WAL")
+                polaczenie.execute("PRAGMA synchronous=FULL")  # W trybie WAL fsync przy każdym zatwierdzeniu
+                polaczenie.executescript(SCHEMAT)
+                polaczenie.execute(f"PRAGMA user_version={WERSJA_SCHEMATU}")
+            except BaseException:
+                polaczenie.close()
+                raise
+            self._polaczenie = polaczenie
+            logger.info(f"Otwarto bazę SQLite {self.sciezka}")
+        return self._polaczenie
+
+    def zamknij(self):
+        """Zamyka połączenie z bazą, kolejne użycie otworzy je ponownie"""
+        with self._blokada:
+            if self._polaczenie is not None:
+                self._polaczenie.close()
+                self._polaczenie = None
+
+    def zapisz(self, zmiany: Iterable[ZmianySpisu], serwery: Iterable[int | None] | None = None):
+        """Nanosi zmiany wielu spisów w jednej transakcji. Jeśli podano listę istniejących spisów (serwery),
+        usuwane są także wszystkie dane spisów spoza niej. W razie błędu transakcja jest wycofywana w całości."""
+        with self._blokada:
+            baza = self._polacz()
+            baza.execute("BEGIN IMMEDIATE")
+            try:
+                for serwer, pola, wpisy in zmiany:
+                    serwer = _klucz(serwer)
+                    if wpisy is None:
+                        self._zastap(baza, serwer, pola)
+                    else:
+                        self._nanies(baza, serwer, wpisy)
+                    baza.execute(
+                        "INSERT OR REPLACE INTO stany VALUES (?, ?, ?, ?, ?, ?)",
+                        (serwer, pola["ostatni_zapis"].timestamp(), pola["uzycia_spis"], pola["nastepne_id"],
+                         pola["edytor"], json.dumps(sorted(pola["serwery_ze_spisem"])))
+                    )
+                if serwery is not None:
+                    istniejace = json.dumps([_klucz(s) for s in serwery])
+                    for tabela in ("stany", "zadania", "style"):
+                        baza.execute(f"DELETE FROM {tabela} WHERE serwer NOT IN (SELECT value FROM json_each(?))",
+                                     (istniejace,))
+                baza.execute("COMMIT")
+            except BaseException:
+                baza.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _zastap(baza: sqlite3.Connection, serwer: int, pola: dict):
+        """Zastępuje wszystkie zadania i style spisu podanymi w polach stanu"""
+        baza.execute("DELETE FROM zadania WHERE serwer = ?", (serwer,))
+        baza.execute("DELETE FROM style WHERE serwer = ?", (serwer,))
+        baza.executemany(WSTAW_ZADANIE, (_wiersz(serwer, z) for z in pola["lista_zadan"]))
+        baza.executemany(WSTAW_STYL, ((serwer, u, json.dumps(zapisz_styl(s))) for u, s in pola["style"].items()))
+
+    @staticmethod
+    def _nanies(baza: sqlite3.Connection, serwer: int, wpisy: list[tuple]):
+        """Nanosi na tabele wpisy dziennika jednego spisu, w kolejności ich dodania"""
+        for rodzaj, *dane in wpisy:
+            if rodzaj == DODANIE:
+                baza.execute(WSTAW_ZADANIE, _wiersz(serwer, dane[0]))
+            elif rodzaj == EDYCJA:
+                baza.execute(USUN_ZADANIE, (serwer, dane[0]))
+                baza.execute(WSTAW_ZADANIE, _wiersz(serwer, dane[1]))
+            elif rodzaj in (USUNIECIE, WYGASNIECIE):
+                baza.execute(USUN_ZADANIE, (serwer, dane[0]))
+            elif rodzaj == STYL:
+                baza.execute(WSTAW_STYL, (serwer, dane[0], json.dumps(zapisz_styl(dane[1]))))
+            else:
+                raise ValueError(f"Nieznany rodzaj wpisu w dzienniku: {rodzaj!r}")
+
+    def wczytaj(self) -> dict[int | None, dict]:
+        """Zwraca zapisywane pola stanów wszystkich spisów (jak w StanBota.__getstate__), pusty słownik dla
+        pustej bazy. Zadania, których termin już upłynął, są najpierw usuwane przy pomocy indeksu terminów."""
+        with self._blokada:
+            baza = self._polacz()
+            baza.execute("BEGIN IMMEDIATE")  # Spójny odczyt wszystkich tabel
+            try:
+                if usuniete := baza.execute("DELETE FROM zadania WHERE termin_usuniecia <= ?",
+                                            (int(datetime.now().timestamp()),)).rowcount:
+                    logger.info(f"Usunięto z bazy zadania po terminie: {usuniete}")
+                stany = {}
+                for serwer, ostatni_zapis, uzycia_spis, nastepne_id, edytor, serwery in \
+                        baza.execute("SELECT * FROM stany"):
+                    stany[serwer or None] = {
+                        "lista_zadan": [
+                            _zadanie(*wiersz) for wiersz in
+                            baza.execute(f"SELECT {KOLUMNY_ZADAN} FROM zadania WHERE serwer = ?", (serwer,))
+                        ],
+                        "style": {u: wczytaj_styl(json.loads(s)) for u, s in
+                                  baza.execute("SELECT uzytkownik, styl FROM style WHERE serwer = ?", (serwer,))},
+                        "ostatni_zapis": datetime.fromtimestamp(ostatni_zapis),
+                        "uzycia_spis": uzycia_spis,
+                        "nastepne_id": nastepne_id,
+                        "edytor": edytor,
+                        "serwery_ze_spisem": set(json.loads(serwery)),
+                    }
+                baza.execute("COMMIT")
+            except BaseException:
+                baza.execute("ROLLBACK")
+                raise
+        return stany
+
+    def znajdz(self, serwer: int | None, id_zadania: str) -> Ogloszenie | None:
+        """Zwraca zadanie lub ogłoszenie spisu o podanym ID (klucz główny) lub None, jeśli takie nie istnieje"""
+        with self._blokada:
+            wiersz = self._polacz().execute(f"SELECT {KOLUMNY_ZADAN} FROM zadania WHERE serwer = ? AND id = ?",
+                                            (_klucz(serwer), id_zadania)).fetchone()
+        return None if wiersz is None else _zadanie(*wiersz)
+
+    def zadania(self, serwer: int | None, przedmiot: Przedmioty | None = None, autor: int | None = None) \
+            -> list[Ogloszenie]:
+        """Zwraca zadania i ogłoszenia spisu posortowane według terminu usunięcia, opcjonalnie jedynie zadania
+        z danego przedmiotu lub danego autora (przy pomocy odpowiedniego indeksu)"""
+        warunki, parametry = ["serwer = ?"], [_klucz(serwer)]
+        if przedmiot is not None:
+            warunki.append("przedmiot = ?")
+            parametry.append(przedmiot.name)
+        if autor is not None:
+            warunki.append("autor = ?")
+            parametry.append(autor)
+        with self._blokada:
+            wiersze = self._polacz().execute(
+                f"SELECT {KOLUMNY_ZADAN} FROM zadania WHERE {' AND '.join(warunki)} ORDER BY termin_usuniecia",
+                parametry
+            ).fetchall()
+        return [_zadanie(*wiersz) for wiersz in wiersze]
@@ -20,50 +20,334 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
+import asyncio
 import pickle
+import sqlite3
+from copy import copy
 from dataclasses import dataclass, field
 from datetime import datetime
-from io import BytesIO
-from logging import getLogger
+from functools import partial
+from logging import getLogger, DEBUG
+from typing import AsyncIterator, Callable
 
 import aiohttp
 import discord
-from sortedcontainers import SortedList
-
-from .style import Styl
-from .zadanie import Ogloszenie
-
-__all__ = "SpisBot", "PROSTY_FORMAT_DATY"
+from sortedcontainers import SortedKeyList
+
+from .autozapis import AutoZapis
+from .baza import BazaSQLite, ZmianySpisu
+from .dziennik import *
+from .format_zapisu import *
+from .harmonogram import HarmonogramUsuwania
+from .katalog import KatalogKopii, WpisKatalogu
+from .kopia import wyslij_zapis, pobierz_zapis, rozpoznaj_rozszerzenie, BLEDY_KOPII
+from .magazyn import MagazynLokalny
+from .style import Styl, PamiecSpisu
+from .zadanie import Ogloszenie, klucz_zadania
+
+__all__ = "SpisBot", "StanBota", "PROSTY_FORMAT_DATY"
 logger = getLogger(__name__)
 
+# Po tylu zapisach samego dziennika kolejny zapis będzie pełnym stanem bota (punktem kontrolnym)
+LIMIT_SEGMENTOW_DZIENNIKA = 50
+PREFIKS_PUNKTU_KONTROLNEGO = "spis_backup_"
+PREFIKS_DZIENNIKA = "spis_dziennik_"
+ROZSZERZENIE_ZAPISU = ".spis"  # Przy wysyłaniu na kanał dochodzi do niego rozszerzenie kompresji
+ROZSZERZENIE_PICKLE = ".pickle"  # Zapisy sprzed wprowadzenia formatu binarnego
+
 # Link do API GitHuba, aby zdobyć informacje o najnowszych zmianach
 LINK_GITHUB_API: str = "https://api.github.com/repos/Kacper0510/SpisZadanDomowych/commits?per_page=1"
 PROSTY_FORMAT_DATY = "%d.%m.%y %H:%M:%S"
 
+# Sekcje stanu bota, których zmiany są śledzone osobno
+SEKCJA_ZADANIA = "zadania"
+SEKCJA_STYLE = "style"
+SEKCJA_LICZNIKI = "liczniki"
+SEKCJA_SERWERY = "serwery"
+
+
+CYFRY_ID = "0123456789abcdefghijklmnopqrstuvwxyz"  # Cyfry używane w ID zadań
+
+# Pola StanBota pomijane przy zapisie, odtwarzane przy wczytywaniu
+POLA_NIEZAPISYWANE = frozenset({
+    "dziennik", "segmenty_dziennika", "harmonogram", "wersja", "wersje_sekcji", "indeks", "pamiec_spisu",
+    "zapisana_wersja", "lokalna_wersja", "blokada_zapisu", "widok_zadan", "po_zmianie"
+})
+
 
 @dataclass
 class StanBota:
-    """Klasa przechowująca stan bota między uruchomieniami"""
+    """Klasa przechowująca stan bota między uruchomieniami.
+    Każdy serwer z własnym spisem ma osobny StanBota (z osobną listą zadań, harmonogramem, pamięcią spisu
+    i zapisami), a pozostałe serwery korzystają z głównego stanu."""
 
-    lista_zadan: SortedList[Ogloszenie] = field(default_factory=SortedList)
+    lista_zadan: SortedKeyList[Ogloszenie] = field(default_factory=lambda: SortedKeyList(key=klucz_zadania))
     style: dict[int, Styl] = field(default_factory=dict)  # Styl każdego użytkownika
 
     ostatni_zapis: datetime = field(default_factory=datetime.now)
     uzycia_spis: int = 0  # Globalna ilość użyć /spis
 
-    # Poniższe ustawienie jest dostępne jedynie poprzez edycję pliku pickle badź tego pliku źródłowego
-    edytor: int | None = None  # ID serwera, na którym można edytować spis
+    nastepne_id: int = 0  # Numer kolejnego ID do przydzielenia, zapisywany w systemie o podstawie 36
 
-    def __hash__(self):
-        """Zwraca hash stanu"""
-        dane_do_hashowania: tuple = (
-            tuple(self.lista_zadan),
-            frozenset(self.style.items()),
-            self.ostatni_zapis,
-            self.uzycia_spis,
-            self.edytor
-        )
-        return hash(dane_do_hashowania)
+    # Poniższe ustawienie jest dostępne jedynie poprzez edycję zapisu bądź tego pliku źródłowego
+    edytor: int | None = None  # ID serwera, na którym można edytować spis
+    # ID serwerów posiadających własne spisy, używane tylko w głównym stanie do odnalezienia ich zapisów
+    serwery_ze_spisem: set[int] = field(default_factory=set)
+
+    # Zmiany od ostatniego zapisu, nie są zapisywane razem ze stanem
+    dziennik: Dziennik = field(default_factory=Dziennik, init=False, repr=False, compare=False)
+    # Ilość zapisów dziennika od ostatniego punktu kontrolnego, None - brak punktu kontrolnego na kanale
+    segmenty_dziennika: int | None = field(default=None, init=False, repr=False, compare=False)
+    # Wspólny task usuwający zadania po terminie, nie jest zapisywany razem ze stanem
+    harmonogram: HarmonogramUsuwania = field(init=False, repr=False, compare=False)
+    # Numer wersji stanu, zwiększany przy każdej zmianie, oraz numery wersji ostatnich zmian poszczególnych sekcji
+    wersja: int = field(default=0, init=False, repr=False, compare=False)
+    wersje_sekcji: dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    zapisana_wersja: int = field(default=0, init=False, repr=False, compare=False)  # Wersja przy ostatnim zapisie
+    lokalna_wersja: int = field(default=0, init=False, repr=False, compare=False)  # Wersja w lokalnej migawce
+    # Zapobiega jednoczesnym zapisom tego samego stanu, które zatwierdziłyby w dzienniku te same zmiany dwa razy
+    blokada_zapisu: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False, compare=False)
+    # Indeks zadań i ogłoszeń według ID, odtwarzany przy wczytywaniu
+    indeks: dict[str, Ogloszenie] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # Niezmienna migawka listy zadań dla czytelników (spis, eksport, zapis), None - nieaktualna po zmianie spisu
+    widok_zadan: tuple[Ogloszenie, ...] | None = field(default=None, init=False, repr=False, compare=False)
+    # Wywoływane po każdej zmianie stanu, np. w celu zaplanowania automatycznego zapisu
+    po_zmianie: Callable[[], None] | None = field(default=None, init=False, repr=False, compare=False)
+    # Ostatnio wygenerowane spisy w różnych stylach
+    pamiec_spisu: PamiecSpisu = field(default_factory=PamiecSpisu, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Indeksuje i planuje usunięcie wszystkich zadań ze spisu"""
+        self.indeks = {z.id: z for z in self.lista_zadan}
+        self.harmonogram = HarmonogramUsuwania(self._usun_wygasle)
+        self.harmonogram.zaplanuj_wiele(self.lista_zadan)
+
+    def _zmieniono(self, sekcja: str):
+        """Zwiększa numer wersji stanu i oznacza podaną sekcję jako zmienioną"""
+        self.wersja += 1
+        self.wersje_sekcji[sekcja] = self.wersja
+        if self.po_zmianie is not None:
+            self.po_zmianie()
+
+    def zmienione_sekcje(self, od_wersji: int) -> set[str]:
+        """Zwraca zbiór sekcji zmienionych po podanej wersji stanu"""
+        return {sekcja for sekcja, wersja in self.wersje_sekcji.items() if wersja > od_wersji}
+
+    def wersja_sekcji(self, sekcja: str) -> int:
+        """Zwraca numer wersji stanu, przy której ostatnio zmieniono podaną sekcję"""
+        return self.wersje_sekcji.get(sekcja, 0)
+
+    def znajdz(self, id_zadania: str) -> Ogloszenie | None:
+        """Zwraca zadanie lub ogłoszenie o podanym ID lub None, jeśli takie nie istnieje"""
+        return self.indeks.get(id_zadania)
+
+    def zadania(self) -> tuple[Ogloszenie, ...]:
+        """Zwraca niezmienną migawkę spisu (posortowaną tak jak lista_zadan) do odczytu.
+        Migawka tworzona jest raz po każdej zmianie spisu, przy pierwszym odczycie - kolejne odczyty zwracają
+        ten sam obiekt w czasie O(1). Zmiany spisu nie wpływają na wcześniej zwrócone migawki, a ponieważ zadania
+        nie są modyfikowane po dodaniu do spisu, czytelnik nigdy nie zobaczy częściowo wykonanej edycji."""
+        if self.widok_zadan is None:
+            self.widok_zadan = tuple(self.lista_zadan)
+        return self.widok_zadan
+
+    def strona_spisu(self, styl: Styl, numer: int = 0) -> tuple[int, str, bool]:
+        """Zwraca numer, treść i informację, czy jest to ostatnia strona, dla strony spisu sformatowanej podanym
+        stylem. Korzysta z pamięci ostatnio wygenerowanych stron."""
+        return self.pamiec_spisu.strona(styl, self.zadania(), self.wersja_sekcji(SEKCJA_ZADANIA), numer)
+
+    def przydziel_id(self) -> str:
+        """Zwraca nowe, krótkie ID zadania, niekolidujące z żadnym ID w spisie (np. nadanym przed zmianą formatu)"""
+        while True:
+            liczba, cyfry = self.nastepne_id, ""
+            self.nastepne_id += 1
+            while True:
+                liczba, reszta = divmod(liczba, 36)
+                cyfry = CYFRY_ID[reszta] + cyfry
+                if liczba == 0:
+                    break
+            if cyfry not in self.indeks:
+                self.dziennik.ustaw_licznik("nastepne_id", self.nastepne_id)
+                return cyfry
+
+    def _wstaw(self, zadanie: Ogloszenie):
+        """Dodaje zadanie do spisu i indeksu, bez zapisu w dzienniku"""
+        self.lista_zadan.add(zadanie)
+        self.indeks[zadanie.id] = zadanie
+        self.widok_zadan = None
+
+    def _wyjmij(self, zadanie: Ogloszenie):
+        """Usuwa zadanie ze spisu i indeksu, bez zapisu w dzienniku"""
+        self.lista_zadan.remove(zadanie)
+        del self.indeks[zadanie.id]
+        self.widok_zadan = None
+        self.pamiec_spisu.uniewaznij(zadanie)
+
+    def dodaj(self, zadanie: Ogloszenie):
+        """Dodaje zadanie lub ogłoszenie do spisu, nadając mu ID"""
+        zadanie.id = self.przydziel_id()
+        self._wstaw(zadanie)
+        self.harmonogram.zaplanuj(zadanie)
+        self.dziennik.dodaj_wpis(DODANIE, zadanie)
+        self._zmieniono(SEKCJA_ZADANIA)
+
+    def dodaj_wiele(self, zadania: list[Ogloszenie]):
+        """Dodaje naraz wiele zadań lub ogłoszeń do spisu, nadając im ID, np. przy imporcie z pliku"""
+        for zadanie in zadania:
+            zadanie.id = self.przydziel_id()
+            self.indeks[zadanie.id] = zadanie
+            self.dziennik.dodaj_wpis(DODANIE, zadanie)
+        self.lista_zadan.update(zadania)
+        self.widok_zadan = None
+        self.harmonogram.zaplanuj_wiele(zadania)
+        self._zmieniono(SEKCJA_ZADANIA)
+
+    def edytuj(self, zadanie: Ogloszenie, **zmiany) -> Ogloszenie:
+        """Zmienia podane pola zadania lub ogłoszenia i zwraca jego nową wersję.
+        Zadanie w spisie zastępowane jest zmienioną kopią - zadania w spisie nigdy nie są modyfikowane,
+        dzięki czemu migawki stanu (np. zapisywane w innym wątku) pozostają spójne."""
+        nowe = copy(zadanie)
+        for pole, wartosc in zmiany.items():
+            setattr(nowe, pole, wartosc)
+        nowe.odswiez_klucz()
+        self._wyjmij(zadanie)  # Użycie SortedKeyList wymusza ponowne dodanie zadania
+        self._wstaw(nowe)
+        self.harmonogram.zaplanuj(nowe)  # Harmonogram musi przekazać do usunięcia nową wersję zadania
+        self.dziennik.dodaj_wpis(EDYCJA, nowe.id, nowe)
+        self._zmieniono(SEKCJA_ZADANIA)
+        return nowe
+
+    def usun(self, zadanie: Ogloszenie):
+        """Usuwa zadanie lub ogłoszenie ze spisu"""
+        self._wyjmij(zadanie)
+        self.harmonogram.odwolaj(zadanie)
+        self.dziennik.dodaj_wpis(USUNIECIE, zadanie.id)
+        self._zmieniono(SEKCJA_ZADANIA)
+
+    def _usun_wygasle(self, zadania: list[Ogloszenie]):
+        """Usuwa naraz wszystkie zadania i ogłoszenia, których termin upłynął"""
+        for zadanie in zadania:
+            self._wyjmij(zadanie)
+            self.dziennik.dodaj_wpis(WYGASNIECIE, zadanie.id)
+        self._zmieniono(SEKCJA_ZADANIA)
+        logger.info(f"Automatycznie usunięto zadania po terminie: {zadania!r}")
+
+    def ustaw_styl(self, uzytkownik: int, styl: Styl):
+        """Zmienia styl wyświetlania spisu danego użytkownika"""
+        self.style[uzytkownik] = styl
+        self.dziennik.dodaj_wpis(STYL, uzytkownik, styl)
+        self._zmieniono(SEKCJA_STYLE)
+
+    def dodaj_serwer_ze_spisem(self, serwer: int):
+        """Zapamiętuje serwer posiadający własny spis, wymuszając zapis pełnego stanu przy następnym zapisie"""
+        self.serwery_ze_spisem.add(serwer)
+        self.segmenty_dziennika = None
+        self._zmieniono(SEKCJA_SERWERY)
+
+    def policz_uzycie_spisu(self):
+        """Zwiększa globalną ilość użyć /spis o 1"""
+        self.uzycia_spis += 1
+        self.dziennik.ustaw_licznik("uzycia_spis", self.uzycia_spis)
+        self._zmieniono(SEKCJA_LICZNIKI)
+
+    def odtworz(self, segment: tuple[list[tuple], dict[str, int]]):
+        """Nanosi zmiany z zapisanego segmentu dziennika na stan bota"""
+        wpisy, liczniki = segment
+        for rodzaj, *dane in wpisy:
+            if rodzaj == DODANIE:
+                # Segment mógł zostać wysłany dwukrotnie (np. po przekroczeniu czasu odpowiedzi przy udanym wysłaniu)
+                if (stare := self.znajdz(dane[0].id)) is not None:
+                    self._wyjmij(stare)
+                self._wstaw(dane[0])
+            elif rodzaj == EDYCJA:
+                if (stare := self.znajdz(dane[0])) is not None:
+                    self._wyjmij(stare)
+                self._wstaw(dane[1])
+            elif rodzaj in (USUNIECIE, WYGASNIECIE):
+                if (stare := self.znajdz(dane[0])) is not None:
+                    self._wyjmij(stare)
+            elif rodzaj == STYL:
+                self.style[dane[0]] = dane[1]
+            else:
+                logger.warning(f"Nieznany rodzaj wpisu w dzienniku: {rodzaj!r}")
+        for nazwa, wartosc in liczniki.items():
+            setattr(self, nazwa, wartosc)
+
+    def migawka(self) -> "StanBota":
+        """Zwraca kopię zapisywanej części stanu, którą można bezpiecznie serializować poza pętlą zdarzeń.
+        Lista zadań to współdzielona migawka z zadania(), kopiowane są jedynie małe kontenery - same zadania i style
+        są współdzielone, ponieważ nie są modyfikowane po dodaniu do stanu (edycja zastępuje zadanie kopią)."""
+        stan = self.__getstate__()
+        stan["lista_zadan"] = self.zadania()  # Przy wczytywaniu zamieniana z powrotem na SortedKeyList
+        stan["style"] = dict(self.style)
+        stan["serwery_ze_spisem"] = set(self.serwery_ze_spisem)
+        migawka = object.__new__(StanBota)
+        migawka.__dict__.update(stan)
+        return migawka
+
+    def __getstate__(self) -> dict:
+        """Zwraca zapisywane pola stanu bota (bez dziennika zmian), używane w pickle i formacie binarnym"""
+        return {k: v for k, v in self.__dict__.items() if k not in POLA_NIEZAPISYWANE}
+
+    def __setstate__(self, state: dict):
+        """Wczytuje stan bota z pickle lub formatu binarnego, uzupełniając pola niezapisywane"""
+        self.nastepne_id = 0  # Brak w stanach zapisanych przed wprowadzeniem krótkich ID
+        self.serwery_ze_spisem = set()  # Brak w stanach zapisanych przed wprowadzeniem spisów serwerów
+        self.__dict__.update(state)
+        if not isinstance(self.lista_zadan, SortedKeyList):  # Stany zapisane przed wprowadzeniem kluczy sortowania
+            self.lista_zadan = SortedKeyList(self.lista_zadan, key=klucz_zadania)
+        self.dziennik = Dziennik()
+        self.segmenty_dziennika = None
+        self.harmonogram = HarmonogramUsuwania(self._usun_wygasle)  # Zadania planowane są dopiero po wczytaniu
+        self.wersja = 0
+        self.wersje_sekcji = {}
+        self.zapisana_wersja = 0
+        self.lokalna_wersja = 0
+        self.blokada_zapisu = asyncio.Lock()
+        self.widok_zadan = None
+        self.po_zmianie = None
+        self.indeks = {z.id: z for z in self.lista_zadan}
+        self.pamiec_spisu = PamiecSpisu()
+
+
+def _nazwa_pliku(prefiks: str, serwer: int | None, znacznik_czasu: int) -> str:
+    """Zwraca nazwę pliku zapisu danego spisu - główny spis zachowuje nazwy sprzed wprowadzenia spisów serwerów"""
+    return f"{prefiks}{znacznik_czasu}{ROZSZERZENIE_ZAPISU}" if serwer is None \
+        else f"{prefiks}{serwer}_{znacznik_czasu}{ROZSZERZENIE_ZAPISU}"
+
+
+def _rozpoznaj_plik(nazwa: str) -> tuple[str, int | None, int] | None:
+    """Zwraca prefiks (rodzaj zapisu), ID serwera (None dla głównego spisu) i znacznik czasu pliku zapisu
+    (lub manifestu zapisu podzielonego na części) lub None, jeśli plik nie jest zapisem stanu bota"""
+    nazwa = rozpoznaj_rozszerzenie(nazwa) or nazwa  # Nieskompresowane zapisy sprzed wprowadzenia kompresji
+    for prefiks in (PREFIKS_PUNKTU_KONTROLNEGO, PREFIKS_DZIENNIKA):
+        for rozszerzenie in (ROZSZERZENIE_ZAPISU, ROZSZERZENIE_PICKLE):
+            if nazwa.startswith(prefiks) and nazwa.endswith(rozszerzenie):
+                czesci = nazwa[len(prefiks):-len(rozszerzenie)].split("_")
+                if all(c.isdigit() for c in czesci) and len(czesci) in (1, 2):
+                    return prefiks, int(czesci[0]) if len(czesci) == 2 else None, int(czesci[-1])
+    return None
+
+
+def _zserializuj_stan(stan: StanBota) -> bytes:
+    """Zapisuje stan bota (zazwyczaj migawkę) w formacie binarnym"""
+    return zserializuj_stan(stan.__getstate__())
+
+
+def _wczytaj_stan(dane: bytes | memoryview) -> StanBota:
+    """Wczytuje stan bota z formatu binarnego lub ze starego zapisu pickle (migracja następuje przy zapisie)"""
+    if not czy_format_binarny(dane):
+        return pickle.loads(dane, fix_imports=False)
+    stan = object.__new__(StanBota)
+    stan.__setstate__(wczytaj_stan(dane))
+    stan.segmenty_dziennika = 0  # Stan z pickle ma None, więc pierwszy zapis na kanał będzie już w nowym formacie
+    return stan
+
+
+def _wczytaj_segment(dane: bytes | memoryview) -> tuple[datetime, tuple[list[tuple], dict[str, int]]]:
+    """Wczytuje czas zapisu i segment dziennika z formatu binarnego lub ze starego zapisu pickle"""
+    if not czy_format_binarny(dane):
+        return pickle.loads(dane, fix_imports=False)
+    return wczytaj_segment(dane)
 
 
 class SpisBot(discord.Bot):
@@ -73,68 +357,416 @@ class SpisBot(discord.Bot):
         """Inicjalizacja zmiennych"""
         super().__init__(*args, **kwargs)
 
-        self.stan: StanBota | None = None
+        # Stany spisów: główny (klucz None) oraz własne spisy serwerów (klucz - ID serwera)
+        self.stany: dict[int | None, StanBota] = {}
 
         # Konfiguracja
-        self.autosave: bool = True  # Auto-zapis przy wyłączaniu i auto-wczytywanie przy włączaniu
+        self.autosave: bool = True  # Auto-zapis w tle i przy wyłączaniu oraz auto-wczytywanie przy włączaniu
+        self.autozapis = AutoZapis(self.zapisz_spis)  # Zapisuje zmienione spisy w tle, jeśli autosave jest włączony
         self.serwer_dev: int | None = None  # Serwer do zarejestrowania komend developerskich
+        self.magazyn: MagazynLokalny | None = None  # Lokalne migawki spisów, None - zapis tylko na kanale
+        self.limit_segmentow: int = LIMIT_SEGMENTOW_DZIENNIKA  # Zapisy dziennika między punktami kontrolnymi
+        self.katalog = KatalogKopii()  # Indeks zapisów na kanale do przywracania stanu z wybranej chwili
+        self.baza: BazaSQLite | None = None  # Baza SQLite utrwalająca każdą zmianę spisów, None - wyłączona
+        # Spisy ze zmianami oczekującymi na zapis w bazie -> czy zapisać cały stan spisu, a nie tylko zmiany
+        self._zmiany_bazy: dict[int | None, bool] = {}
+        self._zapis_bazy: asyncio.Task | None = None  # Task zapisujący zgłoszone zmiany w bazie
 
         # Dane uzupełniane przy inicjalizacji
         self.backup_kanal: discord.DMChannel | None = None  # Kanał do zapisywania/backupowania/wczytywania stanu spisu
-        self.hash_stanu: int = 0  # Hash stanu bota przy ostatnim zapisie/wczytaniu
         self.czas_startu = datetime.now()  # Czas startu bota, do obliczania uptime
         self.invite_link: str = ""  # Link do zaproszenia bota na serwer
         self.ostatni_commit: str = ""  # Ostatnia aktualizacja bota
 
+    def klucz_serwera(self, serwer: int | None) -> int | None:
+        """Zwraca klucz spisu używanego na danym serwerze - ID serwera, jeśli ma własny spis, lub None"""
+        return serwer if serwer in self.stany else None
+
+    def stan_serwera(self, serwer: int | None) -> StanBota:
+        """Zwraca stan spisu używanego na danym serwerze - własnego lub głównego"""
+        return self.stany[self.klucz_serwera(serwer)]
+
+    def serwery_edytorow(self) -> list[int] | None:
+        """Zwraca listę ID serwerów, na których można edytować spisy, lub None, jeśli główny spis
+        można edytować na każdym serwerze"""
+        if self.stany[None].edytor is None:
+            return None
+        return [stan.edytor for stan in self.stany.values()]
+
+    def zmien_stan(self, stan: StanBota, serwer: int | None = None):
+        """Zastępuje aktualny stan danego spisu nowym, przenosząc na niego usuwanie zadań po terminie"""
+        if (stary := self.stany.get(serwer)) is not None:
+            stary.harmonogram.zatrzymaj()
+            stary.po_zmianie = None
+        self.stany[serwer] = stan
+        stan.zapisana_wersja = stan.lokalna_wersja = stan.wersja
+        stan.po_zmianie = partial(self._zmieniono_spis, serwer)
+        stan.harmonogram.uruchom()
+        if self.baza is not None:  # Dalsze zmiany trafiają do bazy jako wpisy dziennika, a sam stan w całości
+            stan.dziennik.odbiorca = Dziennik()
+            self._zglos_do_bazy(serwer, pelny=True)
+
+    def dodaj_spis(self, serwer: int) -> StanBota:
+        """Tworzy pusty spis dla danego serwera, edytowalny tylko na nim i niezależny od pozostałych spisów"""
+        stan = StanBota(edytor=serwer)
+        self.zmien_stan(stan, serwer)
+        # Nawet pusty spis musi zostać zapisany, aby został odnaleziony przy wczytywaniu
+        stan.zapisana_wersja = stan.lokalna_wersja = -1
+        self.autozapis.zglos_zmiane(serwer)
+        self.stany[None].dodaj_serwer_ze_spisem(serwer)
+        return stan
+
+    def _zmieniono_spis(self, serwer: int | None):
+        """Wywoływane po każdej zmianie stanu spisu, planuje jego zapis na kanale i w bazie"""
+        self.autozapis.zglos_zmiane(serwer)
+        if self.baza is not None:
+            self._zglos_do_bazy(serwer)
+
+    def _zglos_do_bazy(self, serwer: int | None, pelny: bool = False):
+        """Zgłasza zmianę spisu do zapisania w bazie, uruchamiając task zapisujący, jeśli nie działa"""
+        self._zmiany_bazy[serwer] = self._zmiany_bazy.get(serwer, False) or pelny
+        if self._zapis_bazy is None or self._zapis_bazy.done():
+            self._zapis_bazy = asyncio.get_running_loop().create_task(self._zapisuj_w_bazie(), name="ZapisBazy")
+
+    async def _zapisuj_w_bazie(self):
+        """Zapisuje w bazie zgłoszone zmiany, dopóki pojawiają się nowe. Zmiany zgłoszone w trakcie trwającej
+        transakcji trafiają razem do następnej, więc przy wielu zmianach naraz transakcji jest mniej niż zmian."""
+        await asyncio.sleep(0)  # Zmiany z tej samej iteracji pętli zdarzeń (np. jednej komendy) w jednej transakcji
+        while self._zmiany_bazy and await self._zapisz_w_bazie():
+            pass
+
+    async def _zapisz_w_bazie(self) -> bool:
+        """Zapisuje w bazie w jednej transakcji wszystkie zgłoszone dotychczas zmiany spisów, w osobnym wątku.
+        Zwraca False w przypadku niepowodzenia - wtedy zmienione spisy zostaną przy kolejnej próbie zapisane
+        w całości, ponieważ ich wpisy dziennika zostały już pobrane."""
+        zgloszone, self._zmiany_bazy = self._zmiany_bazy, {}
+        zmiany = []
+        for serwer, pelny in zgloszone.items():
+            if (stan := self.stany.get(serwer)) is None:  # Spis usunięty przy wczytywaniu innego stanu
+                continue
+            if pelny:
+                zmiany.append(ZmianySpisu(serwer, stan.migawka().__getstate__(), None))
+            else:
+                pola = {k: v for k, v in stan.__getstate__().items() if k not in ("lista_zadan", "style")}
+                pola["serwery_ze_spisem"] = set(stan.serwery_ze_spisem)  # Odczytywane w innym wątku
+                zmiany.append(ZmianySpisu(serwer, pola, stan.dziennik.odbiorca.wpisy))
+            stan.dziennik.odbiorca = Dziennik()  # Kolejne zmiany trafią do następnej transakcji
+        # Po zapisie całego stanu (np. wczytanego z kanału) z bazy usuwane są spisy, których już nie ma
+        serwery = list(self.stany) if any(z.wpisy is None for z in zmiany) else None
+        try:
+            await asyncio.to_thread(self.baza.zapisz, zmiany, serwery)
+            logger.debug(f"Zapisano w bazie zmiany spisów: {[z.serwer for z in zmiany]}")
+            return True
+        except (sqlite3.Error, ValueError) as e:
+            logger.exception("Nie udało się zapisać zmian w bazie!", exc_info=e)
+            for zmiana in zmiany:
+                self._zmiany_bazy[zmiana.serwer] = True
+            return False
+
     async def zapisz(self) -> bool:
-        """Zapisuje stan bota do pliku i wysyła go do twórcy bota.
-        Uwaga: zapis nie odbędzie się w przypadku wykrycia identycznego hasha stanu."""
-        if hash(self.stan) == self.hash_stanu:  # Nic się nie zmieniło od ostatniego zapisu
-            logger.info("Zapis stanu nie był konieczny - identyczny hash")
+        """Zapisuje zmiany stanów wszystkich spisów do plików i wysyła je do twórcy bota.
+        Każdy spis zapisywany jest niezależnie i tylko wtedy, gdy zmienił się od swojego ostatniego zapisu.
+        Zwraca True, jeśli zapisano co najmniej jeden spis i żaden zapis nie zakończył się niepowodzeniem."""
+        wyniki = [await self.zapisz_spis(serwer) for serwer in list(self.stany)]
+        return any(wyniki) and None not in wyniki
+
+    async def zapisz_spis(self, serwer: int | None) -> bool | None:
+        """Zapisuje zmiany stanu jednego spisu. Jeśli włączony jest magazyn lokalny, najpierw zapisywana jest
+        na dysku migawka całego stanu, a kanał pełni rolę kopii poza serwerem. Na kanał zazwyczaj wysyłany jest
+        jedynie dziennik zmian od poprzedniego zapisu, a pełny stan (punkt kontrolny) dopiero co
+        limit_segmentow zapisów lub gdy dziennik jest dłuższy od samego spisu. Zwraca True po zapisie,
+        False, jeśli zapis nie był konieczny (wersja stanu nie zmieniła się od ostatniego zapisu na kanale
+        lub spis już nie istnieje)
+        lub None w przypadku niepowodzenia wysłania na kanał (lokalna migawka mogła zostać zapisana)."""
+        if (stan := self.stany.get(serwer)) is None:  # Spis zniknął po wczytaniu innego stanu, np. /dev wczytaj
+            logger.debug(f"Zapis spisu {serwer} nie był konieczny - spis już nie istnieje")
+            return False
+        if stan.wersja == stan.zapisana_wersja:  # Nic się nie zmieniło od ostatniego zapisu
+            logger.debug(f"Zapis spisu {serwer} nie był konieczny - identyczna wersja")
             return False
 
-        ostatni_zapis_old = self.stan.ostatni_zapis  # Do przywrócenia w przypadku niepowodzenia zapisu
-        self.stan.ostatni_zapis = datetime.now()
+        logger.debug(f"Sekcje spisu {serwer} zmienione od ostatniego zapisu: "
+                     f"{stan.zmienione_sekcje(stan.zapisana_wersja)}")
+        async with stan.blokada_zapisu:
+            segment = stan.dziennik.segment()
+            wersja = stan.wersja  # Zmiany dokonane w trakcie zapisu trafią do kolejnego zapisu
+            pelny_zapis = stan.segmenty_dziennika is None \
+                or stan.segmenty_dziennika >= self.limit_segmentow \
+                or len(stan.dziennik) > len(stan.lista_zadan)
+
+            ostatni_zapis_old = stan.ostatni_zapis  # Do przywrócenia w przypadku niepowodzenia zapisu
+            stan.ostatni_zapis = datetime.now()
+            znacznik_czasu = round(stan.ostatni_zapis.timestamp())
+            # Migawka musi powstać razem z segmentem i wersją, przed pierwszym await - inaczej mogłaby zawierać
+            # późniejsze zmiany, które pozostałyby w dzienniku i zostałyby odtworzone przy wczytywaniu drugi raz
+            zapis_lokalny = self.magazyn is not None and stan.lokalna_wersja != wersja
+            migawka = stan.migawka() if pelny_zapis or zapis_lokalny else None
+            punkt_kontrolny = None  # Zserializowany pełny stan, wspólny dla migawki lokalnej i kanału
+            if zapis_lokalny:
+                punkt_kontrolny = await self._zapisz_lokalnie(serwer, migawka)
+                if punkt_kontrolny is not None:
+                    stan.lokalna_wersja = wersja
+            try:
+                # Serializacja w osobnym wątku, aby duży stan nie blokował pętli zdarzeń (np. heartbeatu)
+                if pelny_zapis:
+                    dane = migawka
+                    nazwa = _nazwa_pliku(PREFIKS_PUNKTU_KONTROLNEGO, serwer, znacznik_czasu)
+                    backup = punkt_kontrolny or await asyncio.to_thread(_zserializuj_stan, dane)
+                else:
+                    dane = stan.ostatni_zapis, segment
+                    nazwa = _nazwa_pliku(PREFIKS_DZIENNIKA, serwer, znacznik_czasu)
+                    backup = await asyncio.to_thread(zserializuj_segment, *dane)
+                # Kompresja i ewentualny podział na części
+                nazwa, rozmiar, wiadomosc = await wyslij_zapis(self.backup_kanal, nazwa, backup)
+                self.katalog.dodaj(serwer, WpisKatalogu(znacznik_czasu, wiadomosc, pelny_zapis))
+
+                # Zapisane zmiany nie są już potrzebne w dzienniku
+                stan.dziennik.zatwierdz(segment)
+                if stan.wersja_sekcji(SEKCJA_SERWERY) > wersja:  # Spis serwera dodany w trakcie zapisu
+                    stan.segmenty_dziennika = None  # Lista spisów serwerów trafi na kanał w punkcie kontrolnym
+                elif pelny_zapis:
+                    stan.segmenty_dziennika = 0
+                else:
+                    stan.segmenty_dziennika += 1
+                stan.zapisana_wersja = wersja
+                if self.magazyn is not None and stan.lokalna_wersja == wersja:
+                    await self._oznacz_zreplikowana(serwer)
+                logger.info(f"Pomyślnie zapisano plik {nazwa} ({len(backup)} B, po kompresji {rozmiar} B) "
+                            f"na kanale {self.backup_kanal!r}")
+                if logger.isEnabledFor(DEBUG):  # repr całego stanu trwa długo i blokowałby pętlę zdarzeń
+                    logger.debug(f"Zapisane dane: {dane!r}")
+                return True
+            except (ValueError, discord.HTTPException) as e:
+                logger.exception(f"Nie udało się zapisać stanu spisu {serwer}!", exc_info=e)
+                stan.ostatni_zapis = ostatni_zapis_old
+                return None
+
+    async def _zapisz_lokalnie(self, serwer: int | None, migawka: StanBota) -> bytes | None:
+        """Serializuje migawkę stanu i zapisuje ją w magazynie lokalnym poza pętlą zdarzeń.
+        Zwraca zserializowany stan lub None w przypadku niepowodzenia zapisu."""
         try:
-            backup = pickle.dumps(self.stan, pickle.HIGHEST_PROTOCOL)
-            plik = discord.File(BytesIO(backup), f"spis_backup_{round(self.stan.ostatni_zapis.timestamp())}.pickle")
-            await self.backup_kanal.send("", file=plik)
-            logger.info(f"Pomyślnie zapisano plik {plik.filename} na kanale {self.backup_kanal!r}")
-            logger.debug(f"Zapisane dane: {self.stan!r}")
-            return True
-        except pickle.PickleError as e:
-            logger.exception("Nie udało się zapisać stanu jako obiekt pickle!", exc_info=e)
-            self.stan.ostatni_zapis = ostatni_zapis_old
+            dane = await asyncio.to_thread(_zserializuj_stan, migawka)
+            await asyncio.to_thread(self.magazyn.zapisz, serwer, dane)
+            return dane
+        except (ValueError, OSError) as e:
+            logger.exception(f"Nie udało się zapisać lokalnej migawki spisu {serwer}!", exc_info=e)
+            return None
+
+    async def _oznacz_zreplikowana(self, serwer: int | None):
+        """Oznacza lokalną migawkę spisu jako wysłaną na kanał, niepowodzenie jedynie wymusza ponowne wysłanie
+        pełnego stanu po następnym uruchomieniu"""
+        try:
+            await asyncio.to_thread(self.magazyn.oznacz_zreplikowana, serwer)
+        except OSError as e:
+            logger.exception(f"Nie udało się oznaczyć lokalnej migawki spisu {serwer} jako wysłanej!", exc_info=e)
+
+    async def wczytaj_lokalnie(self) -> bool:
+        """Wczytuje stany wszystkich spisów z magazynu lokalnego, bez łączenia się z Discordem.
+        Zwraca False (niczego nie zmieniając), jeśli magazyn jest wyłączony lub brakuje w nim migawki
+        któregokolwiek spisu - wtedy stan należy wczytać z kanału. Spisy, których migawki nie zostały
+        wysłane na kanał przed wyłączeniem bota, zostaną na niego wysłane przy najbliższym zapisie."""
+        if self.magazyn is None:
             return False
-        finally:  # Zawsze przekalkuluj hash stanu
-            self.hash_stanu = hash(self.stan)
+        try:
+            migawki = {None: await asyncio.to_thread(self.magazyn.wczytaj, None, _wczytaj_stan)}
+            if migawki[None] is None:
+                logger.info(f"Brak lokalnej migawki w {self.magazyn.katalog}, stan zostanie wczytany z kanału")
+                return False
+            for serwer in migawki[None][0].serwery_ze_spisem:
+                if (migawka := await asyncio.to_thread(self.magazyn.wczytaj, serwer, _wczytaj_stan)) is None:
+                    logger.warning(f"Brak lokalnej migawki spisu serwera {serwer}, stan zostanie wczytany z kanału")
+                    return False
+                migawki[serwer] = migawka
+        except (pickle.PickleError, OSError, ValueError) as e:
+            logger.exception("Nie udało się wczytać lokalnej migawki!", exc_info=e)
+            return False
+
+        for serwer in self.stany.keys() - migawki.keys():  # Spisy, których nie ma w zapisie, przestają działać
+            self.stany.pop(serwer).harmonogram.zatrzymaj()
+        for serwer, (stan, zreplikowana) in migawki.items():
+            stan = await asyncio.to_thread(self._odtworz_spis, stan, [])
+            stan.segmenty_dziennika = None  # Nieznany stan kanału - następny zapis na kanał będzie pełny
+            self.zmien_stan(stan, serwer)
+            if not zreplikowana:  # Bot wyłączył się przed wysłaniem migawki na kanał
+                stan.zapisana_wersja = -1
+                self.autozapis.zglos_zmiane(serwer)
+        logger.info(f"Pomyślnie wczytano lokalną migawkę z "
+                    f"{self.stany[None].ostatni_zapis.strftime(PROSTY_FORMAT_DATY)} (spisy: {len(migawki)})")
+        return True
+
+    def _wczytaj_z_bazy(self) -> dict[int | None, StanBota]:
+        """Odczytuje z bazy i odtwarza stany wszystkich spisów, nie korzystając z pętli zdarzeń"""
+        stany = {}
+        for serwer, pola in self.baza.wczytaj().items():
+            stan = object.__new__(StanBota)
+            stan.__setstate__(pola)
+            stany[serwer] = self._odtworz_spis(stan, [])
+        return stany
+
+    async def wczytaj_z_bazy(self) -> bool:
+        """Wczytuje stany wszystkich spisów z bazy SQLite, która zawiera każdą zatwierdzoną zmianę, więc jest
+        najnowszym dostępnym zapisem. Zwraca False (niczego nie zmieniając), jeśli baza jest wyłączona, pusta lub
+        nie udało się jej odczytać. Nie wiadomo, które zmiany zdążyły trafić na kanał, dlatego przy najbliższym
+        zapisie zostanie na niego wysłany pełny stan każdego spisu."""
+        if self.baza is None:
+            return False
+        try:
+            stany = await asyncio.to_thread(self._wczytaj_z_bazy)
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            logger.exception(f"Nie udało się wczytać stanu z bazy {self.baza.sciezka}!", exc_info=e)
+            return False
+        if None not in stany:
+            logger.info(f"Baza {self.baza.sciezka} jest pusta, stan zostanie wczytany z innego zapisu")
+            return False
+
+        await self._ustaw_stany(stany, zreplikowane=False)
+        for serwer in stany.keys() & self._zmiany_bazy.keys():  # Wczytane stany są już zapisane w bazie w całości
+            self._zmiany_bazy[serwer] = False
+        logger.info(f"Pomyślnie wczytano stan z bazy {self.baza.sciezka} (spisy: {len(stany)})")
+        for serwer in stany:
+            self.autozapis.zglos_zmiane(serwer)
+        return True
+
+    @staticmethod
+    def _odtworz_spis(punkt_kontrolny: bytes | StanBota, segmenty: list[bytes]) -> StanBota:
+        """Wczytuje stan spisu z punktu kontrolnego i nanosi na niego segmenty dziennika (od najnowszego).
+        Nie korzysta z pętli zdarzeń, więc może być wykonywane w osobnym wątku."""
+        if isinstance(punkt_kontrolny, StanBota):
+            stan = punkt_kontrolny
+        else:
+            stan = _wczytaj_stan(punkt_kontrolny)
+        for dane in reversed(segmenty):  # Odtwarzanie zmian w kolejności ich zapisania
+            stan.ostatni_zapis, segment = _wczytaj_segment(dane)
+            stan.odtworz(segment)
+        if stan.segmenty_dziennika is not None:  # Kolejne segmenty mogą być dopisywane do punktu kontrolnego
+            stan.segmenty_dziennika = len(segmenty)
+        stan.harmonogram.zaplanuj_wiele(stan.lista_zadan)
+        return stan
 
     async def wczytaj(self) -> bool:
-        """Wczytuje stan bota z kanału prywatnego twórcy bota"""
+        """Wczytuje stany wszystkich spisów z kanału prywatnego twórcy bota.
+        Dla każdego spisu odczytywany jest jego ostatni punkt kontrolny oraz wszystkie późniejsze segmenty
+        dziennika zmian. Listę spisów serwerów zawiera punkt kontrolny głównego spisu."""
         try:
-            ostatnia_wiadomosc = (await self.backup_kanal.history(limit=1).flatten())[0]
-            if len(ostatnia_wiadomosc.attachments) != 1:
-                logger.warning(f"Ostatnia wiadomość na kanale {self.backup_kanal!r} miała złą ilość załączników, "
+            segmenty: dict[int | None, list[discord.Attachment]] = {}  # Od najnowszego do najstarszego
+            punkty_kontrolne: dict[int | None, discord.Attachment | StanBota] = {}
+            async for wiadomosc in self.backup_kanal.history(limit=None):
+                if len(wiadomosc.attachments) != 1:
+                    continue
+                zalacznik = wiadomosc.attachments[0]
+                if (rozpoznany := _rozpoznaj_plik(zalacznik.filename)) is None:
+                    continue
+                prefiks, serwer, _ = rozpoznany
+                if serwer in punkty_kontrolne:  # Starsze zapisy spisu, który został już odnaleziony
+                    continue
+                if prefiks == PREFIKS_DZIENNIKA:
+                    segmenty.setdefault(serwer, []).append(zalacznik)
+                    continue
+                if serwer is None:  # Główny spis jest potrzebny od razu, aby poznać listę pozostałych spisów
+                    dane = await pobierz_zapis(self.backup_kanal, zalacznik)
+                    punkty_kontrolne[None] = await asyncio.to_thread(_wczytaj_stan, dane)
+                else:
+                    punkty_kontrolne[serwer] = zalacznik
+                if None in punkty_kontrolne \
+                        and punkty_kontrolne[None].serwery_ze_spisem <= punkty_kontrolne.keys() - {None}:
+                    break
+            if None not in punkty_kontrolne:
+                logger.warning(f"Na kanale {self.backup_kanal!r} nie znaleziono pełnego zapisu stanu, "
                                f"porzucono wczytywanie stanu!")
+                if None not in self.stany:
+                    self.zmien_stan(StanBota())
                 return False
-            dane = await ostatnia_wiadomosc.attachments[0].read()
-            self.stan = pickle.loads(dane, fix_imports=False)
-
-            # Usuń zadania z przeszłości
-            for zadanie in list(self.stan.lista_zadan):
-                if zadanie.termin_usuniecia < datetime.now():
-                    self.stan.lista_zadan.remove(zadanie)
 
-            logger.info(f"Pomyślnie wczytano backup z {self.stan.ostatni_zapis.strftime(PROSTY_FORMAT_DATY)} "
-                        f"z kanału {self.backup_kanal!r}")
-            logger.debug(f"Zapisane dane: {self.stan!r}")
+            stany = {}
+            for serwer, punkt in punkty_kontrolne.items():
+                if not isinstance(punkt, StanBota):
+                    punkt = await pobierz_zapis(self.backup_kanal, punkt)
+                dane_segmentow = [await pobierz_zapis(self.backup_kanal, zalacznik)
+                                  for zalacznik in segmenty.get(serwer, [])]
+                # Deserializacja i odtwarzanie zmian w osobnym wątku - nowy stan nie jest jeszcze nigdzie używany
+                stany[serwer] = await asyncio.to_thread(self._odtworz_spis, punkt, dane_segmentow)
+            for serwer in (segmenty.keys() | stany[None].serwery_ze_spisem) - stany.keys():
+                logger.warning(f"Nie znaleziono punktu kontrolnego spisu serwera {serwer}, pominięto jego zmiany!")
+            await self._ustaw_stany(stany, zreplikowane=True)
+
+            glowny = self.stany[None]
+            logger.info(f"Pomyślnie wczytano backup z {glowny.ostatni_zapis.strftime(PROSTY_FORMAT_DATY)} "
+                        f"z kanału {self.backup_kanal!r} (spisy: {len(stany)}, "
+                        f"segmenty dziennika: {sum(map(len, segmenty.values()))})")
+            if logger.isEnabledFor(DEBUG):
+                logger.debug(f"Zapisane dane: {self.stany!r}")
             return True
-        except (pickle.PickleError, IndexError) as e:
-            logger.exception("Nie udało się wczytać pliku pickle!", exc_info=e)
-            self.stan = StanBota()
+        except (pickle.PickleError, discord.HTTPException, *BLEDY_KOPII) as e:
+            logger.exception("Nie udało się wczytać zapisu stanu!", exc_info=e)
+            if None not in self.stany:
+                self.zmien_stan(StanBota())
+            return False
+
+    async def _ustaw_stany(self, stany: dict[int | None, StanBota], zreplikowane: bool):
+        """Zastępuje stany wszystkich spisów wczytanymi stanami, aktualizując lokalne migawki.
+        Stany niezreplikowane (niezgodne z najnowszym zapisem na kanale) zostaną na niego wysłane w całości."""
+        for serwer in self.stany.keys() - stany.keys():  # Spisy, których nie ma w zapisie, przestają działać
+            self.stany.pop(serwer).harmonogram.zatrzymaj()
+        for serwer, stan in stany.items():
+            self.zmien_stan(stan, serwer)  # Zadania z przeszłości zostaną usunięte przez harmonogram
+            if not zreplikowane:
+                stan.zapisana_wersja = -1
+                stan.segmenty_dziennika = None
+            if self.magazyn is not None:  # Lokalna migawka musi odpowiadać wczytanemu stanowi
+                if await self._zapisz_lokalnie(serwer, stan.migawka()) is not None and zreplikowane:
+                    await self._oznacz_zreplikowana(serwer)
+
+    async def _wpisy_kanalu(self) -> AsyncIterator[tuple[int | None, WpisKatalogu]]:
+        """Generuje wpisy katalogu dla wszystkich zapisów w historii kanału, bez pobierania ich zawartości"""
+        async for wiadomosc in self.backup_kanal.history(limit=None):
+            if len(wiadomosc.attachments) != 1:
+                continue
+            if (rozpoznany := _rozpoznaj_plik(wiadomosc.attachments[0].filename)) is None:
+                continue
+            prefiks, serwer, znacznik_czasu = rozpoznany
+            yield serwer, WpisKatalogu(znacznik_czasu, wiadomosc.id, prefiks == PREFIKS_PUNKTU_KONTROLNEGO)
+
+    async def _pobierz_z_katalogu(self, serwer: int | None, znacznik_czasu: int) -> StanBota | None:
+        """Pobiera z kanału jeden punkt kontrolny spisu i późniejsze segmenty dziennika wskazane przez katalog
+        dla podanej chwili, a następnie odtwarza z nich stan. Zwraca None, jeśli katalog nie zawiera takiego zapisu."""
+        if (znalezione := self.katalog.znajdz(serwer, znacznik_czasu)) is None:
+            return None
+        punkt, segmenty = znalezione
+        pobrane = []
+        for wpis in (punkt, *reversed(segmenty)):  # _odtworz_spis przyjmuje segmenty od najnowszego
+            wiadomosc = await self.backup_kanal.fetch_message(wpis.wiadomosc)
+            pobrane.append(await pobierz_zapis(self.backup_kanal, wiadomosc.attachments[0]))
+        return await asyncio.to_thread(self._odtworz_spis, pobrane[0], pobrane[1:])
+
+    async def przywroc(self, chwila: datetime) -> bool:
+        """Przywraca stany wszystkich spisów z podanej chwili na podstawie katalogu zapisów, pobierając dla każdego
+        spisu jedynie potrzebny punkt kontrolny i segmenty dziennika. Katalog jest budowany z historii kanału przy
+        pierwszym użyciu. Przywrócony stan zostanie zapisany jako najnowszy, aby był wczytywany przy starcie."""
+        try:
+            if not self.katalog.zbudowany and not self.katalog.wczytaj():  # Mały plik, wczytywany jednorazowo
+                await self.katalog.zbuduj(self._wpisy_kanalu())
+            znacznik_czasu = round(chwila.timestamp())  # Zaokrąglany tak samo jak w nazwach plików zapisów
+            if (glowny := await self._pobierz_z_katalogu(None, znacznik_czasu)) is None:
+                logger.warning(f"Brak pełnego zapisu stanu sprzed {chwila.strftime(PROSTY_FORMAT_DATY)}, "
+                               f"porzucono przywracanie stanu!")
+                return False
+            stany = {None: glowny}
+            for serwer in glowny.serwery_ze_spisem:
+                if (stan := await self._pobierz_z_katalogu(serwer, znacznik_czasu)) is None:
+                    logger.warning(f"Brak punktu kontrolnego spisu serwera {serwer} sprzed "
+                                   f"{chwila.strftime(PROSTY_FORMAT_DATY)}, pominięto ten spis!")
+                else:
+                    stany[serwer] = stan
+        except (pickle.PickleError, discord.HTTPException, *BLEDY_KOPII) as e:
+            logger.exception("Nie udało się przywrócić stanu z katalogu zapisów!", exc_info=e)
             return False
-        finally:  # Zawsze przekalkuluj hash stanu
-            self.hash_stanu = hash(self.stan)
+
+        await self._ustaw_stany(stany, zreplikowane=False)
+        logger.info(f"Pomyślnie przywrócono stan z {glowny.ostatni_zapis.strftime(PROSTY_FORMAT_DATY)} "
+                    f"(spisy: {len(stany)})")
+        if self.autosave:
+            await self.zapisz()
+        return True
 
     async def _pobierz_informacje_z_githuba(self) -> None:
         """Pobiera informacje o ostatnich zmianach z GitHuba i zapisuje je do zmiennej OSTATNI_COMMIT"""
@@ -163,9 +795,11 @@ class SpisBot(discord.Bot):
         self.owner_id = wlasciciel.id
         self.backup_kanal = wlasciciel.dm_channel or await wlasciciel.create_dm()
         if self.autosave:
-            await self.wczytaj()  # Próba wczytania
+            if not await self.wczytaj_z_bazy() and not await self.wczytaj_lokalnie():
+                await self.wczytaj()  # Próba wczytania z kanału
+            self.autozapis.uruchom()
         else:
-            self.stan = StanBota()
+            self.zmien_stan(StanBota())
 
         self.invite_link = f"https://discord.com/api/oauth2/authorize?client_id={self.application_id}" \
                            f"&permissions=277025672192&scope=bot%20applications.commands"
@@ -185,6 +819,15 @@ class SpisBot(discord.Bot):
 
     async def close(self):
         """Zamyka bota zapisując jego stan"""
+        self.autozapis.zatrzymaj()
         if self.autosave:
             await self.zapisz()  # Próba zapisu
+        for stan in self.stany.values():
+            stan.harmonogram.zatrzymaj()
+        if self.baza is not None:  # Zapis zmian oczekujących na zapis w bazie
+            if self._zapis_bazy is not None:
+                await self._zapis_bazy
+            if self._zmiany_bazy:
+                await self._zapisz_w_bazie()
+            await asyncio.to_thread(self.baza.zamknij)
         await super().close()
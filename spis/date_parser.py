@@ -21,6 +21,7 @@
 #  SOFTWARE.
 
 import re
+from collections import OrderedDict
 from datetime import datetime, timedelta, date
 from logging import getLogger
 
@@ -31,6 +32,12 @@ __all__ = "PolskiDateParser", "ParserError"
 logger = getLogger(__name__)
 
 JUTRO_REGEX = re.compile("jutro", re.IGNORECASE)  # Regex do znajdowania słowa "jutro" w tekście
+ROZMIAR_PAMIECI_PARSERA = 256  # Ilość różnych tekstów, których wyniki parsowania są pamiętane
+# Wyrażenia szybkiej ścieżki parsowania, obsługującej najczęściej wpisywane formaty bez pomocy dateutil
+CZAS_REGEX = re.compile(r"([0-9]{1,2}):([0-9]{1,2})(?::([0-9]{2}))?")  # HH:MM lub HH:MM:SS
+DATA_REGEX = re.compile(r"([0-9]{1,2})\.([0-9]{1,2})(?:\.([0-9]{2}|[0-9]{4}))?")  # DD.MM lub DD.MM.RR(RR)
+DZIEN_REGEX = re.compile(r"[0-9]{1,2}")  # Sam dzień miesiąca, np. w "19 X"
+_BRAK = object()  # Oznacza brak wpisu w pamięci parsera (None jest poprawnym, zapamiętanym wynikiem)
 
 
 class _PolskiDateParser(parserinfo, parser):
@@ -65,6 +72,75 @@ class _PolskiDateParser(parserinfo, parser):
     def __init__(self):
         parserinfo.__init__(self, True, False)  # Poprawne ustawienie formatu DD.MM.RR
         parser.__init__(self, self)  # Ustawienie parserinfo na self
+        # Pamięć podręczna (LRU) surowych wyników parsowania, ważna tylko jednego dnia ze względu na słowo "jutro"
+        self._pamiec: OrderedDict[str, object] = OrderedDict()
+        self._dzien_pamieci: date | None = None
+        self.trafienia = 0
+        self.chybienia = 0
+
+    def _parse_z_pamiecia(self, timestr: str):
+        """Zwraca surowy wynik _szybki_parse lub _parse, korzystając z pamięci,
+        jeśli ten sam tekst był już dzisiaj parsowany.
+        Zapamiętywana jest jedynie część niezależna od aktualnej godziny - rozwiązywanie dat względnych
+        (np. godziny, która już dzisiaj minęła) odbywa się w _build_naive przy każdym wywołaniu."""
+        dzien = date.today()
+        if dzien != self._dzien_pamieci:  # Północ unieważnia całą pamięć
+            self._pamiec.clear()
+            self._dzien_pamieci = dzien
+
+        klucz = " ".join(timestr.split())  # Normalizacja białych znaków, które i tak są ignorowane przez _parse
+        if (res := self._pamiec.get(klucz, _BRAK)) is not _BRAK:
+            self._pamiec.move_to_end(klucz)
+            self.trafienia += 1
+        else:
+            # Zamiana "jutro" na odpowiednią datę z zachowaniem pozostałych parametrów
+            jutro = (dzien + timedelta(days=1)).strftime("%d.%m.%y")
+            tekst = JUTRO_REGEX.sub(jutro, klucz)
+            if (res := self._szybki_parse(tekst)) is None:  # Nietypowe teksty obsługuje pełny parser z dateutil
+                res = self._parse(tekst)[0]  # Ignorujemy resztę zwracanego tuple
+            self._pamiec[klucz] = res
+            if len(self._pamiec) > ROZMIAR_PAMIECI_PARSERA:
+                self._pamiec.popitem(last=False)
+            self.chybienia += 1
+        logger.debug(f"Pamięć parsera dat: {self.trafienia} trafień, {self.chybienia} chybień")
+        return res
+
+    def _szybki_parse(self, timestr: str):
+        """Szybka ścieżka parsowania dla typowych tekstów: nazw dni tygodnia i miesięcy (również rzymskich),
+        DD.MM, DD.MM.RR, DD.MM.RRRR, samego dnia miesiąca oraz HH:MM i HH:MM:SS, oddzielonych spacjami lub przecinkami.
+        Zwraca taki sam wynik jak _parse lub None, jeśli tekst nie pasuje do żadnego z tych formatów.
+        W przeciwieństwie do dateutil, które traktuje DD.MM jako liczbę zmiennoprzecinkową i gubi miesiąc,
+        DD.MM jest tutaj interpretowane tak samo jak DD/MM."""
+        res = self._result()
+        for token in timestr.replace(",", " ").split():
+            if m := CZAS_REGEX.fullmatch(token):
+                if res.hour is not None:
+                    return None
+                res.hour, res.minute = int(m[1]), int(m[2])
+                if m[3] is not None:
+                    res.second, res.microsecond = int(m[3]), 0
+            elif m := DATA_REGEX.fullmatch(token):
+                dzien, miesiac = int(m[1]), int(m[2])
+                if res.day is not None or res.month is not None or not (0 < dzien <= 31 and 0 < miesiac <= 12):
+                    return None  # Inna kolejność pól niż DD.MM.RR jest zostawiona dla dateutil
+                res.day, res.month = dzien, miesiac
+                if m[3] is not None:
+                    res.year = self.convertyear(int(m[3]), len(m[3]) == 4)
+            elif DZIEN_REGEX.fullmatch(token):
+                if res.day is not None or not 0 < (dzien := int(token)) <= 31:
+                    return None
+                res.day = dzien
+            elif (dzien_tygodnia := self.weekday(token)) is not None:
+                if res.weekday is not None:
+                    return None
+                res.weekday = dzien_tygodnia
+            elif (miesiac := self.month(token)) is not None:
+                if res.month is not None:
+                    return None
+                res.month = miesiac
+            else:
+                return None
+        return res
 
     # noinspection PyMethodMayBeStatic
     def _build_naive(self, res, default: datetime) -> tuple[datetime, datetime]:
@@ -109,13 +185,15 @@ class _PolskiDateParser(parserinfo, parser):
     def parse(self, timestr, default=None, ignoretz=False, tzinfos=None, **kwargs) -> tuple[datetime, datetime]:
         """Nadpisanie parser.parse - zwraca dwie daty zamiast jednej.
         Pierwszy datetime to prawdziwa data podana przez użytkownika, a drugi - zmodyfikowana data usunięcia zadania."""
-        # Zamiana "jutro" na odpowiednią datę z zachowaniem pozostałych parametrów
-        timestr = JUTRO_REGEX.sub((date.today() + timedelta(days=1)).strftime("%d.%m.%y"), timestr)
-
         # Kod skopiowany w większości z oryginalnej implementacji
         if default is None:
             default = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        res = self._parse(timestr, **kwargs)[0]  # Ignorujemy resztę zwracanego tuple
+        if kwargs:  # Niestandardowe opcje parsowania zmieniają wynik, więc pamięć nie jest wtedy używana
+            # Zamiana "jutro" na odpowiednią datę z zachowaniem pozostałych parametrów
+            timestr = JUTRO_REGEX.sub((date.today() + timedelta(days=1)).strftime("%d.%m.%y"), timestr)
+            res = self._parse(timestr, **kwargs)[0]  # Ignorujemy resztę zwracanego tuple
+        else:
+            res = self._parse_z_pamiecia(timestr)
         if res is None:
             raise ParserError("Unknown string format: %s", timestr)
         if len(res) == 0:
@@ -0,0 +1,74 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+__all__ = "Dziennik", "DODANIE", "EDYCJA", "USUNIECIE", "WYGASNIECIE", "STYL"
+
+# Rodzaje wpisów w dzienniku, celowo jednoznakowe, aby zapisany dziennik był jak najmniejszy
+DODANIE = "d"  # (DODANIE, zadanie)
+EDYCJA = "e"  # (EDYCJA, id, zadanie po edycji)
+USUNIECIE = "u"  # (USUNIECIE, id)
+WYGASNIECIE = "w"  # (WYGASNIECIE, id)
+STYL = "s"  # (STYL, id użytkownika, styl)
+
+
+class Dziennik:
+    """Przechowuje zmiany stanu bota od ostatniego zapisu, dzięki czemu zapis nie musi zawierać całego stanu.
+    Liczniki (np. uzycia_spis) nie są zapisywane jako osobne wpisy - pamiętana jest jedynie ich ostatnia wartość."""
+
+    def __init__(self):
+        self.wpisy: list[tuple] = []
+        self.liczniki: dict[str, int] = {}
+        self.odbiorca: Dziennik | None = None  # Drugi dziennik otrzymujący kopię każdej zmiany (np. dla bazy SQLite)
+
+    def __len__(self) -> int:
+        """Zwraca ilość zmian zapisanych w dzienniku"""
+        return len(self.wpisy) + len(self.liczniki)
+
+    def dodaj_wpis(self, *wpis):
+        """Dopisuje zmianę na koniec dziennika"""
+        self.wpisy.append(wpis)
+        if self.odbiorca is not None:
+            self.odbiorca.wpisy.append(wpis)
+
+    def ustaw_licznik(self, nazwa: str, wartosc: int):
+        """Zapamiętuje aktualną wartość licznika, nadpisując poprzednią"""
+        self.liczniki[nazwa] = wartosc
+        if self.odbiorca is not None:
+            self.odbiorca.liczniki[nazwa] = wartosc
+
+    def segment(self) -> tuple[list[tuple], dict[str, int]]:
+        """Zwraca kopię aktualnej zawartości dziennika, gotową do zapisania"""
+        return list(self.wpisy), dict(self.liczniki)
+
+    def zatwierdz(self, segment: tuple[list[tuple], dict[str, int]]):
+        """Usuwa z dziennika zmiany zawarte w pomyślnie zapisanym segmencie.
+        Zmiany dokonane w trakcie zapisu pozostają w dzienniku do następnego zapisu."""
+        wpisy, liczniki = segment
+        del self.wpisy[:len(wpisy)]
+        for nazwa, wartosc in liczniki.items():
+            if self.liczniki.get(nazwa) == wartosc:
+                del self.liczniki[nazwa]
+
+    def wyczysc(self):
+        """Usuwa wszystkie zmiany z dziennika, np. po zapisaniu pełnego stanu"""
+        self.wpisy.clear()
+        self.liczniki.clear()
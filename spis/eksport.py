@@ -0,0 +1,150 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import csv
+import json
+from datetime import datetime, timezone
+from logging import getLogger
+from tempfile import SpooledTemporaryFile
+from typing import Callable, Iterable, Iterator
+
+from .zadanie import Ogloszenie, ZadanieDomowe
+
+__all__ = "FORMATY_EKSPORTU", "eksportuj"
+logger = getLogger(__name__)
+
+LIMIT_PAMIECI_EKSPORTU = 1024 * 1024  # Po przekroczeniu tylu bajtów eksport trafia do pliku tymczasowego na dysku
+LIMIT_DLUGOSCI_LINII_ICS = 75  # Maksymalna długość linii iCalendar w bajtach, bez znaków końca linii
+FORMAT_DATY_ICS = "%Y%m%dT%H%M%S"
+# Formaty zrozumiałe dla PolskiDateParser, aby eksport dało się ponownie zaimportować
+FORMAT_TERMINU_CSV = "%d.%m.%Y %H:%M"
+FORMAT_DNIA_CSV = "%d.%m.%Y"
+
+
+class _Echo:
+    """Udaje plik dla csv.writer, zwracając zamiast zapisywać - pozwala generować CSV wiersz po wierszu"""
+
+    # noinspection PyMethodMayBeStatic
+    def write(self, tekst: str) -> str:
+        return tekst
+
+
+def _termin_csv(termin: datetime) -> str:
+    """Formatuje termin tak, jak wpisałby go użytkownik - bez godziny, jeśli nie była podana"""
+    return termin.strftime(FORMAT_TERMINU_CSV if termin.hour or termin.minute else FORMAT_DNIA_CSV)
+
+
+def _eksport_csv(zadania: Iterable[Ogloszenie]) -> Iterator[str]:
+    """Generuje kolejne wiersze CSV w formacie akceptowanym przez /dodaj import (ogłoszenia nie mają przedmiotu)"""
+    pisarz = csv.writer(_Echo())
+    yield pisarz.writerow(("id", "przedmiot", "termin", "opis", "autor"))
+    for z in zadania:
+        if isinstance(z, ZadanieDomowe):
+            yield pisarz.writerow((z.id, z.przedmiot.nazwa, _termin_csv(z.prawdziwy_termin), z.tresc, z.autor))
+        else:
+            yield pisarz.writerow((z.id, "", _termin_csv(z.termin_usuniecia), z.tresc, z.autor))
+
+
+def _eksport_jsonl(zadania: Iterable[Ogloszenie]) -> Iterator[str]:
+    """Generuje po jednym obiekcie JSON w linii dla każdego zadania i ogłoszenia"""
+    for z in zadania:
+        obiekt = {
+            "id": z.id,
+            "rodzaj": "zadanie" if isinstance(z, ZadanieDomowe) else "ogloszenie",
+            "tresc": z.tresc,
+            "autor": z.autor,
+            "utworzono": z.utworzono.isoformat(),
+            "termin_usuniecia": z.termin_usuniecia.isoformat(),
+        }
+        if isinstance(z, ZadanieDomowe):
+            obiekt["przedmiot"] = z.przedmiot.nazwa
+            obiekt["termin"] = z.prawdziwy_termin.isoformat()
+        yield json.dumps(obiekt, ensure_ascii=False) + "\n"
+
+
+def _zawin_ics(linia: str) -> str:
+    """Zawija linię iCalendar dłuższą niż 75 bajtów zgodnie z RFC 5545, nie rozdzielając znaków UTF-8"""
+    if len(linia.encode()) <= LIMIT_DLUGOSCI_LINII_ICS:
+        return linia + "\r\n"
+    czesci, poczatek, dlugosc = [], 0, 0
+    for i, znak in enumerate(linia):
+        rozmiar = len(znak.encode())
+        if dlugosc + rozmiar > LIMIT_DLUGOSCI_LINII_ICS:
+            czesci.append(linia[poczatek:i])
+            poczatek, dlugosc = i, 1  # Kolejne linie zaczynają się od spacji
+        dlugosc += rozmiar
+    czesci.append(linia[poczatek:])
+    return "\r\n ".join(czesci) + "\r\n"
+
+
+def _escapuj_ics(tekst: str) -> str:
+    """Dodaje sekwencje ucieczki wymagane w wartościach tekstowych iCalendar"""
+    return tekst.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _eksport_ics(zadania: Iterable[Ogloszenie]) -> Iterator[str]:
+    """Generuje kalendarz iCalendar z wydarzeniem dla każdego zadania (w jego terminie)
+    i ogłoszenia (w terminie jego usunięcia), w formacie akceptowanym przez /dodaj import"""
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//SpisZadanDomowych//PL\r\n"
+    znacznik = datetime.now(timezone.utc).strftime(FORMAT_DATY_ICS + "Z")
+    for z in zadania:
+        if isinstance(z, ZadanieDomowe):
+            termin = z.prawdziwy_termin
+            kategoria = z.przedmiot.nazwa
+        else:
+            termin = z.termin_usuniecia
+            kategoria = "Ogłoszenie"
+        if termin.hour == 0 and termin.minute == 0:  # Zadania bez podanej godziny są wydarzeniami całodniowymi
+            start = f"DTSTART;VALUE=DATE:{termin.strftime('%Y%m%d')}"
+        else:
+            start = f"DTSTART:{termin.strftime(FORMAT_DATY_ICS)}"
+        yield (f"BEGIN:VEVENT\r\nUID:{z.id}@spis\r\nDTSTAMP:{znacznik}\r\n{start}\r\n"
+               f"CREATED:{z.utworzono.astimezone(timezone.utc).strftime(FORMAT_DATY_ICS + 'Z')}\r\n"
+               + _zawin_ics(f"CATEGORIES:{_escapuj_ics(kategoria)}")
+               + _zawin_ics(f"SUMMARY:{_escapuj_ics(z.tresc)}")
+               + "END:VEVENT\r\n")
+    yield "END:VCALENDAR\r\n"
+
+
+# Nazwa formatu -> (rozszerzenie pliku, funkcja generująca kolejne fragmenty dokumentu)
+FORMATY_EKSPORTU: dict[str, tuple[str, Callable[[Iterable[Ogloszenie]], Iterator[str]]]] = {
+    "iCalendar (.ics)": (".ics", _eksport_ics),
+    "JSON Lines (.jsonl)": (".jsonl", _eksport_jsonl),
+    "CSV (.csv)": (".csv", _eksport_csv),
+}
+
+
+def eksportuj(nazwa_formatu: str, zadania: Iterable[Ogloszenie]) -> tuple[SpooledTemporaryFile, str]:
+    """Zapisuje zadania w podanym formacie do bufora w pamięci, który po przekroczeniu LIMIT_PAMIECI_EKSPORTU
+    przenoszony jest na dysk. Dokument nie jest nigdy sklejany w jeden string - fragmenty są kodowane i zapisywane
+    na bieżąco. Zwraca bufor ustawiony na początek danych (do zamknięcia przez wywołującego) i rozszerzenie pliku."""
+    rozszerzenie, funkcja = FORMATY_EKSPORTU[nazwa_formatu]
+    bufor = SpooledTemporaryFile(max_size=LIMIT_PAMIECI_EKSPORTU)
+    try:
+        for fragment in funkcja(zadania):
+            bufor.write(fragment.encode())
+        logger.debug(f"Wyeksportowano spis do formatu {nazwa_formatu!r} ({bufor.tell()} B)")
+        bufor.seek(0)
+    except BaseException:
+        bufor.close()
+        raise
+    return bufor, rozszerzenie
@@ -0,0 +1,316 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import json
+import struct
+from dataclasses import fields
+from datetime import datetime
+from enum import Enum
+from functools import wraps
+from logging import getLogger
+from typing import Iterable
+
+from .dziennik import *
+from .przedmiot import Przedmioty
+from .style import Styl
+from .zadanie import Ogloszenie, ZadanieDomowe
+
+__all__ = "czy_format_binarny", "zserializuj_stan", "zserializuj_segment", "wczytaj_stan", "wczytaj_segment", \
+    "zapisz_styl", "wczytaj_styl"
+logger = getLogger(__name__)
+
+MAGIA = b"SPSB"  # Początek każdego zapisu w formacie binarnym, odróżnia go od zapisów pickle
+WERSJA_FORMATU = 1
+PREAMBULA = struct.Struct("<4sHI")  # Magia, wersja formatu, długość nagłówka JSON w bajtach
+BRAK = 0xFFFFFFFF  # Brak wartości w kolumnach indeksów (np. wpis dziennika bez zadania)
+OGLOSZENIE = 0xFF  # Kod przedmiotu oznaczający ogłoszenie (bez przedmiotu) zamiast zadania domowego
+RODZAJ_STANU = "stan"
+RODZAJ_SEGMENTU = "segment"
+
+# Schemat tabel: nazwa kolumny i kod formatu struct jednej wartości (zawsze little-endian)
+KOLUMNY_ZADAN = (
+    ("przedmiot", "B"),  # Indeks w tabeli przedmiotów z nagłówka, OGLOSZENIE dla ogłoszeń
+    ("termin_usuniecia", "I"),  # Znaczniki czasu w sekundach (bez znaku, do 2106 roku)
+    ("utworzono", "I"),
+    ("prawdziwy_termin", "I"),  # 0 dla ogłoszeń
+    ("autor", "I"),  # Indeks w tabeli autorów z nagłówka
+    ("tresc", "I"),  # Indeksy w tabeli napisów
+    ("id", "I"),
+)
+KOLUMNY_WPISOW = (
+    ("rodzaj", "B"),  # Kod znaku rodzaju wpisu dziennika
+    ("id", "I"),  # Indeks ID zadania w tabeli napisów
+    ("zadanie", "I"),  # Indeks wiersza w tabeli zadań
+    ("styl", "I"),  # Indeks stylu w nagłówku
+)
+# Pola stanu bota zapisywane w nagłówku, wszystkie pozostałe pola muszą zostać obsłużone osobno
+POLA_STANU = frozenset({"lista_zadan", "style", "ostatni_zapis", "uzycia_spis", "nastepne_id", "edytor",
+                        "serwery_ze_spisem"})
+KLASY_STYLOW: dict[str, type[Styl]] = {}  # Nazwa klasy -> klasa, uzupełniane przy pierwszym użyciu
+
+
+class _Pisarz:
+    """Zbiera tabele zadań i napisów zapisu, a następnie skleja je w jeden zapis razem z nagłówkiem"""
+
+    def __init__(self, rodzaj: str):
+        self.naglowek: dict = {"rodzaj": rodzaj, "przedmioty": [p.name for p in Przedmioty], "tabele": []}
+        self.napisy: dict[str, int] = {}
+        self.autorzy: dict[int, int] = {}  # ID autora -> indeks w tabeli autorów
+        self.kody_przedmiotow = {p: i for i, p in enumerate(Przedmioty)}
+        self.zadania: list[Ogloszenie] = []
+        self.kolumny: list[bytes] = []
+
+    def napis(self, tekst: str) -> int:
+        """Zwraca indeks napisu w tabeli napisów, dodając go, jeśli nie ma go jeszcze w tabeli"""
+        return self.napisy.setdefault(tekst, len(self.napisy))
+
+    def zadanie(self, zadanie: Ogloszenie) -> int:
+        """Dodaje zadanie lub ogłoszenie do tabeli zadań i zwraca numer jego wiersza"""
+        self.zadania.append(zadanie)
+        return len(self.zadania) - 1
+
+    def tabela(self, nazwa: str, schemat: tuple[tuple[str, str], ...], kolumny: Iterable[Iterable[int]]):
+        """Pakuje kolumny tabeli i opisuje je w nagłówku, tabele zapisywane są w kolejności dodania"""
+        wiersze = None
+        for (_, kod), wartosci in zip(schemat, kolumny):
+            wartosci = list(wartosci)
+            wiersze = len(wartosci)
+            self.kolumny.append(struct.pack(f"<{wiersze}{kod}", *wartosci))
+        self.naglowek["tabele"].append(nazwa)
+        self.naglowek[nazwa] = {"wiersze": wiersze or 0, "kolumny": [list(k) for k in schemat]}
+
+    def _tabela_zadan(self):
+        """Pakuje tabelę wszystkich dodanych zadań kolumnami"""
+        zadania = self.zadania
+        domowe = [isinstance(z, ZadanieDomowe) for z in zadania]
+        autorzy = self.autorzy
+        self.tabela("zadania", KOLUMNY_ZADAN, (
+            [self.kody_przedmiotow[z.przedmiot] if d else OGLOSZENIE for z, d in zip(zadania, domowe)],
+            [z.termin_usuniecia_ts for z in zadania],
+            [z.utworzono_ts for z in zadania],
+            [z.prawdziwy_termin_ts if d else 0 for z, d in zip(zadania, domowe)],
+            [autorzy.setdefault(z.autor, len(autorzy)) for z in zadania],
+            [self.napis(z.tresc) for z in zadania],
+            [self.napis(z.id) for z in zadania],
+        ))
+        self.naglowek["autorzy"] = list(autorzy)
+
+    def wynik(self) -> bytes:
+        """Skleja preambułę, nagłówek, kolumny tabel i tabelę napisów w jeden zapis"""
+        self._tabela_zadan()
+        # Tabela napisów: kolumna długości w bajtach, a następnie wszystkie napisy w UTF-8 jeden po drugim
+        zakodowane = [n.encode() for n in self.napisy]
+        self.kolumny.append(struct.pack(f"<{len(zakodowane)}I", *map(len, zakodowane)))
+        self.kolumny.append(b"".join(zakodowane))
+        self.naglowek["napisy"] = {"ilosc": len(zakodowane), "kolumny": [["dlugosc", "I"]]}
+        naglowek = json.dumps(self.naglowek, ensure_ascii=False, separators=(",", ":")).encode()
+        return b"".join((PREAMBULA.pack(MAGIA, WERSJA_FORMATU, len(naglowek)), naglowek, *self.kolumny))
+
+
+def zapisz_styl(styl: Styl) -> dict:
+    """Zamienia styl na obiekt JSON z nazwą klasy i wartościami pól (członkowie enumeracji jako nazwy)"""
+    return {"klasa": type(styl).__name__, **{
+        pole.name: (w.name if isinstance(w := getattr(styl, pole.name), Enum) else w) for pole in fields(styl)
+    }}
+
+
+def wczytaj_styl(dane: dict) -> Styl:
+    """Odtwarza styl zapisany przez zapisz_styl, pomijając nieznane pola"""
+    if not KLASY_STYLOW:
+        KLASY_STYLOW.update((k.__name__, k) for k in Styl.__subclasses__())
+    klasa = KLASY_STYLOW[dane["klasa"]]
+    wartosci = {}
+    for pole in fields(klasa):
+        if pole.name in dane:
+            typ = type(pole.default)
+            wartosci[pole.name] = typ[dane[pole.name]] if issubclass(typ, Enum) else dane[pole.name]
+    return klasa(**wartosci)
+
+
+def zserializuj_stan(pola: dict) -> bytes:
+    """Zapisuje stan bota (pola zwracane przez StanBota.__getstate__) w formacie binarnym"""
+    if nieznane := pola.keys() - POLA_STANU:
+        raise ValueError(f"Pola stanu bota nieobsługiwane przez format binarny: {sorted(nieznane)}")
+    pisarz = _Pisarz(RODZAJ_STANU)
+    for zadanie in pola["lista_zadan"]:
+        pisarz.zadanie(zadanie)
+    pisarz.naglowek["style"] = [[u, zapisz_styl(s)] for u, s in pola["style"].items()]
+    pisarz.naglowek["stan"] = {
+        "ostatni_zapis": pola["ostatni_zapis"].isoformat(),
+        "uzycia_spis": pola["uzycia_spis"],
+        "nastepne_id": pola["nastepne_id"],
+        "edytor": pola["edytor"],
+        "serwery_ze_spisem": sorted(pola["serwery_ze_spisem"]),
+    }
+    return pisarz.wynik()
+
+
+def zserializuj_segment(ostatni_zapis: datetime, segment: tuple[list[tuple], dict[str, int]]) -> bytes:
+    """Zapisuje segment dziennika zmian (wraz z czasem zapisu) w formacie binarnym"""
+    wpisy, liczniki = segment
+    pisarz = _Pisarz(RODZAJ_SEGMENTU)
+    style = []
+    kolumny = [], [], [], []
+    for rodzaj, *dane in wpisy:
+        id_zadania = zadanie = styl = BRAK
+        if rodzaj == DODANIE:
+            zadanie = pisarz.zadanie(dane[0])
+        elif rodzaj == EDYCJA:
+            id_zadania, zadanie = pisarz.napis(dane[0]), pisarz.zadanie(dane[1])
+        elif rodzaj in (USUNIECIE, WYGASNIECIE):
+            id_zadania = pisarz.napis(dane[0])
+        elif rodzaj == STYL:
+            styl = len(style)
+            style.append([dane[0], zapisz_styl(dane[1])])
+        else:
+            raise ValueError(f"Nieznany rodzaj wpisu w dzienniku: {rodzaj!r}")
+        for kolumna, wartosc in zip(kolumny, (ord(rodzaj), id_zadania, zadanie, styl)):
+            kolumna.append(wartosc)
+    pisarz.tabela("wpisy", KOLUMNY_WPISOW, kolumny)
+    pisarz.naglowek["style"] = style
+    pisarz.naglowek["segment"] = {"ostatni_zapis": ostatni_zapis.isoformat(), "liczniki": liczniki}
+    return pisarz.wynik()
+
+
+def czy_format_binarny(dane: bytes | memoryview) -> bool:
+    """Sprawdza, czy dane są zapisem w formacie binarnym (a nie np. starym zapisem pickle)"""
+    return bytes(dane[:len(MAGIA)]) == MAGIA
+
+
+class _Czytelnik:
+    """Odczytuje nagłówek i tabele zapisu w formacie binarnym bez kopiowania danych (np. z mmap)"""
+
+    def __init__(self, dane: bytes | memoryview, rodzaj: str):
+        magia, wersja, dlugosc = PREAMBULA.unpack_from(dane)
+        if magia != MAGIA or wersja != WERSJA_FORMATU:
+            raise ValueError(f"Nieobsługiwany zapis binarny (wersja {wersja})")
+        self.dane = dane
+        self.pozycja = PREAMBULA.size
+        self.naglowek: dict = json.loads(bytes(self.fragment(dlugosc)))
+        if self.naglowek["rodzaj"] != rodzaj:
+            raise ValueError(f"Oczekiwano zapisu rodzaju {rodzaj!r}, a nie {self.naglowek['rodzaj']!r}")
+        self.przedmioty = [Przedmioty[nazwa] for nazwa in self.naglowek["przedmioty"]]
+
+    def fragment(self, dlugosc: int) -> bytes | memoryview:
+        """Zwraca kolejne dlugosc bajtów zapisu, sprawdzając, czy zapis nie jest ucięty"""
+        fragment = self.dane[self.pozycja:self.pozycja + dlugosc]
+        if len(fragment) != dlugosc:
+            raise ValueError(f"Uszkodzony zapis binarny: ucięty na pozycji {self.pozycja}")
+        self.pozycja += dlugosc
+        return fragment
+
+    def koniec(self):
+        """Sprawdza, czy odczytano cały zapis - nadmiarowe bajty również oznaczają uszkodzenie"""
+        if self.pozycja != len(self.dane):
+            raise ValueError(f"Uszkodzony zapis binarny: {len(self.dane) - self.pozycja} B po końcu danych")
+
+    def kolumna(self, kod: str, wiersze: int) -> tuple:
+        """Odczytuje kolejną kolumnę o podanym formacie"""
+        format_kolumny = f"<{wiersze}{kod}"
+        return struct.unpack(format_kolumny, self.fragment(struct.calcsize(format_kolumny)))
+
+    def tabela(self, nazwa: str) -> dict[str, tuple]:
+        """Odczytuje wszystkie kolumny tabeli opisanej w nagłówku, zwraca je według nazw"""
+        opis = self.naglowek[nazwa]
+        return {nazwa_kolumny: self.kolumna(kod, opis["wiersze"]) for nazwa_kolumny, kod in opis["kolumny"]}
+
+    def napisy(self) -> list[str]:
+        """Odczytuje tabelę napisów, która zawsze znajduje się na końcu zapisu"""
+        dlugosci = self.kolumna("I", self.naglowek["napisy"]["ilosc"])
+        return [str(self.fragment(dlugosc), "utf-8") for dlugosc in dlugosci]
+
+    def zadania(self, kolumny: dict[str, tuple], napisy: list[str]) -> list[Ogloszenie]:
+        """Tworzy zadania i ogłoszenia z kolumn tabeli zadań"""
+        wynik = []
+        przedmioty = self.przedmioty
+        autorzy = self.naglowek["autorzy"]
+        for przedmiot, termin, utworzono, prawdziwy, autor, tresc, id_zadania in zip(
+                *(kolumny[nazwa] for nazwa, _ in KOLUMNY_ZADAN)):
+            if przedmiot != OGLOSZENIE:
+                zadanie = ZadanieDomowe.__new__(ZadanieDomowe)
+                zadanie.__setstate__((termin, napisy[tresc], autorzy[autor], utworzono, napisy[id_zadania],
+                                      przedmioty[przedmiot], prawdziwy))
+            else:
+                zadanie = Ogloszenie.__new__(Ogloszenie)
+                zadanie.__setstate__((termin, napisy[tresc], autorzy[autor], utworzono, napisy[id_zadania]))
+            wynik.append(zadanie)
+        return wynik
+
+
+def _odczytaj(dane: bytes | memoryview, rodzaj: str) \
+        -> tuple[dict, list[Ogloszenie], dict[str, dict[str, tuple]], list[str]]:
+    """Odczytuje zapis danego rodzaju: zwraca nagłówek, zadania, kolumny wszystkich tabel i tabelę napisów"""
+    czytelnik = _Czytelnik(dane, rodzaj)
+    tabele = {nazwa: czytelnik.tabela(nazwa) for nazwa in czytelnik.naglowek["tabele"]}
+    napisy = czytelnik.napisy()
+    czytelnik.koniec()
+    return czytelnik.naglowek, czytelnik.zadania(tabele["zadania"], napisy), tabele, napisy
+
+
+def _uszkodzony_zapis(funkcja):
+    """Dekorator zamieniający wszystkie błędy odczytu uszkodzonego zapisu na ValueError"""
+    @wraps(funkcja)
+    def wrapper(dane):
+        try:
+            return funkcja(dane)
+        except (struct.error, KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"Uszkodzony zapis binarny: {e!r}") from e
+    return wrapper
+
+
+@_uszkodzony_zapis
+def wczytaj_stan(dane: bytes | memoryview) -> dict:
+    """Odczytuje zapis stanu bota, zwracając pola w postaci przyjmowanej przez StanBota.__setstate__"""
+    naglowek, zadania, _, _ = _odczytaj(dane, RODZAJ_STANU)
+    stan = naglowek["stan"]
+    return {
+        "lista_zadan": zadania,
+        "style": {u: wczytaj_styl(s) for u, s in naglowek["style"]},
+        "ostatni_zapis": datetime.fromisoformat(stan["ostatni_zapis"]),
+        "uzycia_spis": stan["uzycia_spis"],
+        "nastepne_id": stan["nastepne_id"],
+        "edytor": stan["edytor"],
+        "serwery_ze_spisem": set(stan["serwery_ze_spisem"]),
+    }
+
+
+@_uszkodzony_zapis
+def wczytaj_segment(dane: bytes | memoryview) -> tuple[datetime, tuple[list[tuple], dict[str, int]]]:
+    """Odczytuje zapis segmentu dziennika, zwracając czas zapisu i segment w postaci z Dziennik.segment"""
+    naglowek, zadania, tabele, napisy = _odczytaj(dane, RODZAJ_SEGMENTU)
+    kolumny = tabele["wpisy"]
+    wpisy = []
+    for rodzaj, id_zadania, zadanie, styl in zip(*(kolumny[nazwa] for nazwa, _ in KOLUMNY_WPISOW)):
+        rodzaj = chr(rodzaj)
+        if rodzaj == DODANIE:
+            wpisy.append((rodzaj, zadania[zadanie]))
+        elif rodzaj == EDYCJA:
+            wpisy.append((rodzaj, napisy[id_zadania], zadania[zadanie]))
+        elif rodzaj in (USUNIECIE, WYGASNIECIE):
+            wpisy.append((rodzaj, napisy[id_zadania]))
+        elif rodzaj == STYL:
+            uzytkownik, dane_stylu = naglowek["style"][styl]
+            wpisy.append((rodzaj, uzytkownik, wczytaj_styl(dane_stylu)))
+        else:  # Odtwarzanie i tak pominęłoby taki wpis
+            logger.warning(f"Nieznany rodzaj wpisu w zapisie dziennika: {rodzaj!r}")
+    segment = naglowek["segment"]
+    return datetime.fromisoformat(segment["ostatni_zapis"]), (wpisy, segment["liczniki"])
@@ -0,0 +1,117 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import asyncio
+from heapq import heappush, heappop, heapify
+from itertools import count
+from logging import getLogger
+from time import time
+from typing import Callable
+
+from .zadanie import Ogloszenie
+
+__all__ = "HarmonogramUsuwania",
+logger = getLogger(__name__)
+
+MAKS_CZAS_OCZEKIWANIA = 3600  # W sekundach, ogranicza skutki przestawienia zegara systemowego
+
+
+class HarmonogramUsuwania:
+    """Usuwa zadania i ogłoszenia po upłynięciu ich terminu przy pomocy jednego wspólnego taska.
+    Terminy przechowywane są w kopcu, a wpisy nieaktualne (po edycji lub usunięciu zadania) są pomijane
+    dopiero przy zdejmowaniu ich z kopca, dzięki czemu planowanie i zmiana terminu mają złożoność O(log n)."""
+
+    def __init__(self, usun_wygasle: Callable[[list[Ogloszenie]], None]):
+        self._usun_wygasle = usun_wygasle  # Wywoływane z listą zadań, których termin właśnie upłynął
+        self._kopiec: list[tuple[int, int, Ogloszenie]] = []
+        self._aktualne: dict[str, tuple[int, int, Ogloszenie]] = {}  # ID zadania -> aktualny wpis w kopcu
+        self._licznik = count()  # Rozstrzyga remisy w kopcu, aby nigdy nie porównywać samych zadań
+        self._obudz = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        """Zwraca ilość zaplanowanych usunięć"""
+        return len(self._aktualne)
+
+    def zaplanuj(self, zadanie: Ogloszenie):
+        """Planuje usunięcie zadania w jego terminie, zastępując poprzednio zaplanowany termin"""
+        wpis = (zadanie.termin_usuniecia_ts, next(self._licznik), zadanie)
+        self._aktualne[zadanie.id] = wpis
+        heappush(self._kopiec, wpis)
+        if self._kopiec[0] is wpis:  # Nowy najbliższy termin - task musi skrócić oczekiwanie
+            self._obudz.set()
+        if len(self._kopiec) > 2 * len(self._aktualne) + 64:
+            self._usun_nieaktualne()
+
+    def zaplanuj_wiele(self, zadania):
+        """Planuje usunięcie wielu zadań naraz, np. po wczytaniu stanu, budując kopiec w czasie O(n)"""
+        for zadanie in zadania:
+            wpis = (zadanie.termin_usuniecia_ts, next(self._licznik), zadanie)
+            self._aktualne[zadanie.id] = wpis
+            self._kopiec.append(wpis)
+        heapify(self._kopiec)
+        self._obudz.set()
+
+    def odwolaj(self, zadanie: Ogloszenie):
+        """Odwołuje zaplanowane usunięcie zadania, wpis w kopcu zostanie pominięty przy zdejmowaniu"""
+        self._aktualne.pop(zadanie.id, None)
+
+    def _usun_nieaktualne(self):
+        """Odbudowuje kopiec z samych aktualnych wpisów, aby nie rósł bez końca przy częstych edycjach"""
+        self._kopiec = list(self._aktualne.values())
+        heapify(self._kopiec)
+
+    def uruchom(self):
+        """Startuje task usuwający zadania, wymaga działającej pętli zdarzeń"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._petla(), name="HarmonogramUsuwania")
+
+    def zatrzymaj(self):
+        """Zatrzymuje task usuwający zadania"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _petla(self):
+        """Czeka na najbliższy termin i usuwa naraz wszystkie zadania, których termin upłynął"""
+        while True:
+            self._obudz.clear()
+            teraz = time()
+            wygasle = []
+            while self._kopiec and self._kopiec[0][0] <= teraz:
+                wpis = heappop(self._kopiec)
+                if self._aktualne.get(wpis[2].id) is wpis:
+                    del self._aktualne[wpis[2].id]
+                    wygasle.append(wpis[2])
+            if wygasle:
+                try:
+                    self._usun_wygasle(wygasle)
+                except Exception as e:  # Task nie może przestać działać z powodu jednego błędu
+                    logger.exception("Nie udało się usunąć zadań po terminie!", exc_info=e)
+
+            czas = MAKS_CZAS_OCZEKIWANIA
+            if self._kopiec:
+                czas = min(czas, self._kopiec[0][0] - teraz)
+            try:
+                await asyncio.wait_for(self._obudz.wait(), czas)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,157 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import csv
+import re
+from datetime import datetime, timezone
+from io import BytesIO, TextIOWrapper
+from logging import getLogger
+from typing import Iterable, Iterator, NamedTuple
+
+__all__ = "WierszImportu", "FORMATY_IMPORTU", "wiersze_importu"
+logger = getLogger(__name__)
+
+KOLUMNY_CSV = "przedmiot", "termin", "opis"  # Domyślna kolejność kolumn, gdy plik CSV nie ma nagłówka
+ESCAPE_ICS_REGEX = re.compile(r"\\(.)")  # Sekwencje ucieczki w tekstach iCalendar, np. \, lub \n
+
+
+class WierszImportu(NamedTuple):
+    """Surowe dane jednego zadania z importowanego pliku, brakujące pola mają wartość None"""
+
+    numer: int  # Numer wiersza (CSV) lub wydarzenia (iCalendar), do raportowania błędów
+    przedmiot: str | None
+    termin: str | None  # Termin w formacie rozumianym przez PolskiDateParser
+    opis: str | None
+
+
+def _wiersze_csv(linie: Iterable[str]) -> Iterator[WierszImportu]:
+    """Generuje zadania z pliku CSV z kolumnami przedmiot, termin i opis (w tej kolejności, jeśli brak nagłówka).
+    Separatorem może być przecinek, średnik lub tabulator."""
+    linie = iter(linie)
+    pierwsza = next(linie, "")
+    try:
+        dialekt = csv.Sniffer().sniff(pierwsza, delimiters=",;\t")
+    except csv.Error:  # Np. plik z jedną kolumną - błędy zostaną zgłoszone przy poszczególnych wierszach
+        dialekt = csv.excel
+    czytnik = csv.reader(_z_pierwsza(pierwsza, linie), dialekt)
+
+    if (wiersz := next(czytnik, None)) is None:
+        return
+    naglowek = [k.strip().lower() for k in wiersz]
+    if all(k in naglowek for k in KOLUMNY_CSV):
+        kolumny = tuple(naglowek)
+    else:
+        kolumny = KOLUMNY_CSV
+        if any(wiersz):
+            yield _wiersz_csv(czytnik.line_num, kolumny, wiersz)
+    for wiersz in czytnik:
+        if any(wiersz):  # Puste wiersze są pomijane
+            yield _wiersz_csv(czytnik.line_num, kolumny, wiersz)
+
+
+def _z_pierwsza(pierwsza: str, linie: Iterator[str]) -> Iterator[str]:
+    """Przywraca linię odczytaną w celu rozpoznania separatora na początek pliku"""
+    yield pierwsza
+    yield from linie
+
+
+def _wiersz_csv(numer: int, kolumny: tuple[str, ...], wiersz: list[str]) -> WierszImportu:
+    """Zamienia wiersz CSV na WierszImportu według podanych nazw kolumn"""
+    pola = {k: v.strip() or None for k, v in zip(kolumny, wiersz)}
+    return WierszImportu(numer, pola.get("przedmiot"), pola.get("termin"), pola.get("opis"))
+
+
+def _rozwin_linie_ics(linie: Iterable[str]) -> Iterator[str]:
+    """Łączy linie iCalendar zawinięte zgodnie z RFC 5545 (kontynuacja zaczyna się od spacji lub tabulatora)"""
+    poprzednia = None
+    for linia in linie:
+        linia = linia.rstrip("\r\n")
+        if linia[:1] in (" ", "\t") and poprzednia is not None:
+            poprzednia += linia[1:]
+            continue
+        if poprzednia is not None:
+            yield poprzednia
+        poprzednia = linia
+    if poprzednia is not None:
+        yield poprzednia
+
+
+def _odescapuj_ics(tekst: str) -> str:
+    """Zamienia sekwencje ucieczki z wartości tekstowych iCalendar na zwykłe znaki"""
+    return ESCAPE_ICS_REGEX.sub(lambda m: " " if m[1] in "nN" else m[1], tekst)
+
+
+def _termin_ics(wartosc: str, parametry: str) -> str | None:
+    """Zamienia wartość DTSTART lub DUE na tekst zrozumiały dla PolskiDateParser.
+    Czas w UTC (z przyrostkiem Z) zamieniany jest na czas lokalny, strefy TZID są ignorowane."""
+    try:
+        if "VALUE=DATE" in parametry.upper() or len(wartosc) == 8:
+            return datetime.strptime(wartosc, "%Y%m%d").strftime("%d.%m.%Y")
+        if wartosc.endswith("Z"):
+            data = datetime.strptime(wartosc, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).astimezone()
+        else:
+            data = datetime.strptime(wartosc, "%Y%m%dT%H%M%S")
+        return data.strftime("%d.%m.%Y %H:%M")
+    except ValueError:
+        return None
+
+
+def _wiersze_ics(linie: Iterable[str]) -> Iterator[WierszImportu]:
+    """Generuje zadania z wydarzeń (VEVENT) i zadań (VTODO) pliku iCalendar.
+    Przedmiotem jest pierwsza kategoria (CATEGORIES), opisem - SUMMARY, a terminem - DUE lub DTSTART."""
+    numer = 0
+    wydarzenie: dict[str, str] | None = None
+    for linia in _rozwin_linie_ics(linie):
+        nazwa, _, wartosc = linia.partition(":")
+        nazwa, _, parametry = nazwa.partition(";")
+        nazwa = nazwa.upper()
+        if nazwa == "BEGIN" and wartosc.upper() in ("VEVENT", "VTODO"):
+            numer += 1
+            wydarzenie = {}
+        elif wydarzenie is None:
+            continue
+        elif nazwa == "END" and wartosc.upper() in ("VEVENT", "VTODO"):
+            yield WierszImportu(numer, wydarzenie.get("przedmiot"), wydarzenie.get("termin"), wydarzenie.get("opis"))
+            wydarzenie = None
+        elif nazwa == "CATEGORIES":
+            wydarzenie["przedmiot"] = _odescapuj_ics(wartosc.split(",")[0]).strip() or None
+        elif nazwa == "SUMMARY":
+            wydarzenie["opis"] = _odescapuj_ics(wartosc).strip() or None
+        elif nazwa == "DUE" or (nazwa == "DTSTART" and "termin" not in wydarzenie):
+            wydarzenie["termin"] = _termin_ics(wartosc.strip(), parametry)
+
+
+FORMATY_IMPORTU = {  # Rozszerzenie pliku -> funkcja generująca wiersze z jego kolejnych linii
+    ".csv": _wiersze_csv,
+    ".ics": _wiersze_ics,
+}
+
+
+def wiersze_importu(nazwa_pliku: str, dane: bytes) -> Iterator[WierszImportu]:
+    """Generuje kolejne zadania z importowanego pliku, dekodując go leniwie linia po linii.
+    Rzuca ValueError, jeśli format pliku (rozpoznawany po rozszerzeniu) nie jest obsługiwany."""
+    for rozszerzenie, funkcja in FORMATY_IMPORTU.items():
+        if nazwa_pliku.lower().endswith(rozszerzenie):
+            logger.debug(f"Importowanie pliku {nazwa_pliku!r} ({len(dane)} B) jako {rozszerzenie}")
+            # utf-8-sig pomija BOM dodawany przez Excela, newline="" jest wymagane przez moduł csv
+            return funkcja(TextIOWrapper(BytesIO(dane), encoding="utf-8-sig", newline=""))
+    raise ValueError(f"Nieobsługiwany format pliku: {nazwa_pliku!r}")
@@ -0,0 +1,146 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import json
+import os
+from bisect import bisect_right, insort
+from logging import getLogger
+from operator import itemgetter
+from pathlib import Path
+from typing import AsyncIterable, NamedTuple
+
+__all__ = "KatalogKopii", "WpisKatalogu", "PLIK_KATALOGU"
+logger = getLogger(__name__)
+
+PLIK_KATALOGU = "katalog_kopii.jsonl"  # Nazwa pliku katalogu w katalogu lokalnych migawek
+
+
+class WpisKatalogu(NamedTuple):
+    """Zapis jednego spisu na kanale, sortowany według czasu zapisu, a przy równym czasie - według wiadomości"""
+    znacznik_czasu: int  # Czas zapisu z nazwy pliku, w sekundach od epoki
+    wiadomosc: int  # ID wiadomości z plikiem zapisu lub manifestem zapisu podzielonego na części
+    punkt_kontrolny: bool  # True - pełny stan spisu, False - segment dziennika zmian
+
+
+class KatalogKopii:
+    """Indeks zapisów spisów na kanale, pozwalający odnaleźć zapis z dowolnej chwili bez przeglądania historii.
+    Dla każdego spisu przechowuje osobno posortowane listy punktów kontrolnych i segmentów dziennika.
+    Katalog budowany jest leniwie (przy pierwszym użyciu) z historii kanału, a następnie uzupełniany przy każdym
+    zapisie. Jeśli podano ścieżkę, katalog jest również zapisywany w pliku JSON Lines - istnienie pliku oznacza,
+    że zawiera on wszystkie zapisy z kanału."""
+
+    def __init__(self, sciezka: str | os.PathLike | None = None):
+        self.sciezka = Path(sciezka) if sciezka is not None else None
+        # Spis -> posortowane wpisy, None - katalog nie został jeszcze zbudowany ani wczytany
+        self._punkty: dict[int | None, list[WpisKatalogu]] | None = None
+        self._segmenty: dict[int | None, list[WpisKatalogu]] | None = None
+        self._w_trakcie_budowy: list[tuple[int | None, WpisKatalogu]] | None = None  # Zapisy dodane w trakcie budowy
+
+    @property
+    def zbudowany(self) -> bool:
+        """Zwraca True, jeśli katalog jest gotowy do wyszukiwania"""
+        return self._punkty is not None
+
+    def __len__(self) -> int:
+        """Zwraca ilość wszystkich zapisów w katalogu"""
+        if not self.zbudowany:
+            return 0
+        return sum(map(len, self._punkty.values())) + sum(map(len, self._segmenty.values()))
+
+    def _ustaw(self, wpisy: list[tuple[int | None, WpisKatalogu]]):
+        """Zastępuje zawartość katalogu podanymi wpisami"""
+        self._punkty, self._segmenty = {}, {}
+        for serwer, wpis in wpisy:
+            (self._punkty if wpis.punkt_kontrolny else self._segmenty).setdefault(serwer, []).append(wpis)
+        for lista in (*self._punkty.values(), *self._segmenty.values()):
+            lista.sort()
+
+    def wczytaj(self) -> bool:
+        """Wczytuje katalog z pliku, zwraca False, jeśli plik nie istnieje lub jest uszkodzony (wtedy katalog
+        należy zbudować od nowa). Wykonuje blokujące operacje na plikach."""
+        if self.sciezka is None or not self.sciezka.exists():
+            return False
+        try:
+            with open(self.sciezka, encoding="utf-8") as plik:
+                wpisy = [(serwer, WpisKatalogu(*wpis)) for serwer, *wpis in map(json.loads, plik)]
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Nie udało się wczytać katalogu zapisów z {self.sciezka}, zostanie zbudowany od nowa",
+                           exc_info=e)
+            return False
+        self._ustaw(wpisy)
+        logger.debug(f"Wczytano katalog zapisów z {self.sciezka} (zapisy: {len(wpisy)})")
+        return True
+
+    async def zbuduj(self, wpisy: AsyncIterable[tuple[int | None, WpisKatalogu]]):
+        """Buduje katalog od nowa z podanych wpisów (np. odczytanych z historii kanału) i zapisuje go do pliku.
+        Zapisy dodane w trakcie budowy również trafiają do katalogu."""
+        self._w_trakcie_budowy = []
+        try:
+            zebrane = [wpis async for wpis in wpisy]
+            znane = {wpis.wiadomosc for _, wpis in zebrane}
+            zebrane.extend(w for w in self._w_trakcie_budowy if w[1].wiadomosc not in znane)
+        finally:
+            self._w_trakcie_budowy = None
+        self._ustaw(zebrane)
+        logger.info(f"Zbudowano katalog zapisów (zapisy: {len(zebrane)})")
+        if self.sciezka is not None:
+            try:
+                self._zapisz_plik(zebrane)
+            except OSError as e:
+                logger.exception(f"Nie udało się zapisać katalogu zapisów do {self.sciezka}!", exc_info=e)
+
+    def _zapisz_plik(self, wpisy: list[tuple[int | None, WpisKatalogu]]):
+        """Atomowo zastępuje plik katalogu podanymi wpisami"""
+        self.sciezka.parent.mkdir(parents=True, exist_ok=True)
+        tymczasowy = self.sciezka.with_suffix(".tmp")
+        with open(tymczasowy, "w", encoding="utf-8") as plik:
+            plik.writelines(json.dumps([serwer, *wpis]) + "\n" for serwer, wpis in wpisy)
+            plik.flush()
+            os.fsync(plik.fileno())
+        os.replace(tymczasowy, self.sciezka)
+
+    def dodaj(self, serwer: int | None, wpis: WpisKatalogu):
+        """Dodaje nowy zapis do katalogu i dopisuje go do pliku katalogu, jeśli ten istnieje"""
+        if self._w_trakcie_budowy is not None:
+            self._w_trakcie_budowy.append((serwer, wpis))
+        if self.zbudowany:
+            insort((self._punkty if wpis.punkt_kontrolny else self._segmenty).setdefault(serwer, []), wpis)
+        if self.sciezka is not None and self.sciezka.exists():
+            try:
+                with open(self.sciezka, "a", encoding="utf-8") as plik:
+                    plik.write(json.dumps([serwer, *wpis]) + "\n")
+            except OSError as e:  # Niekompletny plik zostanie zbudowany od nowa przy następnym użyciu
+                logger.exception(f"Nie udało się dopisać zapisu do katalogu {self.sciezka}!", exc_info=e)
+                self.sciezka.unlink(missing_ok=True)
+
+    def znajdz(self, serwer: int | None, znacznik_czasu: int) \
+            -> tuple[WpisKatalogu, list[WpisKatalogu]] | None:
+        """Wyszukuje binarnie ostatni punkt kontrolny spisu zapisany nie później niż w podanej chwili oraz
+        późniejsze segmenty dziennika do tej chwili (od najstarszego). Zwraca None, jeśli brak takiego punktu."""
+        punkty = self._punkty.get(serwer, [])
+        if (i := bisect_right(punkty, znacznik_czasu, key=itemgetter(0))) == 0:
+            return None
+        punkt = punkty[i - 1]
+        segmenty = self._segmenty.get(serwer, [])
+        od = bisect_right(segmenty, punkt[:2], key=itemgetter(0, 1))
+        do = bisect_right(segmenty, znacznik_czasu, key=itemgetter(0))
+        return punkt, segmenty[od:do]
@@ -20,11 +20,13 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
+from datetime import datetime
 from logging import getLogger
 
 from discord import commands, Cog, Permissions
 
-from ..bot import SpisBot
+from ..bot import SpisBot, PROSTY_FORMAT_DATY
+from ..date_parser import *
 
 logger = getLogger(__name__)
 
@@ -39,6 +41,12 @@ class KomendyDeveloperskie(Cog):
     dev = commands.SlashCommandGroup("dev", "Komendy developerskie",
                                      default_member_permissions=Permissions(1 << 3))  # ADMINISTRATOR
 
+    async def _odswiez_komendy(self):
+        """Rejestruje komendy edytorów na serwerach aktualnego zestawu spisów, np. po wczytaniu innego stanu"""
+        if (edytor := self.bot.get_cog("KomendyDlaEdytorow")) is not None:
+            edytor.ustaw_serwery()
+            await self.bot.sync_commands()
+
     @dev.command()
     async def zapisz(self, ctx: commands.ApplicationContext):
         """Zapisuje stan bota do pliku i wysyła go do twórcy bota"""
@@ -48,11 +56,60 @@ class KomendyDeveloperskie(Cog):
 
     @dev.command()
     async def wczytaj(self, ctx: commands.ApplicationContext):
-        """Wczytuje stan bota z kanału prywatnego twórcy bota (liczy się tylko ostatnia wiadomość)"""
+        """Wczytuje stan bota z kanału prywatnego twórcy bota (ostatni pełny zapis i późniejsze zmiany)"""
 
+        await ctx.defer(ephemeral=True)  # Pobieranie zapisów i synchronizacja komend mogą trwać dłużej
         sukces = await self.bot.wczytaj()
+        if sukces:
+            await self._odswiez_komendy()  # Wczytany stan mógł mieć inne spisy serwerów
         await ctx.respond(f"Wczytanie się{'' if sukces else ' nie'} powiodło!", ephemeral=True)
 
+    @dev.command()
+    async def przywroc(
+            self,
+            ctx: commands.ApplicationContext,
+            czas: commands.Option(str, "Data i godzina, z której ma zostać przywrócony stan (np. 12.03.2023 18:00)")
+    ):
+        """Przywraca stan bota z podanej chwili, pobierając tylko potrzebne zapisy"""
+        try:
+            chwila = PolskiDateParser.parse(czas)[0]
+        except (ParserError, ValueError) as e:
+            logger.debug(f'Użytkownik {ctx.author!r} podał datę w niepoprawnym formacie: {czas!r}', exc_info=e)
+            await ctx.respond("Wystąpił błąd przy konwersji daty!", ephemeral=True)
+            return
+        if chwila > datetime.now():  # Np. data bez roku jest zawsze zamieniana na przyszłą
+            await ctx.respond(f"Podana chwila ({chwila.strftime(PROSTY_FORMAT_DATY)}) jest w przyszłości! "
+                              f"Podaj pełną datę z rokiem.", ephemeral=True)
+            return
+
+        await ctx.defer(ephemeral=True)  # Budowanie katalogu i pobieranie zapisów może trwać dłużej
+        sukces = await self.bot.przywroc(chwila)
+        if sukces:
+            await self._odswiez_komendy()  # Przywrócony stan mógł mieć inne spisy serwerów
+        logger.info(f"Użytkownik {ctx.author!r} przywrócił stan z {chwila.strftime(PROSTY_FORMAT_DATY)}: {sukces}")
+        await ctx.respond(f"Przywrócenie stanu z {chwila.strftime(PROSTY_FORMAT_DATY)} "
+                          f"się{'' if sukces else ' nie'} powiodło!", ephemeral=True)
+
+    @dev.command()
+    async def nowy_spis(
+            self,
+            ctx: commands.ApplicationContext,
+            serwer: commands.Option(str, "ID serwera, który ma otrzymać własny, osobno edytowany spis")
+    ):
+        """Tworzy osobny spis dla podanego serwera, niezależny od głównego spisu"""
+        if not serwer.isdigit():
+            await ctx.respond("Niepoprawne ID serwera!", ephemeral=True)
+            return
+        serwer = int(serwer)
+        if serwer in self.bot.stany:
+            await ctx.respond("Ten serwer ma już własny spis!", ephemeral=True)
+            return
+
+        self.bot.dodaj_spis(serwer)
+        await self._odswiez_komendy()
+        logger.info(f"Użytkownik {ctx.author!r} utworzył osobny spis dla serwera {serwer}")
+        await ctx.respond(f"Utworzono osobny spis dla serwera {serwer}!", ephemeral=True)
+
 
 def setup(bot: SpisBot):
     """Wymagane przez pycorda do ładowania rozszerzenia"""
@@ -20,14 +20,16 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
+import csv
 from datetime import datetime
 from logging import getLogger
 from typing import cast
 
-from discord import commands, Cog, utils
+from discord import commands, Cog, Attachment
 
 from ..bot import SpisBot, PROSTY_FORMAT_DATY
 from ..date_parser import *
+from ..importowanie import *
 from ..przedmiot import Przedmioty
 from ..style import DOMYSLNY_STYL
 from ..zadanie import *
@@ -35,15 +37,22 @@ from ..zadanie import *
 logger = getLogger(__name__)
 
 LIMIT_ZNAKOW = 250  # Limit znaków w ogłoszeniu/zadaniu domowym
+LIMIT_ROZMIARU_IMPORTU = 256 * 1024  # Limit rozmiaru importowanego pliku w bajtach
+LIMIT_ZADAN_IMPORTU = 500  # Limit ilości zadań w jednym imporcie
+LIMIT_ZNAKOW_BLEDOW = 1500  # Limit długości listy błędów importu w odpowiedzi
 
 
 class KomendyDlaEdytorow(Cog):
 
     def __init__(self, bot: SpisBot):
         self.bot = bot
-        if bot.stan.edytor is not None:
-            for cmd in self.__cog_commands__:
-                cmd.guild_ids = [bot.stan.edytor]
+        self.ustaw_serwery()
+
+    def ustaw_serwery(self):
+        """Ogranicza komendy do serwerów, na których można edytować spisy (wymaga ponownej synchronizacji komend)"""
+        serwery = self.bot.serwery_edytorow()
+        for cmd in self.__cog_commands__:
+            cmd.guild_ids = serwery
 
     dodaj = commands.SlashCommandGroup("dodaj", "Komendy dodające ogłoszenia i zadania")
     edytuj = commands.SlashCommandGroup("edytuj", "Komendy edytujące ogłoszenia i zadania")
@@ -81,12 +90,12 @@ class KomendyDlaEdytorow(Cog):
             return
 
         # Tworzy obiekt zadania i dodaje do spisu
-        nowe_zadanie = ZadanieDomowe(data_u, opis, (ctx.author.id, datetime.now()),
-                                     Przedmioty.lista()[przedmiot], data_p)
-        self.bot.stan.lista_zadan.add(nowe_zadanie)
+        nowe_zadanie = ZadanieDomowe(data_u, opis, ctx.author.id, datetime.now(), Przedmioty.lista()[przedmiot], data_p)
+        stan = self.bot.stan_serwera(ctx.guild_id)
+        stan.dodaj(nowe_zadanie)
         logger.info(f"Dodano nowe zadanie: {nowe_zadanie!r}")
 
-        styl = self.bot.stan.style.get(ctx.author.id, DOMYSLNY_STYL)
+        styl = stan.style.get(ctx.author.id, DOMYSLNY_STYL)
         await ctx.respond(**styl.formatuj_zadanie("Dodano nowe zadanie!", nowe_zadanie, wymus_id=True))
 
     @dodaj.command(name="ogloszenie")
@@ -117,13 +126,85 @@ class KomendyDlaEdytorow(Cog):
             return
 
         # Tworzy obiekt zadania i dodaje do spisu
-        nowe_ogloszenie = Ogloszenie(data_p, opis, (ctx.author.id, datetime.now()))
-        self.bot.stan.lista_zadan.add(nowe_ogloszenie)
+        nowe_ogloszenie = Ogloszenie(data_p, opis, ctx.author.id, datetime.now())
+        stan = self.bot.stan_serwera(ctx.guild_id)
+        stan.dodaj(nowe_ogloszenie)
         logger.info(f"Dodano nowe ogłoszenie: {nowe_ogloszenie!r}")
 
-        styl = self.bot.stan.style.get(ctx.author.id, DOMYSLNY_STYL)
+        styl = stan.style.get(ctx.author.id, DOMYSLNY_STYL)
         await ctx.respond(**styl.formatuj_ogloszenie("Dodano nowe ogłoszenie!", nowe_ogloszenie, wymus_id=True))
 
+    @dodaj.command(name="import")
+    async def dodaj_import(
+            self,
+            ctx: commands.ApplicationContext,
+            plik: commands.Option(
+                Attachment,
+                "Plik CSV (kolumny: przedmiot, termin, opis) lub iCalendar (.ics) z zadaniami domowymi"
+            )
+    ):
+        """Dodaje naraz wiele zadań z pliku CSV lub iCalendar"""
+        if plik.size > LIMIT_ROZMIARU_IMPORTU:
+            await ctx.respond(f"Za duży plik!\nLimit rozmiaru: {LIMIT_ROZMIARU_IMPORTU // 1024} KiB")
+            return
+        await ctx.defer()  # Pobieranie pliku może trwać dłużej niż czas na odpowiedź
+        try:
+            wiersze = wiersze_importu(plik.filename, await plik.read())
+        except ValueError:
+            logger.debug(f'Użytkownik {ctx.author!r} próbował zaimportować plik {plik.filename!r}')
+            await ctx.respond(f"Nieobsługiwany format pliku!\nDozwolone rozszerzenia: {', '.join(FORMATY_IMPORTU)}")
+            return
+
+        przedmioty = {nazwa.lower(): p for nazwa, p in Przedmioty.lista().items()}
+        teraz = datetime.now()
+        nowe_zadania: list[ZadanieDomowe] = []
+        bledy: list[str] = []
+        try:
+            for wiersz in wiersze:
+                if len(nowe_zadania) + len(bledy) >= LIMIT_ZADAN_IMPORTU:
+                    bledy.append(f"{wiersz.numer}: przekroczono limit {LIMIT_ZADAN_IMPORTU} zadań, pominięto resztę")
+                    break
+                if wiersz.opis is None or wiersz.termin is None or wiersz.przedmiot is None:
+                    bledy.append(f"{wiersz.numer}: brak przedmiotu, terminu lub opisu")
+                    continue
+                if (przedmiot := przedmioty.get(wiersz.przedmiot.lower())) is None:
+                    bledy.append(f"{wiersz.numer}: nieznany przedmiot {wiersz.przedmiot!r}")
+                    continue
+                if len(wiersz.opis) > LIMIT_ZNAKOW:
+                    bledy.append(f"{wiersz.numer}: za długa treść zadania (limit znaków: {LIMIT_ZNAKOW})")
+                    continue
+                try:
+                    data_p, data_u = PolskiDateParser.parse(wiersz.termin)
+                except (ParserError, ValueError):
+                    bledy.append(f"{wiersz.numer}: niepoprawny termin {wiersz.termin!r}")
+                    continue
+                if data_p < teraz:
+                    bledy.append(f"{wiersz.numer}: termin z przeszłości ({data_p.strftime(PROSTY_FORMAT_DATY)})")
+                    continue
+                nowe_zadania.append(ZadanieDomowe(data_u, wiersz.opis, ctx.author.id, teraz, przedmiot, data_p))
+        except (ValueError, csv.Error) as e:  # Np. plik w kodowaniu innym niż UTF-8
+            logger.debug(f'Użytkownik {ctx.author!r} zaimportował niepoprawny plik {plik.filename!r}', exc_info=e)
+            bledy.append(f"nie udało się odczytać dalszej części pliku ({e.__class__.__name__})")
+
+        # Wszystkie zadania dodawane są naraz, aby spis i harmonogram zostały zaktualizowane tylko raz
+        serwer = self.bot.klucz_serwera(ctx.guild_id)
+        if nowe_zadania:
+            self.bot.stany[serwer].dodaj_wiele(nowe_zadania)
+            logger.info(f"Użytkownik {ctx.author!r} zaimportował zadania z pliku {plik.filename!r}: {nowe_zadania!r}")
+
+        odpowiedz = f"Zaimportowano zadania: {len(nowe_zadania)}"
+        if bledy:
+            odpowiedz += f"\nBłędy ({len(bledy)}):"
+            for i, blad in enumerate(bledy):
+                if len(odpowiedz) + len(blad) > LIMIT_ZNAKOW_BLEDOW:
+                    odpowiedz += f"\n...oraz {len(bledy) - i} innych"
+                    break
+                odpowiedz += f"\n- {blad}"
+        await ctx.respond(odpowiedz)
+
+        if nowe_zadania and self.bot.autosave:  # Jeden zapis dla całego importu, tylko zmienionego spisu
+            await self.bot.zapisz_spis(serwer)
+
     @edytuj.command(name="zadanie")
     async def edytuj_zadanie(
             self,
@@ -142,7 +223,8 @@ class KomendyDlaEdytorow(Cog):
     ):
         """Edytuje zadanie o podanym ID"""
         id_do_edycji = id_do_edycji.lower()
-        znaleziono = utils.get(self.bot.stan.lista_zadan, id=id_do_edycji)
+        stan = self.bot.stan_serwera(ctx.guild_id)
+        znaleziono = stan.znajdz(id_do_edycji)
 
         if not znaleziono or type(znaleziono) != ZadanieDomowe:
             logger.debug(f'Użytkownik {ctx.author!r} chciał edytować nieistniejące zadanie: {id_do_edycji!r}')
@@ -150,13 +232,12 @@ class KomendyDlaEdytorow(Cog):
             return
         znaleziono = cast(ZadanieDomowe, znaleziono)
 
-        zmiany = []
+        zmiany = {}
         if opis is not None:
             if len(opis) > LIMIT_ZNAKOW:
                 await ctx.respond(f"Za długa treść zadania!\nLimit znaków: {LIMIT_ZNAKOW}")
                 return
-            zmiany.append("opis")
-        data_p, data_u = None, None
+            zmiany["tresc"] = znaleziono.popraw_linki(opis)
         if termin is not None:
             try:
                 # Konwertuje datę/godzinę podaną przez użytkownika na dwa datetime'y
@@ -166,34 +247,24 @@ class KomendyDlaEdytorow(Cog):
                                  f'{termin!r} -> {data_p.strftime(PROSTY_FORMAT_DATY)}')
                     await ctx.respond("Zadanie nie zostało zmienione, ponieważ podano datę z przeszłości!")
                     return
-                zmiany.append("termin")
+                zmiany["termin_usuniecia"] = data_u
+                zmiany["prawdziwy_termin"] = data_p
             except (ParserError, ValueError) as e:
                 logger.debug(f'Użytkownik {ctx.author!r} podał datę w niepoprawnym formacie: {termin!r}', exc_info=e)
                 await ctx.respond("Wystąpił błąd przy konwersji daty!")
                 return
         if przedmiot is not None:
-            zmiany.append("przedmiot")
+            zmiany["przedmiot"] = Przedmioty.lista()[przedmiot]
 
-        # Użycie SortedList wymusza ponowne dodanie zadania
-        self.bot.stan.lista_zadan.remove(znaleziono)
         if len(zmiany) == 0:
             logger.debug(f'Użytkownik {ctx.author!r} nic nie zmienił w zadaniu: {znaleziono!r}')
             await ctx.respond("Nic nie zostało zmienione!")
             return
-        if "opis" in zmiany:
-            znaleziono.tresc = znaleziono.popraw_linki(opis)
-        if "termin" in zmiany:
-            znaleziono.termin_usuniecia = data_u
-            znaleziono.prawdziwy_termin = data_p
-            znaleziono.task.cancel()
-            znaleziono.stworz_task()
-        if "przedmiot" in zmiany:
-            znaleziono.przedmiot = Przedmioty.lista()[przedmiot]
-        self.bot.stan.lista_zadan.add(znaleziono)
+        znaleziono = stan.edytuj(znaleziono, **zmiany)
 
         logger.info(f'Użytkownik {ctx.author!r} edytował zadanie: {znaleziono!r}')
 
-        styl = self.bot.stan.style.get(ctx.author.id, DOMYSLNY_STYL)
+        styl = stan.style.get(ctx.author.id, DOMYSLNY_STYL)
         await ctx.respond(**styl.formatuj_zadanie("Edytowano zadanie!", znaleziono))
 
     @edytuj.command(name="ogloszenie")
@@ -209,20 +280,20 @@ class KomendyDlaEdytorow(Cog):
     ):
         """Edytuje ogłoszenie o podanym ID"""
         id_do_edycji = id_do_edycji.lower()
-        znaleziono = utils.get(self.bot.stan.lista_zadan, id=id_do_edycji)
+        stan = self.bot.stan_serwera(ctx.guild_id)
+        znaleziono = stan.znajdz(id_do_edycji)
 
         if not znaleziono or type(znaleziono) == ZadanieDomowe:
             logger.debug(f'Użytkownik {ctx.author!r} chciał edytować nieistniejące ogłoszenie: {id_do_edycji!r}')
             await ctx.respond("Nie znaleziono ogłoszenia o podanym ID!")
             return
 
-        zmiany = []
+        zmiany = {}
         if opis is not None:
             if len(opis) > LIMIT_ZNAKOW:
                 await ctx.respond(f"Za długa treść ogłoszenia!\nLimit znaków: {LIMIT_ZNAKOW}")
                 return
-            zmiany.append("opis")
-        data_p = None
+            zmiany["tresc"] = znaleziono.popraw_linki(opis)
         if termin is not None:
             try:
                 # Konwertuje datę/godzinę podaną przez użytkownika na dwa datetime'y
@@ -232,29 +303,21 @@ class KomendyDlaEdytorow(Cog):
                                  f'{termin!r} -> {data_p.strftime(PROSTY_FORMAT_DATY)}')
                     await ctx.respond("Ogłoszenie nie zostało zmienione, ponieważ podano datę z przeszłości!")
                     return
-                zmiany.append("termin")
+                zmiany["termin_usuniecia"] = data_p
             except (ParserError, ValueError) as e:
                 logger.debug(f'Użytkownik {ctx.author!r} podał datę w niepoprawnym formacie: {termin!r}', exc_info=e)
                 await ctx.respond("Wystąpił błąd przy konwersji daty!")
                 return
 
-        # Użycie SortedList wymusza ponowne dodanie ogłoszenia
-        self.bot.stan.lista_zadan.remove(znaleziono)
         if len(zmiany) == 0:
             logger.debug(f'Użytkownik {ctx.author!r} nic nie zmienił w ogłoszeniu: {znaleziono!r}')
             await ctx.respond("Nic nie zostało zmienione!")
             return
-        if "opis" in zmiany:
-            znaleziono.tresc = znaleziono.popraw_linki(opis)
-        if "termin" in zmiany:
-            znaleziono.termin_usuniecia = data_p
-            znaleziono.task.cancel()
-            znaleziono.stworz_task()
-        self.bot.stan.lista_zadan.add(znaleziono)
+        znaleziono = stan.edytuj(znaleziono, **zmiany)
 
         logger.info(f'Użytkownik {ctx.author!r} edytował ogłoszenie: {znaleziono!r}')
 
-        styl = self.bot.stan.style.get(ctx.author.id, DOMYSLNY_STYL)
+        styl = stan.style.get(ctx.author.id, DOMYSLNY_STYL)
         await ctx.respond(**styl.formatuj_ogloszenie("Edytowano ogłoszenie!", znaleziono))
 
     @commands.slash_command()
@@ -265,18 +328,18 @@ class KomendyDlaEdytorow(Cog):
     ):
         """Usuwa zadanie lub ogłoszenie o podanym ID ze spisu"""
         id_do_usuniecia = id_do_usuniecia.lower()
-        znaleziono = utils.get(self.bot.stan.lista_zadan, id=id_do_usuniecia)
+        stan = self.bot.stan_serwera(ctx.guild_id)
+        znaleziono = stan.znajdz(id_do_usuniecia)
 
         if not znaleziono:
             logger.debug(f'Użytkownik {ctx.author!r} chciał usunąć nieistniejące ID: {id_do_usuniecia!r}')
             await ctx.respond("Nie znaleziono zadania/ogłoszenia o podanym ID!")
             return
 
-        znaleziono.task.cancel()
-        self.bot.stan.lista_zadan.remove(znaleziono)
+        stan.usun(znaleziono)
         logger.info(f'Użytkownik {ctx.author!r} usunął zadanie/ogłoszenie: {znaleziono!r}')
 
-        styl = self.bot.stan.style.get(ctx.author.id, DOMYSLNY_STYL)
+        styl = stan.style.get(ctx.author.id, DOMYSLNY_STYL)
         if isinstance(znaleziono, ZadanieDomowe):
             await ctx.respond(**styl.formatuj_zadanie("Usunięto zadanie!", znaleziono))
         else:  # Jeśli nie zadanie, to ogłoszenie
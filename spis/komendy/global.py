@@ -23,13 +23,48 @@
 from datetime import datetime
 from logging import getLogger
 
-from discord import commands, embeds, ui, Cog
+from discord import commands, embeds, ui, ButtonStyle, Cog, Interaction, File, HTTPException
 
-from ..bot import SpisBot
-from ..style import DOMYSLNY_STYL
+from ..bot import SpisBot, StanBota
+from ..eksport import *
+from ..style import DOMYSLNY_STYL, Styl
 
 logger = getLogger(__name__)
 
+CZAS_PRZYCISKOW_SPISU = 300  # Czas w sekundach, przez który można przełączać strony spisu
+
+
+class StronySpisu(ui.View):
+    """Przyciski pod spisem pozwalające na przełączanie jego stron"""
+
+    def __init__(self, stan: StanBota, styl: Styl):
+        super().__init__(timeout=CZAS_PRZYCISKOW_SPISU)
+        self.stan = stan
+        self.styl = styl
+        self.numer = 0
+
+    def odswiez(self) -> str:
+        """Zwraca treść aktualnej strony i aktualizuje stan przycisków"""
+        self.numer, tresc, ostatnia = self.stan.strona_spisu(self.styl, self.numer)
+        self.poprzednia.disabled = self.numer == 0
+        self.nastepna.disabled = ostatnia
+        self.licznik.label = f"Strona {self.numer + 1}"
+        return tresc
+
+    @ui.button(emoji="◀️", style=ButtonStyle.secondary)
+    async def poprzednia(self, _, interaction: Interaction):
+        self.numer = max(self.numer - 1, 0)
+        await interaction.response.edit_message(content=self.odswiez(), view=self)
+
+    @ui.button(label="Strona 1", style=ButtonStyle.secondary, disabled=True)
+    async def licznik(self, _, interaction: Interaction):
+        pass
+
+    @ui.button(emoji="▶️", style=ButtonStyle.secondary)
+    async def nastepna(self, _, interaction: Interaction):
+        self.numer += 1
+        await interaction.response.edit_message(content=self.odswiez(), view=self)
+
 
 class KomendyGlobalne(Cog):
 
@@ -49,12 +84,43 @@ class KomendyGlobalne(Cog):
     ):
         """Wyświetla aktualny stan spisu"""
         wyswietl_wszystkim = wyswietl_wszystkim == "Tak"  # Cast na bool
-        styl = self.bot.stan.style.get(ctx.author.id, DOMYSLNY_STYL)
-        await ctx.respond(**styl.formatuj_spis(self.bot.stan.lista_zadan), ephemeral=not wyswietl_wszystkim)
-
-        self.bot.stan.uzycia_spis += 1
+        stan = self.bot.stan_serwera(ctx.guild_id)
+        styl = stan.style.get(ctx.author.id, DOMYSLNY_STYL)
+        strony = StronySpisu(stan, styl)
+        tresc = strony.odswiez()
+        if strony.nastepna.disabled:  # Spis mieści się na jednej stronie, więc przyciski są zbędne
+            await ctx.respond(tresc, ephemeral=not wyswietl_wszystkim)
+        else:
+            await ctx.respond(tresc, view=strony, ephemeral=not wyswietl_wszystkim)
+
+        stan.policz_uzycie_spisu()
         logger.debug(f"Użytkownik {ctx.author!r} wyświetlił spis")
 
+    @commands.slash_command()
+    async def eksport(
+            self,
+            ctx: commands.ApplicationContext,
+            format_pliku: commands.Option(
+                str,
+                "Format pliku z wyeksportowanym spisem",
+                choices=list(FORMATY_EKSPORTU),
+                default=next(iter(FORMATY_EKSPORTU))
+            )
+    ):
+        """Wysyła cały spis jako plik do zaimportowania np. w kalendarzu"""
+        bufor, rozszerzenie = eksportuj(format_pliku, self.bot.stan_serwera(ctx.guild_id).zadania())
+        with bufor:
+            try:
+                # W Pythonie 3.10 SpooledTemporaryFile nie dziedziczy po io.IOBase, czego wymaga discord.File,
+                # dlatego przekazywany jest jego wewnętrzny plik (BytesIO lub plik tymczasowy na dysku)
+                # noinspection PyProtectedMember,PyUnresolvedReferences
+                await ctx.respond(file=File(bufor._file, f"spis{rozszerzenie}"), ephemeral=True)
+            except HTTPException as e:
+                logger.exception("Nie udało się wysłać eksportu spisu!", exc_info=e)
+                await ctx.respond("Nie udało się wysłać pliku z eksportem spisu!", ephemeral=True)
+                return
+        logger.debug(f"Użytkownik {ctx.author!r} wyeksportował spis jako {format_pliku!r}")
+
     # # Jednak nie działa to tak dobrze, jak chciałem...
     # @commands.slash_command()
     # async def s(self, ctx: commands.ApplicationContext):
@@ -82,8 +148,13 @@ class KomendyGlobalne(Cog):
         embed.add_field(name="Czas pracy", value=uptime)
         embed.add_field(name="Serwery", value=str(len(self.bot.guilds)))
 
-        embed.add_field(name="Ostatni backup", value=f"<t:{round(self.bot.stan.ostatni_zapis.timestamp())}:R>")
-        embed.add_field(name="Globalna ilość użyć `/spis`", value=str(self.bot.stan.uzycia_spis))
+        stan = self.bot.stan_serwera(ctx.guild_id)
+        embed.add_field(name="Ostatni backup", value=f"<t:{round(stan.ostatni_zapis.timestamp())}:R>")
+        if self.bot.autozapis.czas_ostatniego_zapisu is not None:
+            embed.add_field(name="Czas ostatniego autozapisu",
+                            value=f"{round(self.bot.autozapis.czas_ostatniego_zapisu * 1000)} ms")
+        embed.add_field(name="Globalna ilość użyć `/spis`",
+                        value=str(sum(s.uzycia_spis for s in self.bot.stany.values())))
 
         if self.bot.ostatni_commit:
             embed.add_field(name="Ostatnia aktualizacja", value=self.bot.ostatni_commit, inline=False)
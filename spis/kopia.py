@@ -0,0 +1,153 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import asyncio
+import hashlib
+import json
+import lzma
+import zlib
+from io import BytesIO
+from logging import getLogger
+
+import discord
+
+__all__ = "wyslij_zapis", "pobierz_zapis", "rozpoznaj_rozszerzenie", "BLEDY_KOPII"
+logger = getLogger(__name__)
+
+PROG_LZMA = 1024 * 1024  # Większe dane kompresowane są wolniejszym, lecz skuteczniejszym lzma
+# Maksymalny rozmiar jednego załącznika - większe zapisy dzielone są na części wysyłane w osobnych wiadomościach
+ROZMIAR_CZESCI = 8 * 1024 * 1024 - 64 * 1024  # Z zapasem na resztę żądania, limit Discorda dotyczy całości
+ROZSZERZENIE_ZLIB = ".zlib"
+ROZSZERZENIE_LZMA = ".xz"
+ROZSZERZENIE_MANIFESTU = ".manifest.json"  # Opisuje części podzielonego zapisu, wysyłany po wszystkich częściach
+WERSJA_MANIFESTU = 1
+# Wyjątki, które mogą wystąpić przy pobieraniu i rozpakowywaniu zapisu (oprócz błędów Discorda)
+BLEDY_KOPII = ValueError, KeyError, zlib.error, lzma.LZMAError
+
+
+def _spakuj(dane: bytes) -> tuple[str, bytes]:
+    """Kompresuje dane algorytmem dobranym do ich rozmiaru, zwraca rozszerzenie pliku i skompresowane dane"""
+    if len(dane) < PROG_LZMA:
+        return ROZSZERZENIE_ZLIB, zlib.compress(dane)
+    return ROZSZERZENIE_LZMA, lzma.compress(dane)
+
+
+def _dekompresor(nazwa: str):
+    """Zwraca obiekt rozpakowujący dane przyrostowo na podstawie rozszerzenia nazwy pliku
+    lub None, jeśli plik nie jest skompresowany (zapisy sprzed wprowadzenia kompresji)"""
+    if nazwa.endswith(ROZSZERZENIE_ZLIB):
+        return zlib.decompressobj()
+    if nazwa.endswith(ROZSZERZENIE_LZMA):
+        return lzma.LZMADecompressor()
+    return None
+
+
+def rozpoznaj_rozszerzenie(nazwa: str) -> str | None:
+    """Zwraca nazwę pliku bez rozszerzeń dodawanych przy wysyłaniu (kompresja, manifest)
+    lub None, jeśli nazwa nie ma żadnego z nich"""
+    if nazwa.endswith(ROZSZERZENIE_MANIFESTU):
+        nazwa = nazwa[:-len(ROZSZERZENIE_MANIFESTU)]
+    for rozszerzenie in (ROZSZERZENIE_ZLIB, ROZSZERZENIE_LZMA):
+        if nazwa.endswith(rozszerzenie):
+            return nazwa[:-len(rozszerzenie)]
+    return None
+
+
+async def wyslij_zapis(kanal: discord.abc.Messageable, nazwa: str, dane: bytes) -> tuple[str, int, int]:
+    """Kompresuje i wysyła zapis na kanał. Zapis większy od ROZMIAR_CZESCI (po kompresji) wysyłany jest
+    w częściach, każda w osobnej wiadomości, a na końcu wysyłany jest manifest z ID tych wiadomości
+    i sumami kontrolnymi SHA-256 - dopiero obecność manifestu oznacza kompletny zapis.
+    Zwraca nazwę wysłanego pliku (zapisu lub manifestu), rozmiar wysłanych danych i ID wiadomości z tym plikiem."""
+    rozszerzenie, spakowane = await asyncio.to_thread(_spakuj, dane)
+    nazwa += rozszerzenie
+    if len(spakowane) <= ROZMIAR_CZESCI:
+        wiadomosc = await kanal.send("", file=discord.File(BytesIO(spakowane), nazwa))
+        return nazwa, len(spakowane), wiadomosc.id
+
+    czesci = []
+    with memoryview(spakowane) as widok:
+        for numer, poczatek in enumerate(range(0, len(spakowane), ROZMIAR_CZESCI), 1):
+            czesc = widok[poczatek:poczatek + ROZMIAR_CZESCI]
+            nazwa_czesci = f"{nazwa}.{numer:03}"
+            wiadomosc = await kanal.send("", file=discord.File(BytesIO(czesc), nazwa_czesci))
+            czesci.append({
+                "wiadomosc": wiadomosc.id,
+                "nazwa": nazwa_czesci,
+                "rozmiar": len(czesc),
+                "sha256": (await asyncio.to_thread(hashlib.sha256, czesc)).hexdigest(),
+            })
+    manifest = {
+        "wersja": WERSJA_MANIFESTU,
+        "rozmiar": len(spakowane),
+        "sha256": (await asyncio.to_thread(hashlib.sha256, spakowane)).hexdigest(),
+        "czesci": czesci,
+    }
+    nazwa += ROZSZERZENIE_MANIFESTU
+    wiadomosc = await kanal.send("", file=discord.File(BytesIO(json.dumps(manifest).encode()), nazwa))
+    logger.debug(f"Wysłano zapis {nazwa} w {len(czesci)} częściach ({len(spakowane)} B)")
+    return nazwa, len(spakowane), wiadomosc.id
+
+
+def _rozpakuj_calosc(dekompresor, dane: bytes, nazwa: str) -> bytes:
+    """Rozpakowuje zapis wysłany w jednej wiadomości. Dekompresor zwraca bez błędu początek uciętego strumienia,
+    dlatego sprawdzane jest, czy strumień został zakończony."""
+    wynik = dekompresor.decompress(dane)
+    if not dekompresor.eof or dekompresor.unused_data:
+        raise ValueError(f"Zapis {nazwa} jest niekompletny lub uszkodzony")
+    return wynik
+
+
+def _rozpakuj_czesc(dekompresor, suma_calosci, czesc: bytes, opis: dict, wynik: bytearray):
+    """Sprawdza sumę kontrolną części zapisu i dopisuje jej rozpakowaną zawartość do wyniku"""
+    if len(czesc) != opis["rozmiar"] or hashlib.sha256(czesc).hexdigest() != opis["sha256"]:
+        raise ValueError(f"Część zapisu {opis['nazwa']} jest uszkodzona (niezgodna suma kontrolna)")
+    suma_calosci.update(czesc)
+    wynik += dekompresor.decompress(czesc)
+
+
+async def pobierz_zapis(kanal: discord.abc.Messageable, zalacznik: discord.Attachment) -> bytes | bytearray:
+    """Pobiera i rozpakowuje zapis wysłany przez wyslij_zapis (lub nieskompresowany zapis w starym formacie).
+    Części podzielonego zapisu pobierane są po kolei i od razu rozpakowywane, więc w pamięci znajduje się
+    jedynie jedna skompresowana część naraz oraz rozpakowany wynik."""
+    nazwa = zalacznik.filename
+    if not nazwa.endswith(ROZSZERZENIE_MANIFESTU):
+        dane = await zalacznik.read()
+        if (dekompresor := _dekompresor(nazwa)) is None:
+            return dane
+        return await asyncio.to_thread(_rozpakuj_calosc, dekompresor, dane, nazwa)
+
+    manifest = json.loads(await zalacznik.read())
+    if manifest["wersja"] != WERSJA_MANIFESTU:
+        raise ValueError(f"Nieobsługiwana wersja manifestu {nazwa}: {manifest['wersja']}")
+    if (dekompresor := _dekompresor(nazwa[:-len(ROZSZERZENIE_MANIFESTU)])) is None:
+        raise ValueError(f"Nieznana kompresja zapisu {nazwa}")
+    suma_calosci = hashlib.sha256()
+    wynik = bytearray()
+    for opis in manifest["czesci"]:
+        wiadomosc = await kanal.fetch_message(opis["wiadomosc"])
+        czesc = next((z for z in wiadomosc.attachments if z.filename == opis["nazwa"]), None)
+        if czesc is None:
+            raise ValueError(f"Brak części {opis['nazwa']} zapisu {nazwa}")
+        await asyncio.to_thread(_rozpakuj_czesc, dekompresor, suma_calosci, await czesc.read(), opis, wynik)
+    if suma_calosci.hexdigest() != manifest["sha256"] or not dekompresor.eof:
+        raise ValueError(f"Zapis {nazwa} jest niekompletny lub uszkodzony")
+    return wynik
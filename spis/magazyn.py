@@ -0,0 +1,116 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import mmap
+import os
+import struct
+import zlib
+from logging import getLogger
+from pathlib import Path
+from typing import Callable, TypeVar
+
+__all__ = "MagazynLokalny",
+logger = getLogger(__name__)
+T = TypeVar("T")
+
+MAGIA = b"SPIS"  # Początek każdego pliku migawki
+WERSJA_FORMATU = 1
+# Nagłówek migawki: magia, wersja formatu, flaga replikacji na kanał, długość danych, CRC32 danych
+NAGLOWEK = struct.Struct("<4sBB2xQI")
+POZYCJA_FLAGI_REPLIKACJI = 5  # Przesunięcie flagi w nagłówku, zmienianej w miejscu po wysłaniu zapisu na kanał
+ROZSZERZENIE_MIGAWKI = ".spis"
+
+
+class MagazynLokalny:
+    """Przechowuje na dysku najnowsze migawki stanów spisów (po jednym pliku na spis).
+    Plik zapisywany jest atomowo (plik tymczasowy, fsync i zamiana nazwy), więc po awarii zawsze zawiera
+    kompletną poprzednią albo nową migawkę. Przy wczytywaniu plik jest mapowany do pamięci i deserializowany
+    bezpośrednio z mapowania, bez kopiowania zawartości. Metody wykonują blokujące operacje na plikach,
+    więc powinny być wywoływane poza pętlą zdarzeń (np. przez asyncio.to_thread)."""
+
+    def __init__(self, katalog: str | os.PathLike):
+        self.katalog = Path(katalog)
+
+    def _sciezka(self, serwer: int | None) -> Path:
+        """Zwraca ścieżkę pliku migawki danego spisu"""
+        return self.katalog / f"spis_{'glowny' if serwer is None else serwer}{ROZSZERZENIE_MIGAWKI}"
+
+    def zapisz(self, serwer: int | None, dane: bytes):
+        """Atomowo zastępuje migawkę spisu podanymi danymi (zserializowanym stanem), jeszcze niezreplikowaną"""
+        self.katalog.mkdir(parents=True, exist_ok=True)
+        sciezka = self._sciezka(serwer)
+        tymczasowy = sciezka.with_suffix(".tmp")
+        with open(tymczasowy, "wb") as plik:
+            plik.write(NAGLOWEK.pack(MAGIA, WERSJA_FORMATU, False, len(dane), zlib.crc32(dane)))
+            plik.write(dane)
+            plik.flush()
+            os.fsync(plik.fileno())
+        os.replace(tymczasowy, sciezka)
+        if os.name == "posix":  # Utrwalenie samej zmiany nazwy, niemożliwe na Windowsie
+            katalog = os.open(self.katalog, os.O_RDONLY)
+            try:
+                os.fsync(katalog)
+            finally:
+                os.close(katalog)
+        logger.debug(f"Zapisano lokalną migawkę {sciezka} ({len(dane)} B)")
+
+    def oznacz_zreplikowana(self, serwer: int | None):
+        """Oznacza aktualną migawkę spisu jako wysłaną na kanał, zmieniając w miejscu jeden bajt nagłówka"""
+        with open(self._sciezka(serwer), "r+b") as plik:
+            plik.seek(POZYCJA_FLAGI_REPLIKACJI)
+            plik.write(b"\x01")
+            plik.flush()
+            os.fsync(plik.fileno())
+
+    def wczytaj(self, serwer: int | None, deserializuj: Callable[[memoryview], T]) -> tuple[T, bool] | None:
+        """Wczytuje migawkę spisu, zwracając stan zdeserializowany podaną funkcją (bezpośrednio z mapowania pliku,
+        funkcja nie może zachować referencji do danych) i informację, czy migawka została wysłana na kanał,
+        lub None, jeśli spis nie ma lokalnej migawki. Uszkodzony plik, również z poprawną sumą kontrolną,
+        lecz niedającymi się zdeserializować danymi, powoduje ValueError."""
+        sciezka = self._sciezka(serwer)
+        try:
+            plik = open(sciezka, "rb")
+        except FileNotFoundError:
+            return None
+        with plik:
+            rozmiar = os.fstat(plik.fileno()).st_size
+            if rozmiar < NAGLOWEK.size:
+                raise ValueError(f"Plik {sciezka} jest zbyt krótki na migawkę spisu")
+            with mmap.mmap(plik.fileno(), 0, access=mmap.ACCESS_READ) as mapowanie:
+                magia, wersja, zreplikowana, dlugosc, suma = NAGLOWEK.unpack_from(mapowanie)
+                if magia != MAGIA or wersja != WERSJA_FORMATU:
+                    raise ValueError(f"Plik {sciezka} nie jest migawką spisu w wersji {WERSJA_FORMATU}")
+                if NAGLOWEK.size + dlugosc != rozmiar:
+                    raise ValueError(f"Plik {sciezka} ma niepoprawną długość")
+                # Widoki muszą zostać zwolnione przed zamknięciem mapowania
+                with memoryview(mapowanie) as widok, widok[NAGLOWEK.size:] as dane:
+                    if zlib.crc32(dane) != suma:
+                        raise ValueError(f"Plik {sciezka} ma niepoprawną sumę kontrolną")
+                    try:
+                        stan, blad = deserializuj(dane), None
+                    except Exception as e:
+                        # Traceback wyjątku przechowuje fragmenty mapowania (np. w zmiennych lokalnych deserializacji),
+                        # więc wyjątek jest zamieniany na opis i porzucany jeszcze przed zwolnieniem widoków
+                        stan, blad = None, repr(e)
+            if blad is not None:
+                raise ValueError(f"Nie udało się odczytać migawki {sciezka}: {blad}")
+        return stan, bool(zreplikowana)
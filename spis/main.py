@@ -26,7 +26,10 @@ from sys import stdout
 
 from discord import Intents, Activity, ActivityType
 
+from .baza import BazaSQLite
 from .bot import SpisBot, PROSTY_FORMAT_DATY
+from .katalog import KatalogKopii, PLIK_KATALOGU
+from .magazyn import MagazynLokalny
 
 __all__ = "main", "bot"
 logger = logging.getLogger(__name__)
@@ -62,6 +65,18 @@ def main():
 
     bot.autosave = getenv("Spis_Autosave", "t").lower() in ("true", "t", "yes", "y", "1", "on", "prawda", "p", "tak")
     logger.debug(f"Autosave: {bot.autosave}")
+    bot.autozapis.zwloka = float(getenv("Spis_AutosaveZwloka", bot.autozapis.zwloka))
+    bot.autozapis.limit = float(getenv("Spis_AutosaveLimit", bot.autozapis.limit))
+    logger.debug(f"Autosave - zwłoka: {bot.autozapis.zwloka} s, limit: {bot.autozapis.limit} s")
+    bot.limit_segmentow = int(getenv("Spis_LimitSegmentow", bot.limit_segmentow))
+    logger.debug(f"Limit segmentów dziennika między punktami kontrolnymi: {bot.limit_segmentow}")
+    if katalog := getenv("Spis_KatalogZapisu"):
+        bot.magazyn = MagazynLokalny(katalog)
+        bot.katalog = KatalogKopii(bot.magazyn.katalog / PLIK_KATALOGU)
+    logger.debug(f"Katalog lokalnych migawek: {katalog or '<nie ustawiono>'}")
+    if baza := getenv("Spis_Baza"):
+        bot.baza = BazaSQLite(baza)
+    logger.debug(f"Baza SQLite: {baza or '<nie ustawiono>'}")
     serwer = getenv("Spis_Dev")
     if serwer:
         bot.serwer_dev = int(serwer)
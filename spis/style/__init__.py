@@ -20,6 +20,7 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 
+from .pamiec import PamiecSpisu
 from .standard import StandardowyStyl
 from .styl import Styl
 
@@ -0,0 +1,98 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
+from .opcje import *
+from .styl import Styl
+from ..przedmiot import Przedmioty
+from ..zadanie import Ogloszenie, ZadanieDomowe
+
+__all__ = "SkompilowanyStyl", "kompiluj"
+
+ROZMIAR_REJESTRU = 256  # Ilość różnych stylów, których skompilowane wersje są pamiętane
+
+
+class SkompilowanyStyl(NamedTuple):
+    """Funkcje formatujące, w których wszystkie opcje stylu zostały rozstrzygnięte w momencie kompilacji"""
+
+    zadanie: Callable[[ZadanieDomowe], str]  # Formatuje samą treść zadania
+    ogloszenie: Callable[[Ogloszenie], str]  # Formatuje treść ogłoszenia z dodatkowymi informacjami
+    data: Callable  # Formatuje nagłówek z datą
+
+
+@lru_cache(maxsize=ROZMIAR_REJESTRU)
+def kompiluj(styl: Styl) -> SkompilowanyStyl:
+    """Zamienia styl na zestaw wyspecjalizowanych funkcji formatujących.
+    Wynik jest zapamiętywany według wartości stylu, więc użytkownicy o identycznych stylach współdzielą
+    jedną skompilowaną wersję. Z tego powodu styl nie może być modyfikowany po kompilacji."""
+    styl_daty = STYLE_DATY[styl.data]
+    styl_czasu = STYLE_CZASU[styl.czas]
+    styl_emoji = STYLE_EMOJI[styl.emoji]
+
+    # Logika wyświetlania nazw i emoji przedmiotów
+    if not styl.nazwa_przedmiotu and styl.emoji == "Nie wyświetlaj":
+        def przedmiot(_: Przedmioty) -> str:
+            return "-"
+    elif styl.emoji in STYLE_LOSOWE:
+        def przedmiot(p: Przedmioty) -> str:
+            emoji = styl_emoji(p)
+            return f"**{emoji}{p.nazwa if styl.nazwa_przedmiotu else ''}{emoji if styl.nazwa_przedmiotu else ''}**:"
+    else:  # Dla każdego przedmiotu wynik jest zawsze taki sam, więc można go policzyć od razu
+        przedmioty = {}
+        for p in Przedmioty:
+            emoji = styl_emoji(p)
+            przedmioty[p] = f"**{emoji}{f'{p.nazwa}{emoji}' if styl.nazwa_przedmiotu else ''}**:"
+        przedmiot = przedmioty.__getitem__
+
+    # Tak zwane statystyki dla nerdów, w nawiasie kwadratowym
+    if styl.opracowanie == StylOpracowania.OBOK:
+        def dopisek(z: Ogloszenie) -> str:
+            return f"[ID: {z.id}, dodane przez: <@{z.autor}>]" if styl.id else f"[dodane przez: <@{z.autor}>]"
+    elif styl.opracowanie == StylOpracowania.OBOK_DATA:
+        def dopisek(z: Ogloszenie) -> str:
+            opr = f"dodane przez: <@{z.autor}> ({styl_daty(z.utworzono)[:-2]})"
+            return f"[ID: {z.id}, {opr}]" if styl.id else f"[{opr}]"
+    elif styl.id:
+        def dopisek(z: Ogloszenie) -> str:
+            return f"[ID: {z.id}]"
+    else:
+        dopisek = None
+
+    def zadanie(z: ZadanieDomowe) -> str:
+        wynik = przedmiot(z.przedmiot)
+        if dopisek is not None:
+            wynik += " " + dopisek(z)
+        termin = z.prawdziwy_termin
+        if termin.hour or termin.minute:  # Wypisywane tylko gdy czas był podany przy tworzeniu zadania
+            wynik += styl_czasu(termin)
+        return f"{wynik} {z.tresc}"
+
+    if dopisek is None:
+        def ogloszenie(o: Ogloszenie) -> str:
+            return o.tresc
+    else:
+        def ogloszenie(o: Ogloszenie) -> str:
+            return f"{dopisek(o)} {o.tresc}"
+
+    return SkompilowanyStyl(zadanie, ogloszenie, styl_daty)
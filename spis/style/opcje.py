@@ -28,7 +28,7 @@ from typing import Callable
 from ..date_parser import PolskiDateParser
 from ..przedmiot import Przedmioty
 
-__all__ = "STYLE_DATY", "STYLE_CZASU", "STYLE_EMOJI", "StylOpracowania"
+__all__ = "STYLE_DATY", "STYLE_CZASU", "STYLE_EMOJI", "STYLE_LOSOWE", "StylOpracowania"
 
 STYLE_DATY: dict[str, Callable[[datetime], str]] = {
     "Zwykły tekst (domyślny)": lambda d: f"\n{PolskiDateParser.WEEKDAYS[d.weekday()][1].capitalize()}, "
@@ -53,6 +53,8 @@ STYLE_EMOJI: dict[str, Callable[[Przedmioty], str]] = {
     "Nie wyświetlaj": lambda p: ""
 }
 
+STYLE_LOSOWE = frozenset({"Losowe"})  # Opcje, przy których wynik formatowania zmienia się przy każdym wywołaniu
+
 
 class StylOpracowania(Enum):
     NA_DOLE = "Pod spisem (domyślnie)"
@@ -0,0 +1,95 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+from collections import OrderedDict
+from datetime import date
+from logging import getLogger
+from typing import Iterator, Sequence
+
+from .styl import Styl
+from ..zadanie import Ogloszenie
+
+__all__ = "PamiecSpisu",
+logger = getLogger(__name__)
+
+ROZMIAR_PAMIECI_SPISU = 32  # Ilość różnych stylów, których wygenerowane strony spisu są pamiętane
+
+
+class PamiecSpisu:
+    """Pamięć podręczna (LRU) wygenerowanych stron spisu dla różnych stylów.
+    Strony są ważne tylko dla jednej wersji spisu i jednego dnia, ponieważ nagłówki dat zależą od date.today().
+    Dodatkowo dla każdego stylu pamiętane są fragmenty spisu (linijki zadań i nagłówki dat), ważne aż do zmiany
+    danego zadania, dzięki czemu po edycji generowane są od nowa jedynie zmienione linijki."""
+
+    def __init__(self, rozmiar: int = ROZMIAR_PAMIECI_SPISU):
+        self.rozmiar = rozmiar
+        # Styl -> (wygenerowane dotychczas strony, generator kolejnych stron)
+        self._wpisy: OrderedDict[Styl, tuple[list[tuple[str, bool]], Iterator[tuple[str, bool]]]] = OrderedDict()
+        self._fragmenty: OrderedDict[Styl, dict] = OrderedDict()
+        self._wersja: int | None = None  # Wersja spisu, dla której wygenerowano zapamiętane spisy
+        self._dzien: date | None = None
+        self.trafienia = 0
+        self.chybienia = 0
+
+    def strona(self, styl: Styl, spis: Sequence[Ogloszenie], wersja: int, numer: int) -> tuple[int, str, bool]:
+        """Zwraca numer, treść i informację, czy jest to ostatnia strona, dla strony spisu o podanym numerze (od 0).
+        Strony generowane są leniwie - tylko do żądanej strony włącznie i tylko wtedy, gdy nie ma ich w pamięci.
+        Numer większy od numeru ostatniej strony zwraca ostatnią stronę."""
+        if not styl.deterministyczny:  # Np. losowe emoji muszą być losowane przy każdym wyświetleniu
+            return self._przewin([], styl.strony_spisu(spis), numer)
+
+        dzien = date.today()
+        if dzien != self._dzien:  # Północ unieważnia całą pamięć
+            self._fragmenty.clear()
+        if wersja != self._wersja or dzien != self._dzien:  # Zmiana w spisie unieważnia jedynie całe spisy
+            self._wpisy.clear()
+            self._wersja, self._dzien = wersja, dzien
+
+        if (wpis := self._wpisy.get(styl)) is not None:
+            self._wpisy.move_to_end(styl)
+            self.trafienia += 1
+        else:
+            if (fragmenty := self._fragmenty.get(styl)) is None:
+                fragmenty = self._fragmenty[styl] = {}
+                if len(self._fragmenty) > self.rozmiar:
+                    self._fragmenty.popitem(last=False)
+            else:
+                self._fragmenty.move_to_end(styl)
+            wpis = self._wpisy[styl] = [], styl.strony_spisu(spis, fragmenty)
+            if len(self._wpisy) > self.rozmiar:
+                self._wpisy.popitem(last=False)
+            self.chybienia += 1
+        logger.debug(f"Pamięć spisu: {self.trafienia} trafień, {self.chybienia} chybień")
+        return self._przewin(*wpis, numer)
+
+    @staticmethod
+    def _przewin(strony: list, generator: Iterator[tuple[str, bool]], numer: int) -> tuple[int, str, bool]:
+        """Generuje brakujące strony aż do strony o podanym numerze, dopisując je do listy wygenerowanych stron"""
+        while len(strony) <= numer and not (strony and strony[-1][1]):
+            strony.append(next(generator))
+        numer = min(numer, len(strony) - 1)
+        return numer, *strony[numer]
+
+    def uniewaznij(self, zadanie: Ogloszenie):
+        """Usuwa z pamięci fragmenty dotyczące zadania, musi być wywołane przy każdej jego zmianie lub usunięciu"""
+        for fragmenty in self._fragmenty.values():
+            fragmenty.pop(zadanie.id, None)
@@ -21,117 +21,97 @@
 #  SOFTWARE.
 
 import datetime
+from dataclasses import replace
 from logging import getLogger
-from typing import Any
-
-from sortedcontainers import SortedList
+from typing import Any, Iterator, Sequence
 
+from .kompilator import kompiluj
 from .opcje import *
 from .styl import *
 from ..zadanie import Ogloszenie, ZadanieDomowe
 
 logger = getLogger(__name__)
 
-ZNACZNIK_UCIECIA_TEKSTU = "\n```\n...```"  # Symbolizuje osiągnięcie limitu 2000 znaków przy wyświetlaniu spisu
+LIMIT_ZNAKOW_STRONY = 2000  # Limit znaków w jednej wiadomości na Discordzie
 
 
 class StandardowyStyl(Styl):
     """Styl wyświetlania jako zwykły tekst z Markdownem"""
 
-    def opracowanie_przy_zadaniu(self, zadanie: Ogloszenie) -> str | None:
-        """Zwraca opracowanie wyświetlane przy zadaniu/ogłoszeniu, jeśli użytkownik ma je włączone"""
-        if self.opracowanie == StylOpracowania.OBOK:
-            return f"dodane przez: <@{zadanie.utworzono[0]}>"
-        if self.opracowanie == StylOpracowania.OBOK_DATA:
-            return f"dodane przez: <@{zadanie.utworzono[0]}> ({STYLE_DATY[self.data](zadanie.utworzono[1])[:-2]})"
-        return None
-
     def formatuj_tresc_zadania(self, zadanie: ZadanieDomowe) -> str:
         """Formatuje samą treść zadania"""
-        if self.nazwa_przedmiotu or self.emoji != "Nie wyświetlaj":  # Logika wyświetlania nazw i emoji przedmiotów
-            emoji = STYLE_EMOJI[self.emoji](zadanie.przedmiot)
-            wynik = f"**{emoji}{f'{zadanie.przedmiot.nazwa}{emoji}' if self.nazwa_przedmiotu else ''}**:"
-        else:
-            wynik = "-"
-        opr = self.opracowanie_przy_zadaniu(zadanie)
-        if self.id and opr:  # Tak zwane statystyki dla nerdów
-            wynik += f" [ID: {zadanie.id}, {opr}]"
-        elif self.id:
-            wynik += f" [ID: {zadanie.id}]"
-        elif opr:
-            wynik += f" [{opr}]"
-        # Wypisywane tylko gdy czas był podany przy tworzeniu zadania
-        if not (zadanie.prawdziwy_termin.hour == 0 and zadanie.prawdziwy_termin.minute == 0):
-            wynik += STYLE_CZASU[self.czas](zadanie.prawdziwy_termin)
-        return f"{wynik} {zadanie.tresc}"
+        return kompiluj(self).zadanie(zadanie)
 
     def formatuj_tresc_ogloszenia(self, ogloszenie: Ogloszenie) -> str:
         """Formatuje treść ogłoszenia, aby uzwględnić dodatkowe informacje"""
-        opr = self.opracowanie_przy_zadaniu(ogloszenie)
-        if self.id and opr:  # Tak zwane statystyki dla nerdów
-            wynik = f"[ID: {ogloszenie.id}, {opr}] "
-        elif self.id:
-            wynik = f"[ID: {ogloszenie.id}] "
-        elif opr:
-            wynik = f"[{opr}] "
-        else:
-            wynik = ""
-        return wynik + ogloszenie.tresc
+        return kompiluj(self).ogloszenie(ogloszenie)
 
-    def formatuj_spis(self, spis: SortedList[Ogloszenie]) -> dict[str, Any]:
-        if len(spis) == 0:
-            return {"content": "Spis jest aktualnie pusty!"}
-        wynik = ""
+    def _fragment(self, z: Ogloszenie, fragmenty: dict) -> tuple[datetime.date | None, str]:
+        """Zwraca datę (tylko dla zadań) i sformatowaną linijkę spisu dla danego zadania lub ogłoszenia,
+        korzystając z pamięci fragmentów, jeśli linijka była już wcześniej wygenerowana"""
+        if (fragment := fragmenty.get(z.id)) is None:
+            if type(z) == ZadanieDomowe:
+                fragment = z.prawdziwy_termin.date(), kompiluj(self).zadanie(z) + "\n"
+            else:
+                fragment = None, kompiluj(self).ogloszenie(z) + "\n"
+            fragmenty[z.id] = fragment
+        return fragment
+
+    def _naglowek_daty(self, z: ZadanieDomowe, fragmenty: dict) -> str:
+        """Zwraca nagłówek z datą wypisywany przed pierwszym zadaniem danego dnia"""
+        klucz = ("data", z.prawdziwy_termin_ts)  # Niektóre style dat zależą od dokładnej godziny, a nie tylko dnia
+        if (naglowek := fragmenty.get(klucz)) is None:
+            naglowek = fragmenty[klucz] = kompiluj(self).data(z.prawdziwy_termin)
+        return naglowek
+
+    def _czesci_spisu(self, spis: Sequence[Ogloszenie], fragmenty: dict) -> Iterator[tuple[str, str]]:
+        """Zwraca po kolei niepodzielne części spisu wraz z nagłówkiem, który należy powtórzyć,
+        jeśli dana część znajdzie się na początku nowej strony"""
         dzien = datetime.date.today() - datetime.timedelta(days=1)  # Do wypisywania dat w odpowiednich miejscach
-        ogloszenia = False  # Czy w trakcie układania wyniku zaczęto już zapisywać ogłoszenia (zawsze po zadaniach)?
-        problem_z_dlugoscia = False  # True, gdy w pewnym momencie układania spisu osiągnięto limit 2000 znaków
+        ogloszenia = False  # Czy zaczęto już wypisywać ogłoszenia (zawsze po zadaniach)?
+        naglowek = ""  # Nagłówek, pod którym znajduje się aktualna część
         for z in spis:
+            data_zadania, linijka = self._fragment(z, fragmenty)
             if type(z) != ZadanieDomowe and not ogloszenia:  # Nagłówek ma być wypisany tylko raz
                 ogloszenia = True
-                wynik += "\nOgłoszenia:\n"
-            if ogloszenia:  # Jeśli aktualny element spisu (i każdy kolejny) jest ogłoszeniem
-                wynik += self.formatuj_tresc_ogloszenia(z) + "\n"
+                naglowek = "\nOgłoszenia:\n"
+                yield naglowek + linijka, ""
+            elif not ogloszenia and data_zadania > dzien:  # Dopisywanie dat
+                naglowek = self._naglowek_daty(z, fragmenty)
+                dzien = data_zadania
+                yield naglowek + linijka, ""
             else:
-                zadanie = self.formatuj_tresc_zadania(z) + "\n"
-                if (data_zadania := z.prawdziwy_termin.date()) > dzien:  # Dopisywanie dat
-                    zadanie = STYLE_DATY[self.data](z.prawdziwy_termin) + zadanie
-                    dzien = data_zadania
-                wynik += zadanie
-            if len(wynik) >= 2000:  # Ucięcie pętli, aby nie marnować czasu, gdy osiągnięto już i tak limit
-                break
+                yield linijka, naglowek
         if self.opracowanie == StylOpracowania.NA_DOLE:  # Dodanie opracowania z wszystkimi twórcami aktualnych zadań
-            opracowanie = "\nOpracowanie spisu:\n"
-            opracowanie += ", ".join({f"<@{z.utworzono[0]}>" for z in spis})  # Set comprehension
-            if len(wynik) + len(opracowanie) < 2000:  # Znowu limity Discorda
-                wynik += opracowanie
-            else:
-                problem_z_dlugoscia = True
-        while len(wynik) >= (2000 - len(ZNACZNIK_UCIECIA_TEKSTU)):  # Dopóki nie zmieścimy zadań i znacznika ucięcia
-            problem_z_dlugoscia = True
-            wynik = wynik[:wynik.rfind("\n")]  # Ucinany wynik do momentu ostatniego wystąpienia nowej linijki
-        if problem_z_dlugoscia:
-            logger.debug("Przekroczono limit długości wyświetlania spisu!")
-            wynik += ZNACZNIK_UCIECIA_TEKSTU
-        return {"content": wynik}
+            naglowek = "\nOpracowanie spisu:\n"
+            autorzy = list({z.autor for z in spis})  # Set comprehension
+            for i, autor in enumerate(autorzy):
+                # Przecinek kończy poprzednią część, aby nowa strona nie zaczynała się od separatora
+                yield f"{naglowek if i == 0 else ''}<@{autor}>{', ' if i < len(autorzy) - 1 else ''}", naglowek
+
+    def strony_spisu(self, spis: Sequence[Ogloszenie], fragmenty: dict | None = None) -> Iterator[tuple[str, bool]]:
+        if len(spis) == 0:
+            yield "Spis jest aktualnie pusty!", True
+            return
+        if fragmenty is None:  # Brak pamięci fragmentów - wszystkie linijki zostaną wygenerowane od nowa
+            fragmenty = {}
+        strona = []  # Części aktualnej strony, łączone dopiero przy jej zwracaniu
+        dlugosc = 0
+        for czesc, naglowek in self._czesci_spisu(spis, fragmenty):
+            if dlugosc + len(czesc) > LIMIT_ZNAKOW_STRONY and strona:
+                yield "".join(strona), False
+                strona = [naglowek.lstrip("\n")] if naglowek else []  # Przypomnienie nagłówka na nowej stronie
+                dlugosc = len(strona[0]) if strona else 0
+            strona.append(czesc)
+            dlugosc += len(czesc)
+        yield "".join(strona), True
 
     def formatuj_zadanie(self, naglowek: str, zadanie: ZadanieDomowe, *, wymus_id: bool = False) -> dict[str, Any]:
-        if wymus_id:
-            poprzednie_ustawienie_id = self.id
-            self.id = True
-            tresc = self.formatuj_tresc_zadania(zadanie)
-            self.id = poprzednie_ustawienie_id
-        else:
-            tresc = self.formatuj_tresc_zadania(zadanie)
+        skompilowany = kompiluj(replace(self, id=True) if wymus_id else self)
         return {"content": f"{naglowek}\n"
-                           f"{STYLE_DATY[self.data](zadanie.prawdziwy_termin)}"
-                           f"{tresc}"}
+                           f"{skompilowany.data(zadanie.prawdziwy_termin)}"
+                           f"{skompilowany.zadanie(zadanie)}"}
 
     def formatuj_ogloszenie(self, naglowek: str, ogloszenie: Ogloszenie, *, wymus_id: bool = False) -> dict[str, Any]:
-        if wymus_id:
-            poprzednie_ustawienie_id = self.id
-            self.id = True
-            tresc = self.formatuj_tresc_ogloszenia(ogloszenie)
-            self.id = poprzednie_ustawienie_id
-        else:
-            tresc = self.formatuj_tresc_ogloszenia(ogloszenie)
-        return {"content": f"{naglowek}\n\n{tresc}"}
+        skompilowany = kompiluj(replace(self, id=True) if wymus_id else self)
+        return {"content": f"{naglowek}\n\n{skompilowany.ogloszenie(ogloszenie)}"}
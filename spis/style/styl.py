@@ -22,9 +22,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any
-
-from sortedcontainers import SortedList
+from typing import Any, Iterator, Sequence
 
 from .opcje import *
 from ..zadanie import *
@@ -47,8 +45,16 @@ class Styl(ABC):
     emoji: str = next(iter(STYLE_EMOJI))  # Sposób wyświetlania emoji przy przedmiocie
     opracowanie: StylOpracowania = StylOpracowania.NA_DOLE  # Sposób wyświetlania opracowania
 
+    @property
+    def deterministyczny(self) -> bool:
+        """Zwraca True, jeśli formatowanie tym stylem zawsze daje ten sam wynik (np. brak losowych emoji)"""
+        return self.data not in STYLE_LOSOWE and self.czas not in STYLE_LOSOWE and self.emoji not in STYLE_LOSOWE
+
     @abstractmethod
-    def formatuj_spis(self, spis: SortedList[Ogloszenie]) -> dict[str, Any]:
+    def strony_spisu(self, spis: Sequence[Ogloszenie], fragmenty: dict | None = None) -> Iterator[tuple[str, bool]]:
+        """Generuje kolejne strony spisu mieszczące się w jednej wiadomości, razem z informacją, czy jest to
+        ostatnia strona. Słownik fragmenty, jeśli podany, służy do zapamiętywania wygenerowanych linijek
+        pomiędzy wywołaniami - wpisy z kluczem równym ID zadania muszą zostać usunięte przy jego zmianie."""
         pass
 
     @abstractmethod
@@ -21,32 +21,55 @@
 #  SOFTWARE.
 
 import re
-from dataclasses import dataclass, field
 from datetime import datetime
 from functools import total_ordering
 from logging import getLogger
 
-from discord.ext import tasks
-
 from .przedmiot import Przedmioty
 
-__all__ = "Ogloszenie", "ZadanieDomowe"
+__all__ = "Ogloszenie", "ZadanieDomowe", "klucz_zadania"
 logger = getLogger(__name__)
 
 # Regex do znajdowania wszystkich linków w treści zadania
 LINK_REGEX = re.compile(r"(https?://[a-zA-Z0-9-._~:/?#\[\]@!$&'()*+,;=%]*[a-zA-Z0-9-_~:/?#\[\]@!$&'()*+;=%])")
 
+_AUTORZY: dict[int, int] = {}  # Internowane ID autorów zadań
+
 
 @total_ordering
-@dataclass(eq=False, unsafe_hash=True)
 class Ogloszenie:
-    """Reprezentuje ogłoszenie wyświetlające się pod spisem"""
+    """Reprezentuje ogłoszenie wyświetlające się pod spisem.
+    Daty przechowywane są jako znaczniki czasu (int), a dostęp do nich jako datetime zapewniają właściwości."""
+
+    __slots__ = "termin_usuniecia_ts", "tresc", "autor", "utworzono_ts", "id", "klucz"
+
+    RANGA = 1  # Pierwszy element klucza sortowania - ogłoszenia mają znajdować się na końcu spisu
+
+    def __init__(self, termin_usuniecia: datetime, tresc: str, autor: int, utworzono: datetime):
+        self.termin_usuniecia = termin_usuniecia
+        self.tresc = self.popraw_linki(tresc)
+        self.autor = _AUTORZY.setdefault(autor, autor)  # Wszystkie zadania autora współdzielą jeden obiekt int
+        self.utworzono = utworzono
+        self.id = ""  # Nadawane przez StanBota przy dodaniu do spisu
+        self.odswiez_klucz()
 
-    termin_usuniecia: datetime
-    tresc: str
-    utworzono: tuple[int, datetime]  # Zawiera ID autora i datę utworzenia
-    id: str = field(init=False, hash=False)
-    task: tasks.Loop | None = field(init=False, hash=False, repr=False)
+    @property
+    def termin_usuniecia(self) -> datetime:
+        """Zwraca termin usunięcia ogłoszenia"""
+        return datetime.fromtimestamp(self.termin_usuniecia_ts)
+
+    @termin_usuniecia.setter
+    def termin_usuniecia(self, wartosc: datetime):
+        self.termin_usuniecia_ts = int(wartosc.timestamp())
+
+    @property
+    def utworzono(self) -> datetime:
+        """Zwraca datę utworzenia ogłoszenia"""
+        return datetime.fromtimestamp(self.utworzono_ts)
+
+    @utworzono.setter
+    def utworzono(self, wartosc: datetime):
+        self.utworzono_ts = int(wartosc.timestamp())
 
     @staticmethod
     def popraw_linki(tekst: str) -> str:
@@ -57,68 +80,91 @@ class Ogloszenie:
         logger.debug(f'Poprawianie linków: {tekst!r} na {ret!r}')
         return ret
 
-    def stworz_task(self):
-        """Tworzy task, którego celem jest usunięcie danego zadania domowego po upłynięciu jego terminu"""
-        termin = (self.termin_usuniecia - datetime.now()).total_seconds()
-        if termin <= 0:  # Data w przeszłości
-            self.task = None
-            return
-
-        # Wykonaj 2 razy, raz po utworzeniu, raz po upłynięciu czasu
-        @tasks.loop(seconds=termin, count=2)
-        async def usun_zadanie_po_terminie():
-            if self.termin_usuniecia < datetime.now():  # Upewnij się, że to już czas
-                logger.info(f'Automatycznie usunięto zadanie: {self!r}')
-                from .main import bot
-                bot.stan.lista_zadan.remove(self)
-
-        usun_zadanie_po_terminie.start()  # Wystartuj task
-        self.task = usun_zadanie_po_terminie
-
-    def _wartosci_z_dicta_bez_taska(self) -> tuple:
-        """Zwraca tuple wszystkich pól obiektu z wyłączeniem taska.
+    def _wartosci(self) -> tuple:
+        """Zwraca tuple wszystkich pól obiektu oprócz klucza sortowania.
         Używane w pickle oraz w porównywaniu obiektów"""
-        return tuple(v for k, v in self.__dict__.items() if k != "task")
+        return self.termin_usuniecia_ts, self.tresc, self.autor, self.utworzono_ts, self.id
 
-    def __post_init__(self):
-        """Inicjalizuje ID i tworzy task do usunięcia ogłoszenia"""
-        self.tresc = self.popraw_linki(self.tresc)
-        self.id = hex(abs(hash(self)))[2:]
-        self.stworz_task()
+    def odswiez_klucz(self):
+        """Oblicza klucz sortowania w spisie, musi być wywołane po każdej zmianie pól obiektu"""
+        self.klucz = (self.RANGA, self.termin_usuniecia_ts, "", self.tresc)
 
     def __eq__(self, other) -> bool:
         """Porównuje to ogłoszenie z innym obiektem"""
-        return type(self) == type(other) and self._wartosci_z_dicta_bez_taska() == other._wartosci_z_dicta_bez_taska()
+        return type(self) == type(other) and self._wartosci() == other._wartosci()
 
     def __lt__(self, other) -> bool:
         """Służy głównie do sortowania ogłoszeń lub zadań domowych"""
-        if type(self) != type(other):
-            return type(self).__name__ > type(other).__name__  # Chcę, aby ogłoszenia znajdowały się na końcu spisu
-        return self._wartosci_z_dicta_bez_taska() < other._wartosci_z_dicta_bez_taska()
+        return self.klucz < other.klucz
+
+    __hash__ = None
 
-    def __del__(self):
-        """Przy destrukcji obiektu anuluje jego task"""
-        if self.task is not None:
-            self.task.cancel()
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, termin_usuniecia={self.termin_usuniecia!r}, " \
+               f"tresc={self.tresc!r}, autor={self.autor!r}, utworzono={self.utworzono!r})"
 
     def __getstate__(self) -> tuple:
-        """Zapisuje w pickle wszystkie dane ogłoszenia oprócz taska"""
-        return self._wartosci_z_dicta_bez_taska()
+        """Zapisuje w pickle wszystkie dane ogłoszenia oprócz klucza sortowania"""
+        return self._wartosci()
 
     def __setstate__(self, state: tuple):
-        """Wczytuje stan obiektu z pickle"""
-        self.termin_usuniecia, self.tresc, self.utworzono, self.id = state
-        self.stworz_task()
+        """Wczytuje stan obiektu z pickle, również w starym formacie (z datetime i tuple utworzono)"""
+        if isinstance(state[0], datetime):
+            termin_usuniecia, self.tresc, (autor, utworzono), self.id = state
+            self.termin_usuniecia, self.utworzono = termin_usuniecia, utworzono
+        else:
+            self.termin_usuniecia_ts, self.tresc, autor, self.utworzono_ts, self.id = state
+        self.autor = _AUTORZY.setdefault(autor, autor)
+        self.odswiez_klucz()
 
 
-@dataclass(eq=False, unsafe_hash=True)
 class ZadanieDomowe(Ogloszenie):
-    """Reprezentuje zadanie domowe posiadające dodatkowo przedmiot oprócz innych atrybutów ogłoszenia"""
+    """Reprezentuje zadanie domowe posiadające dodatkowo przedmiot oprócz innych atrybutów ogłoszenia.
+    Przedmiot przechowywany jest jako referencja do członka enumeracji, która zajmuje tyle samo miejsca co int."""
+
+    __slots__ = "przedmiot", "prawdziwy_termin_ts"
+
+    RANGA = 0
+
+    def __init__(self, termin_usuniecia: datetime, tresc: str, autor: int, utworzono: datetime,
+                 przedmiot: Przedmioty, prawdziwy_termin: datetime):
+        self.przedmiot = przedmiot
+        self.prawdziwy_termin = prawdziwy_termin  # Wyświetlany termin w zadaniu, zazwyczaj różni się od usunięcia
+        super().__init__(termin_usuniecia, tresc, autor, utworzono)
+
+    @property
+    def prawdziwy_termin(self) -> datetime:
+        """Zwraca termin wyświetlany w zadaniu"""
+        return datetime.fromtimestamp(self.prawdziwy_termin_ts)
+
+    @prawdziwy_termin.setter
+    def prawdziwy_termin(self, wartosc: datetime):
+        self.prawdziwy_termin_ts = int(wartosc.timestamp())
+
+    def _wartosci(self) -> tuple:
+        """Zwraca tuple wszystkich pól obiektu oprócz klucza sortowania.
+        Używane w pickle oraz w porównywaniu obiektów"""
+        return super()._wartosci() + (self.przedmiot, self.prawdziwy_termin_ts)
+
+    def odswiez_klucz(self):
+        """Oblicza klucz sortowania w spisie, musi być wywołane po każdej zmianie pól obiektu"""
+        self.klucz = (self.RANGA, self.termin_usuniecia_ts, self.przedmiot.nazwa, self.tresc)
 
-    przedmiot: Przedmioty
-    prawdziwy_termin: datetime  # Wyświetlany termin w zadaniu, zazwyczaj różni się od termin_usuniecia
+    def __repr__(self) -> str:
+        return f"{super().__repr__()[:-1]}, przedmiot={self.przedmiot!r}, " \
+               f"prawdziwy_termin={self.prawdziwy_termin!r})"
 
     def __setstate__(self, state: tuple):
-        """Wczytuje stan obiektu z pickle"""
-        self.termin_usuniecia, self.tresc, self.utworzono, self.przedmiot, self.prawdziwy_termin, self.id = state
-        self.stworz_task()
+        """Wczytuje stan obiektu z pickle, również w starym formacie (z datetime i tuple utworzono)"""
+        if isinstance(state[0], datetime):
+            *ogloszenie, self.przedmiot, prawdziwy_termin, id_zadania = state
+            self.prawdziwy_termin = prawdziwy_termin
+            super().__setstate__((*ogloszenie, id_zadania))
+        else:
+            *ogloszenie, self.przedmiot, self.prawdziwy_termin_ts = state
+            super().__setstate__(tuple(ogloszenie))
+
+
+def klucz_zadania(zadanie: Ogloszenie) -> tuple:
+    """Zwraca zapamiętany klucz sortowania zadania, używane jako klucz SortedKeyList w spisie"""
+    return zadanie.klucz
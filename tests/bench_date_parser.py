@@ -0,0 +1,55 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""Porównuje czas parsowania typowych tekstów przez szybką ścieżkę i pełny parser z dateutil.
+Uruchomienie: python -m tests.bench_date_parser"""
+
+from timeit import repeat
+
+from spis.date_parser import PolskiDateParser
+from tests.test_date_parser import TYPOWE
+
+POWTORZENIA = 5
+WYWOLANIA = 500
+
+
+def _zmierz(funkcja) -> float:
+    """Zwraca najkrótszy czas parsowania jednego tekstu w mikrosekundach"""
+    return min(repeat(lambda: [funkcja(t) for t in TYPOWE], number=WYWOLANIA, repeat=POWTORZENIA)) \
+        / (WYWOLANIA * len(TYPOWE)) * 1e6
+
+
+def _parse_bez_pamieci(tekst: str):
+    """Pełne parsowanie przez PolskiDateParser.parse, bez trafień w pamięci wyników"""
+    PolskiDateParser._pamiec.clear()
+    return PolskiDateParser.parse(tekst)
+
+
+def main():
+    print(f"dateutil _parse: {_zmierz(PolskiDateParser._parse):.2f} µs/tekst")
+    print(f"_szybki_parse: {_zmierz(PolskiDateParser._szybki_parse):.2f} µs/tekst")
+    print(f"parse bez pamięci: {_zmierz(_parse_bez_pamieci):.2f} µs/tekst")
+    print(f"parse z pamięcią: {_zmierz(PolskiDateParser.parse):.2f} µs/tekst")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""Porównuje format binarny zapisów z pickle: czas zapisu i odczytu oraz rozmiar przed i po kompresji.
+Uruchomienie: python -m tests.bench_format_zapisu [ilości zadań, domyślnie 100 5000 100000]"""
+
+import pickle
+import random
+import sys
+import zlib
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from spis.format_zapisu import zserializuj_stan, wczytaj_stan
+from spis.przedmiot import Przedmioty
+from spis.style import DOMYSLNY_STYL
+from spis.zadanie import Ogloszenie, ZadanieDomowe
+
+POWTORZENIA = 3  # Wynikiem jest najkrótszy czas z tylu powtórzeń
+SLOWA = "str. ćw. zad. przeczytać napisać rozprawka wypracowanie lektura test kartkówka sprawdzian rozdział".split()
+
+
+def _pola_stanu(ilosc: int, losowe: random.Random) -> dict:
+    """Tworzy stan z realistycznymi zadaniami: 30 autorów, 90% zadań domowych i 10% ogłoszeń"""
+    poczatek = datetime(2030, 1, 1)
+    autorzy = [losowe.randrange(10 ** 17, 10 ** 18) for _ in range(30)]
+    zadania = []
+    for numer in range(ilosc):
+        termin = poczatek + timedelta(hours=losowe.randrange(2000))
+        tresc = " ".join(losowe.choices(SLOWA, k=losowe.randrange(3, 12))) + f" {losowe.randrange(1, 300)}"
+        if losowe.random() < 0.9:
+            zadanie = ZadanieDomowe(termin, tresc, losowe.choice(autorzy), poczatek, losowe.choice(list(Przedmioty)),
+                                    termin)
+        else:
+            zadanie = Ogloszenie(termin, tresc, losowe.choice(autorzy), poczatek)
+        zadanie.id = str(numer)
+        zadania.append(zadanie)
+    return {"lista_zadan": zadania, "style": {a: DOMYSLNY_STYL for a in autorzy}, "ostatni_zapis": poczatek,
+            "uzycia_spis": 0, "nastepne_id": ilosc, "edytor": None, "serwery_ze_spisem": set()}
+
+
+def _zmierz(funkcja):
+    """Zwraca najkrótszy czas wykonania funkcji w milisekundach i jej wynik"""
+    najlepszy = float("inf")
+    for _ in range(POWTORZENIA):
+        start = perf_counter()
+        wynik = funkcja()
+        najlepszy = min(najlepszy, perf_counter() - start)
+    return najlepszy * 1000, wynik
+
+
+def main(ilosci: list[int]):
+    losowe = random.Random(1)
+    for ilosc in ilosci:
+        pola = _pola_stanu(ilosc, losowe)
+        for nazwa, zapisz, wczytaj in (("pickle", lambda p: pickle.dumps(p, pickle.HIGHEST_PROTOCOL), pickle.loads),
+                                       ("binarny", zserializuj_stan, wczytaj_stan)):
+            czas_zapisu, dane = _zmierz(lambda: zapisz(pola))
+            czas_odczytu, wczytane = _zmierz(lambda: wczytaj(dane))
+            assert wczytane == pola
+            print(f"N={ilosc} {nazwa}: zapis {czas_zapisu:.1f} ms, odczyt {czas_odczytu:.1f} ms, "
+                  f"rozmiar {len(dane)} B (zlib {len(zlib.compress(dane))} B)")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 5000, 100000])
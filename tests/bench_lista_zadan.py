@@ -0,0 +1,123 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""Mierzy czas operacji na posortowanej liście zadań spisu: dodawania, usuwania i budowania listy przy wczytywaniu
+stanu. Porównuje obecną SortedKeyList z zapamiętanymi kluczami zadań z poprzednim rozwiązaniem - SortedList,
+w której każde porównanie wywoływało __lt__ budujące krotki pól z __dict__ obu zadań.
+Uruchomienie: python -m tests.bench_lista_zadan [ilości zadań, domyślnie 10000 100000]"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, Iterable
+
+from sortedcontainers import SortedKeyList, SortedList
+
+from spis.przedmiot import Przedmioty
+from spis.zadanie import Ogloszenie, ZadanieDomowe, klucz_zadania
+
+
+class StareOgloszenie:
+    """Ogłoszenie porównywane tak, jak przed wprowadzeniem kluczy sortowania (pola w kolejności z dataclassy)"""
+
+    def __init__(self, z: Ogloszenie):
+        self.termin_usuniecia = z.termin_usuniecia
+        self.tresc = z.tresc
+        self.utworzono = z.autor, z.utworzono
+        self.id = z.id
+
+    def _wartosci_z_dicta(self) -> tuple:
+        return tuple(self.__dict__.values())
+
+    def __eq__(self, other) -> bool:
+        return type(self) == type(other) and self._wartosci_z_dicta() == other._wartosci_z_dicta()
+
+    def __lt__(self, other) -> bool:
+        if type(self) != type(other):
+            return type(self).__name__ > type(other).__name__  # Ogłoszenia na końcu spisu
+        return self._wartosci_z_dicta() < other._wartosci_z_dicta()
+
+
+class StareZadanieDomowe(StareOgloszenie):
+    """Zadanie domowe porównywane tak, jak przed wprowadzeniem kluczy sortowania"""
+
+    def __init__(self, z: ZadanieDomowe):
+        self.termin_usuniecia = z.termin_usuniecia
+        self.tresc = z.tresc
+        self.utworzono = z.autor, z.utworzono
+        self.przedmiot = z.przedmiot
+        self.prawdziwy_termin = z.prawdziwy_termin
+        self.id = z.id
+
+
+def zadania(ilosc: int, losowe: random.Random) -> list[Ogloszenie]:
+    """Tworzy zadania (80%) i ogłoszenia (20%) o losowych terminach"""
+    teraz = datetime.now()
+    wynik = []
+    for numer in range(ilosc):
+        termin = teraz + timedelta(minutes=losowe.randrange(100000))
+        if losowe.random() < 0.8:
+            zadanie = ZadanieDomowe(termin, f"zadanie {losowe.random()}", losowe.randrange(50), teraz,
+                                    losowe.choice(list(Przedmioty)), termin)
+        else:
+            zadanie = Ogloszenie(termin, f"ogłoszenie {losowe.random()}", losowe.randrange(50), teraz)
+        zadanie.id = str(numer)
+        wynik.append(zadanie)
+    return wynik
+
+
+def zmierz(lista_zadan: list, nowa_lista: Callable[[Iterable], SortedList]) -> tuple[float, float, float]:
+    """Zwraca czasy dodania wszystkich zadań, usunięcia wszystkich zadań (oszacowany na podstawie co dziesiątego)
+    i zbudowania listy od razu ze wszystkich zadań"""
+    lista = nowa_lista(())
+    start = perf_counter()
+    for zadanie in lista_zadan:
+        lista.add(zadanie)
+    dodawanie = perf_counter() - start
+    start = perf_counter()
+    for zadanie in lista_zadan[::10]:
+        lista.remove(zadanie)
+    usuwanie = (perf_counter() - start) * 10
+    start = perf_counter()
+    nowa_lista(lista_zadan)
+    return dodawanie, usuwanie, perf_counter() - start
+
+
+def main(ilosci: list[int]):
+    losowe = random.Random(1)
+    for ilosc in ilosci:
+        lista_zadan = zadania(ilosc, losowe)
+        stare_zadania = [(StareZadanieDomowe if type(z) == ZadanieDomowe else StareOgloszenie)(z)
+                         for z in lista_zadan]
+        warianty = {
+            "przed (SortedList, __lt__)": (stare_zadania, SortedList),
+            "po (SortedKeyList, klucz)": (lista_zadan, lambda z: SortedKeyList(z, key=klucz_zadania)),
+        }
+        for nazwa, (lista, nowa_lista) in warianty.items():
+            dodawanie, usuwanie, wczytywanie = zmierz(lista, nowa_lista)
+            print(f"N={ilosc} {nazwa}: dodawanie {dodawanie:.3f} s, usuwanie (oszacowane dla wszystkich) "
+                  f"{usuwanie:.3f} s, budowanie listy {wczytywanie:.3f} s")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
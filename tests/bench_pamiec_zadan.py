@@ -0,0 +1,92 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+"""Mierzy pamięć zajmowaną przez zadania spisu przy pomocy tracemalloc, porównując obecne rekordy __slots__
+ze znacznikami czasu jako int z poprzednimi rekordami dataclass z __dict__ i polami datetime.
+Uruchomienie: python -m tests.bench_pamiec_zadan [ilość zadań, domyślnie 100000]"""
+
+import gc
+import random
+import sys
+import tracemalloc
+from typing import Callable
+
+from spis.bot import StanBota
+from spis.zadanie import Ogloszenie, ZadanieDomowe
+from tests.bench_lista_zadan import StareOgloszenie, StareZadanieDomowe, zadania
+
+
+def nowy_rekord(z: Ogloszenie) -> Ogloszenie:
+    """Tworzy kopię zadania przy pomocy konstruktora, tak jak przy dodawaniu zadania komendą"""
+    if type(z) == ZadanieDomowe:
+        kopia = ZadanieDomowe(z.termin_usuniecia, z.tresc, z.autor, z.utworzono, z.przedmiot, z.prawdziwy_termin)
+    else:
+        kopia = Ogloszenie(z.termin_usuniecia, z.tresc, z.autor, z.utworzono)
+    kopia.id = z.id
+    return kopia
+
+
+def stary_rekord(z: Ogloszenie) -> StareOgloszenie:
+    """Tworzy rekord o układzie pól poprzednich dataclass (nowe obiekty datetime i krotka utworzono)"""
+    return (StareZadanieDomowe if type(z) == ZadanieDomowe else StareOgloszenie)(z)
+
+
+def zmierz(utworz: Callable[[], object]) -> int:
+    """Zwraca liczbę bajtów zajmowanych przez obiekty utworzone przez podaną funkcję i nadal przez nią osiągalne"""
+    gc.collect()
+    tracemalloc.start()
+    wynik = utworz()
+    gc.collect()
+    zajete, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del wynik
+    return zajete
+
+
+def main(ilosc: int):
+    # Treści, ID i autorzy zadań są tworzone przed pomiarem i współdzielone przez oba rodzaje rekordów,
+    # więc nie są wliczane do ich rozmiaru
+    lista_zadan = zadania(ilosc, random.Random(1))
+    pomiary = {
+        "przed (dataclass z __dict__)": (lambda: [stary_rekord(z) for z in lista_zadan],
+                                         "obiekt z __dict__, 2-3 obiekty datetime, krotka (autor, utworzono)"),
+        "po (__slots__)": (lambda: [nowy_rekord(z) for z in lista_zadan],
+                           "obiekt ze __slots__, 2-3 znaczniki czasu int, krotka klucza sortowania"),
+    }
+    for nazwa, (utworz, opis) in pomiary.items():
+        zajete = zmierz(utworz)
+        print(f"N={ilosc} {nazwa}: {zajete / 1e6:.1f} MB, {zajete / ilosc:.0f} B na zadanie "
+              f"({opis}, wskaźnik w liście)")
+
+    def caly_stan() -> StanBota:
+        stan = StanBota()
+        stan.dodaj_wiele(zadania(ilosc, random.Random(1)))
+        stan.dziennik.wyczysc()  # Dziennik jest opróżniany przy zapisie
+        return stan
+
+    zajete = zmierz(caly_stan)
+    print(f"N={ilosc} cały stan spisu (po): {zajete / 1e6:.1f} MB, {zajete / ilosc:.0f} B na zadanie "
+          f"(rekordy wraz z treściami, ID i autorami, posortowana lista, indeks ID, harmonogram usuwania)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,79 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import asyncio
+import unittest
+
+from spis.autozapis import AutoZapis
+from spis.bot import SpisBot, StanBota
+
+
+class TestAutoZapis(unittest.IsolatedAsyncioTestCase):
+
+    async def test_seria_zmian_jednym_zapisem(self):
+        zapisane = []
+
+        async def zapisz_spis(serwer):
+            zapisane.append(serwer)
+            return True
+
+        autozapis = AutoZapis(zapisz_spis, zwloka=0.05, limit=1)
+        autozapis.uruchom()
+        try:
+            for _ in range(3):
+                autozapis.zglos_zmiane(None)
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.15)
+        finally:
+            autozapis.zatrzymaj()
+        self.assertEqual(zapisane, [None])
+
+    async def test_usuniety_spis(self):
+        """Spis usunięty przed zapisem (np. po wczytaniu innego stanu) nie jest zapisywany ponownie w nieskończoność"""
+        bot = SpisBot()
+        bot.autozapis.zwloka = 0.01
+        bot.zmien_stan(StanBota())
+        bot.autozapis.uruchom()
+        try:
+            bot.autozapis.zglos_zmiane(42)
+            self.assertIs(await bot.zapisz_spis(42), False)
+            await asyncio.sleep(0.1)
+            self.assertEqual(bot.autozapis._zmiany, {})
+        finally:
+            bot.autozapis.zatrzymaj()
+            bot.stany[None].harmonogram.zatrzymaj()
+
+    async def test_nowy_spis(self):
+        """Nowy, jeszcze pusty spis serwera musi zostać zapisany bez czekania na pierwszą zmianę w nim"""
+        bot = SpisBot()
+        bot.zmien_stan(StanBota())
+        try:
+            bot.dodaj_spis(42)
+            self.assertIn(42, bot.autozapis._zmiany)
+            self.assertIn(None, bot.autozapis._zmiany)  # Lista spisów serwerów w głównym spisie
+        finally:
+            for stan in bot.stany.values():
+                stan.harmonogram.zatrzymaj()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from spis.baza import BazaSQLite
+from spis.bot import SpisBot, StanBota
+from spis.przedmiot import Przedmioty
+from spis.style import DOMYSLNY_STYL
+from spis.zadanie import Ogloszenie, ZadanieDomowe
+
+
+def _zadania(bot: SpisBot) -> dict:
+    """Zwraca ID i treści zadań wszystkich spisów bota"""
+    return {serwer: sorted((z.id, z.tresc) for z in stan.lista_zadan) for serwer, stan in bot.stany.items()}
+
+
+class TestBazaSQLite(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        katalog = tempfile.TemporaryDirectory()
+        self.addCleanup(katalog.cleanup)
+        self.sciezka = Path(katalog.name) / "spis.db"
+        self.boty = []
+
+    async def asyncTearDown(self):
+        for bot in self.boty:
+            bot.autozapis.zatrzymaj()
+            for stan in bot.stany.values():
+                stan.harmonogram.zatrzymaj()
+            bot.baza.zamknij()
+
+    def _bot(self) -> SpisBot:
+        bot = SpisBot()
+        bot.baza = BazaSQLite(self.sciezka)
+        self.boty.append(bot)
+        return bot
+
+    async def test_zmiany_i_wczytanie(self):
+        bot = self._bot()
+        bot.zmien_stan(StanBota(edytor=1))
+        glowny = bot.stany[None]
+        termin = datetime.now() + timedelta(days=3)
+        for numer in range(4):
+            glowny.dodaj(ZadanieDomowe(termin, f"z{numer}", 7, datetime.now(), Przedmioty.WF, termin))
+        glowny.dodaj(Ogloszenie(termin, "ogłoszenie", 8, datetime.now()))
+        bot.dodaj_spis(42).dodaj(ZadanieDomowe(termin, "s42", 5, datetime.now(), Przedmioty.POLSKI, termin))
+        glowny.edytuj(glowny.znajdz("1"), tresc="edycja")
+        glowny.usun(glowny.znajdz("2"))
+        glowny.ustaw_styl(7, DOMYSLNY_STYL)
+        glowny.policz_uzycie_spisu()
+        await bot._zapis_bazy
+
+        wczytany = self._bot()
+        self.assertTrue(await wczytany.wczytaj_z_bazy())
+        self.assertEqual(_zadania(wczytany), _zadania(bot))
+        stan = wczytany.stany[None]
+        self.assertEqual((stan.uzycia_spis, stan.nastepne_id, stan.serwery_ze_spisem, stan.style),
+                         (1, 5, {42}, {7: DOMYSLNY_STYL}))
+        self.assertEqual(stan.zapisana_wersja, -1)  # Kanał może nie zawierać najnowszych zmian
+
+    async def test_zmiany_w_jednej_transakcji(self):
+        bot = self._bot()
+        bot.zmien_stan(StanBota())
+        await bot._zapis_bazy
+        termin = datetime.now() + timedelta(days=1)
+        with mock.patch.object(bot.baza, "zapisz", wraps=bot.baza.zapisz) as zapisz:
+            for numer in range(100):
+                bot.stany[None].dodaj(Ogloszenie(termin, str(numer), 1, datetime.now()))
+            await bot._zapis_bazy
+        self.assertEqual(zapisz.call_count, 1)
+
+    async def test_usuniety_spis_serwera(self):
+        bot = self._bot()
+        bot.zmien_stan(StanBota())
+        bot.dodaj_spis(42)
+        await bot._zapis_bazy
+        await bot._ustaw_stany({None: bot.stany[None]}, zreplikowane=True)
+        await bot._zapis_bazy
+        self.assertEqual(set(bot.baza.wczytaj()), {None})
+
+    async def test_zapytania(self):
+        bot = self._bot()
+        bot.zmien_stan(StanBota())
+        glowny = bot.stany[None]
+        termin = datetime.now() + timedelta(days=3)
+        glowny.dodaj(ZadanieDomowe(termin + timedelta(days=1), "wf", 7, datetime.now(), Przedmioty.WF, termin))
+        glowny.dodaj(ZadanieDomowe(termin, "polski", 8, datetime.now(), Przedmioty.POLSKI, termin))
+        glowny.dodaj(Ogloszenie(termin + timedelta(days=2), "ogłoszenie", 7, datetime.now()))
+        bot.dodaj_spis(42).dodaj(ZadanieDomowe(termin, "s42", 7, datetime.now(), Przedmioty.WF, termin))
+        await bot._zapis_bazy
+
+        self.assertEqual(bot.baza.znajdz(None, "1").tresc, "polski")
+        self.assertIsNone(bot.baza.znajdz(42, "1"))
+        self.assertEqual([z.tresc for z in bot.baza.zadania(None)], ["polski", "wf", "ogłoszenie"])
+        self.assertEqual([z.tresc for z in bot.baza.zadania(None, przedmiot=Przedmioty.WF)], ["wf"])
+        self.assertEqual([z.tresc for z in bot.baza.zadania(None, autor=7)], ["wf", "ogłoszenie"])
+        self.assertEqual([z.tresc for z in bot.baza.zadania(42)], ["s42"])
+
+    def test_plany_zapytan(self):
+        """Zapytania korzystają z klucza głównego lub odpowiednich indeksów zamiast przeszukiwania całej tabeli"""
+        baza = BazaSQLite(self.sciezka)
+        self.addCleanup(baza.zamknij)
+        plany = {
+            "SELECT id FROM zadania WHERE serwer = ? AND id = ?": "PRIMARY KEY",
+            "SELECT id FROM zadania WHERE serwer = ? ORDER BY termin_usuniecia": "zadania_serwer",
+            "SELECT id FROM zadania WHERE serwer = ? AND przedmiot = ? ORDER BY termin_usuniecia": "zadania_przedmiot",
+            "SELECT id FROM zadania WHERE serwer = ? AND autor = ? ORDER BY termin_usuniecia": "zadania_autor",
+            "DELETE FROM zadania WHERE termin_usuniecia <= ?": "zadania_termin",
+        }
+        for zapytanie, indeks in plany.items():
+            with self.subTest(zapytanie=zapytanie):
+                plan = " ".join(wiersz[-1] for wiersz in baza._polacz().execute(
+                    f"EXPLAIN QUERY PLAN {zapytanie}", (0,) * zapytanie.count("?")))
+                self.assertIn(indeks, plan)
+                self.assertNotIn("SCAN", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    async def test_pusta_baza(self):
+        self.assertFalse(await self._bot().wczytaj_z_bazy())
+
+
+if __name__ == "__main__":
+    unittest.main()
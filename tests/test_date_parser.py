@@ -0,0 +1,85 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import re
+import unittest
+from datetime import date, timedelta
+
+from spis.date_parser import PolskiDateParser, JUTRO_REGEX
+
+# Wzorcem dla szybkiej ścieżki jest dateutil z DD.MM zamienionym na DD/MM - dateutil traktuje DD.MM
+# jako liczbę zmiennoprzecinkową i gubi miesiąc, co jest jedyną zamierzoną różnicą
+DD_MM_REGEX = re.compile(r"(?<![0-9.])([0-9]{1,2})\.([0-9]{1,2})(?![0-9.])")
+GODZINY = ["8:00", "08:00", "7:45", "23:59", "0:00", "12:30", "14", "8.00", "9:05:30", "25:00", "12:61"]
+NIETYPOWE = [
+    "jutro", "Jutro", "JUTRO", "jutro 8:00", "jutro 14:30", "8:00 jutro", "  pn   8:00 ", "\tpt\t", "2026-10-20",
+    "2026-10-20 8:00", "20/10", "10/20", "abc", "", "pn wt", "8:00 pn", "ostatni", "pt 8:00 pm", "pt 8am", "1.1.1",
+    "19 października 2026", "X 19", "14 8:00", "8:00 14", "pt 8", "20.10 8:00:30", "8:00:5", "8:5:30", "0.0",
+    "00.10", "32.1", "1.13", "20.10.026", "20.10.1", "1,X", "pt,8:00", "X X", "pn pn", "8:00 9:00", "19 X 2026",
+    "2026", "  ", ",", "20.10 X", "X 20.10", "20.10 20", "99:99", "7:60", "24:00", "śr 24:00", "Śr", "ŚRODA",
+    "Październik 3", "3 PAŹ", "sb 1.1.26", "31.12.99", "1.1.00", "29.02.28", "29.02.27", "29.02", "31.04",
+]
+# Najczęściej wpisywane teksty, które muszą korzystać z szybkiej ścieżki
+TYPOWE = ["pn", "pt 8:00", "wt", "20.10.26", "śr 7:45", "15.11.26 8:00", "19 X", "XII", "8:00", "czwartek"]
+
+
+def korpus() -> list[str]:
+    """Zwraca teksty do porównania: wszystkie nazwy dni tygodnia i miesięcy, daty, godziny, ich połączenia,
+    niepoprawne wartości i formaty obsługiwane jedynie przez dateutil"""
+    dni = [d for nazwy in PolskiDateParser.WEEKDAYS for d in nazwy]
+    dni += [d.upper() for nazwy in PolskiDateParser.WEEKDAYS for d in nazwy[:2]]
+    miesiace = [m for nazwy in PolskiDateParser.MONTHS for m in nazwy]
+    teksty = dni + GODZINY + NIETYPOWE + TYPOWE
+    teksty += [f"{d} {g}" for d in dni[:12] for g in GODZINY[:6]]
+    teksty += [f"{d}.{m}" for d in (1, 5, 9, 15, 28, 29, 30, 31, 32) for m in (1, 2, 6, 10, 12, 13)]
+    teksty += [f"{d:02}.{m:02}.{r}" for d in (1, 18, 29, 31) for m in (2, 10, 12) for r in ("26", "27", "2026", "24")]
+    teksty += [f"{d} {m}" for d in (1, 18, 31) for m in miesiace]
+    teksty += [f"{d} {m} {g}" for d in (3, 19) for m in ("X", "paź", "listopada", "XII") for g in GODZINY[:4]]
+    teksty += [f"{d}.{m} {g}" for d in (3, 19) for m in (10, 11) for g in GODZINY[:5]]
+    teksty += [f"{d}{s}{g}" for d in ("pt", "20.10", "5 X") for s in (" ", ", ") for g in ("8:00", "23:15:00")]
+    return sorted(set(teksty))
+
+
+class TestSzybkaSciezka(unittest.TestCase):
+
+    def test_zgodnosc_z_dateutil(self):
+        """Szybka ścieżka musi zwracać dokładnie taki sam surowy wynik jak pełny parser z dateutil"""
+        jutro = (date.today() + timedelta(days=1)).strftime("%d.%m.%y")
+        szybkie = 0
+        for tekst in korpus():
+            tekst = JUTRO_REGEX.sub(jutro, " ".join(tekst.split()))  # Tak jak w _parse_z_pamiecia
+            if (wynik := PolskiDateParser._szybki_parse(tekst)) is None:
+                continue
+            szybkie += 1
+            with self.subTest(tekst=tekst):
+                wzor = PolskiDateParser._parse(DD_MM_REGEX.sub(r"\1/\2", tekst))[0]
+                self.assertEqual(repr(wynik), repr(wzor))
+        self.assertGreater(szybkie, 400)  # Większość korpusu to typowe formaty
+
+    def test_typowe_teksty(self):
+        for tekst in TYPOWE:
+            with self.subTest(tekst=tekst):
+                self.assertIsNotNone(PolskiDateParser._szybki_parse(tekst))
+
+
+if __name__ == "__main__":
+    unittest.main()
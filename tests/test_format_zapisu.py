@@ -0,0 +1,81 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import unittest
+from datetime import datetime, timedelta
+
+from spis.dziennik import *
+from spis.format_zapisu import *
+from spis.przedmiot import Przedmioty
+from spis.style import DOMYSLNY_STYL
+from spis.zadanie import Ogloszenie, ZadanieDomowe
+
+
+def _zadania() -> list[Ogloszenie]:
+    """Zwraca kilka zadań i ogłoszeń z ID nadanymi tak jak w spisie"""
+    termin = datetime(2030, 5, 6, 7, 8)
+    zadania = [
+        ZadanieDomowe(termin, "Zadanie ze znakami ąęłżź", 123, datetime(2030, 5, 1), Przedmioty.POLSKI, termin),
+        ZadanieDomowe(termin + timedelta(days=1), "Strona 12", 456, datetime(2030, 5, 2), Przedmioty.WF, termin),
+        Ogloszenie(termin, "Ogłoszenie https://example.com", 123, datetime(2030, 5, 3)),
+    ]
+    for numer, zadanie in enumerate(zadania):
+        zadanie.id = str(numer)
+    return zadania
+
+
+def _pola_stanu() -> dict:
+    """Zwraca pola stanu bota w postaci zwracanej przez StanBota.__getstate__"""
+    return {
+        "lista_zadan": _zadania(), "style": {123: DOMYSLNY_STYL}, "ostatni_zapis": datetime(2030, 5, 4, 1, 2, 3),
+        "uzycia_spis": 7, "nastepne_id": 3, "edytor": 99, "serwery_ze_spisem": {42},
+    }
+
+
+class TestFormatZapisu(unittest.TestCase):
+
+    def test_stan(self):
+        pola = _pola_stanu()
+        self.assertEqual(wczytaj_stan(zserializuj_stan(pola)), pola)
+
+    def test_segment(self):
+        zadania = _zadania()
+        segment = [(DODANIE, zadania[0]), (EDYCJA, "1", zadania[1]), (USUNIECIE, "2"), (WYGASNIECIE, "0"),
+                   (STYL, 123, DOMYSLNY_STYL)], {"uzycia_spis": 8}
+        ostatni_zapis = datetime(2030, 5, 4, 1, 2, 3)
+        self.assertEqual(wczytaj_segment(zserializuj_segment(ostatni_zapis, segment)), (ostatni_zapis, segment))
+
+    def test_uciety_zapis(self):
+        """Każdy ucięty zapis musi zostać odrzucony, a nie wczytany z pustymi lub uciętymi napisami"""
+        dane = zserializuj_stan(_pola_stanu())
+        for dlugosc in range(len(dane)):
+            with self.subTest(dlugosc=dlugosc), self.assertRaises(ValueError):
+                wczytaj_stan(memoryview(dane)[:dlugosc])
+
+    def test_nadmiarowe_dane(self):
+        dane = zserializuj_segment(datetime(2030, 5, 4), ([(USUNIECIE, "1")], {}))
+        with self.assertRaises(ValueError):
+            wczytaj_segment(dane + b"\0")
+
+
+if __name__ == "__main__":
+    unittest.main()
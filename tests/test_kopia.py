@@ -0,0 +1,99 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import random
+import unittest
+from itertools import count
+from unittest import mock
+
+from spis import kopia
+from spis.kopia import wyslij_zapis, pobierz_zapis, BLEDY_KOPII
+
+
+class _Zalacznik:
+    """Udaje discord.Attachment"""
+
+    def __init__(self, filename: str, dane: bytes):
+        self.filename = filename
+        self.dane = dane
+
+    async def read(self) -> bytes:
+        return self.dane
+
+
+class _Wiadomosc:
+    """Udaje discord.Message z jednym załącznikiem"""
+
+    def __init__(self, id_wiadomosci: int, zalacznik: _Zalacznik):
+        self.id = id_wiadomosci
+        self.attachments = [zalacznik]
+
+
+class _Kanal:
+    """Udaje kanał Discorda, przechowując wysłane wiadomości w pamięci"""
+
+    def __init__(self):
+        self.wiadomosci: dict[int, _Wiadomosc] = {}
+        self._id = count(1)
+
+    async def send(self, _tresc: str, file) -> _Wiadomosc:
+        wiadomosc = _Wiadomosc(next(self._id), _Zalacznik(file.filename, file.fp.read()))
+        self.wiadomosci[wiadomosc.id] = wiadomosc
+        return wiadomosc
+
+    async def fetch_message(self, id_wiadomosci: int) -> _Wiadomosc:
+        return self.wiadomosci[id_wiadomosci]
+
+
+class TestKopia(unittest.IsolatedAsyncioTestCase):
+
+    async def _wyslij(self, dane: bytes) -> tuple[_Kanal, _Zalacznik]:
+        """Wysyła zapis na nowy kanał, zwraca kanał i ostatni załącznik (zapis lub manifest)"""
+        kanal = _Kanal()
+        _, _, id_wiadomosci = await wyslij_zapis(kanal, "zapis.spis", dane)
+        return kanal, kanal.wiadomosci[id_wiadomosci].attachments[0]
+
+    async def test_zapis_w_jednej_wiadomosci(self):
+        for dane in (b"spis" * 1000, random.Random(1).randbytes(kopia.PROG_LZMA + 1)):  # zlib i lzma
+            with self.subTest(rozmiar=len(dane)):
+                kanal, zalacznik = await self._wyslij(dane)
+                self.assertEqual(await pobierz_zapis(kanal, zalacznik), dane)
+                spakowane = zalacznik.dane
+                for uszkodzone in (spakowane[:-5], spakowane[:len(spakowane) // 2], spakowane + b"\0"):
+                    zalacznik.dane = uszkodzone
+                    with self.assertRaises(BLEDY_KOPII):
+                        await pobierz_zapis(kanal, zalacznik)
+
+    async def test_zapis_w_czesciach(self):
+        dane = random.Random(2).randbytes(100_000)
+        with mock.patch.object(kopia, "ROZMIAR_CZESCI", 30_000):
+            kanal, zalacznik = await self._wyslij(dane)
+        self.assertTrue(zalacznik.filename.endswith(kopia.ROZSZERZENIE_MANIFESTU))
+        self.assertEqual(len(kanal.wiadomosci), 5)
+        self.assertEqual(await pobierz_zapis(kanal, zalacznik), dane)
+        kanal.wiadomosci[2].attachments[0].dane = b"\0" * 30_000
+        with self.assertRaises(BLEDY_KOPII):
+            await pobierz_zapis(kanal, zalacznik)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from spis import bot as modul_bota
+from spis.bot import SpisBot, StanBota
+from spis.magazyn import MagazynLokalny
+from spis.zadanie import Ogloszenie
+
+
+class TestMagazynLokalny(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        katalog = tempfile.TemporaryDirectory()
+        self.addCleanup(katalog.cleanup)
+        self.magazyn = MagazynLokalny(katalog.name)
+        stan = StanBota()
+        stan.dodaj(Ogloszenie(datetime.now() + timedelta(days=1), "ogłoszenie", 1, datetime.now()))
+        stan.harmonogram.zatrzymaj()
+        self.dane = modul_bota._zserializuj_stan(stan.migawka())
+
+    def test_zapis_i_odczyt(self):
+        self.assertIsNone(self.magazyn.wczytaj(None, modul_bota._wczytaj_stan))
+        self.magazyn.zapisz(None, self.dane)
+        stan, zreplikowana = self.magazyn.wczytaj(None, modul_bota._wczytaj_stan)
+        self.assertEqual([z.tresc for z in stan.lista_zadan], ["ogłoszenie"])
+        self.assertFalse(zreplikowana)
+        self.magazyn.oznacz_zreplikowana(None)
+        self.assertTrue(self.magazyn.wczytaj(None, modul_bota._wczytaj_stan)[1])
+
+    async def test_uszkodzone_dane_z_poprawna_suma(self):
+        """Dane z poprawnym nagłówkiem i sumą kontrolną, których nie da się zdeserializować, powodują ValueError
+        (a nie BufferError przy zamykaniu mapowania), więc bot wczytuje stan z kanału"""
+        self.magazyn.zapisz(None, self.dane[:len(self.dane) // 2])
+        with self.assertRaises(ValueError):
+            self.magazyn.wczytaj(None, modul_bota._wczytaj_stan)
+
+        bot = SpisBot()
+        bot.magazyn = self.magazyn
+        self.assertFalse(await bot.wczytaj_lokalnie())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import importlib
+import pkgutil
+import unittest
+
+import spis.komendy
+
+
+class TestRozszerzenia(unittest.TestCase):
+    """Sprawdza, czy każde rozszerzenie z komendami da się zaimportować - pycord waliduje komendy (np. długość
+    opisów) już przy definiowaniu klasy, a błąd w jednym rozszerzeniu uniemożliwia wczytanie kolejnych"""
+
+    def test_import_rozszerzen(self):
+        moduly = [m.name for m in pkgutil.iter_modules(spis.komendy.__path__, spis.komendy.__name__ + ".")]
+        self.assertTrue(moduly)
+        for nazwa in moduly:
+            with self.subTest(rozszerzenie=nazwa):
+                self.assertTrue(callable(importlib.import_module(nazwa).setup))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import re
+import unittest
+from datetime import datetime, timedelta
+
+from spis.style.standard import LIMIT_ZNAKOW_STRONY, StandardowyStyl
+from spis.zadanie import Ogloszenie
+
+
+class TestStronySpisu(unittest.TestCase):
+
+    def test_podzial_opracowania(self):
+        """Podział strony wewnątrz opracowania spisu - nowa strona zaczyna się od przypomnienia nagłówka
+        i pierwszego autora, a nie od separatora"""
+        termin = datetime.now() + timedelta(days=1)
+        autorzy = [10 ** 17 + i for i in range(200)]
+        spis = [Ogloszenie(termin, f"ogłoszenie {i}", autor, datetime.now()) for i, autor in enumerate(autorzy)]
+        strony = list(StandardowyStyl().strony_spisu(spis))
+
+        self.assertGreater(len(strony), 2)
+        self.assertEqual([ostatnia for _, ostatnia in strony], [False] * (len(strony) - 1) + [True])
+        for tresc, _ in strony:
+            self.assertLessEqual(len(tresc), LIMIT_ZNAKOW_STRONY)
+        kontynuacje = [tresc for tresc, _ in strony if tresc.startswith("Opracowanie spisu:")]
+        self.assertTrue(kontynuacje)
+        for tresc in kontynuacje:
+            self.assertRegex(tresc, r"^Opracowanie spisu:\n<@\d+>")
+        opracowanie = "".join(tresc for tresc, _ in strony).split("Opracowanie spisu:\n")
+        wzmianki = [int(autor) for czesc in opracowanie[1:] for autor in re.findall(r"<@(\d+)>", czesc)]
+        self.assertCountEqual(wzmianki, autorzy)
+        self.assertNotRegex("".join(tresc for tresc, _ in strony), r"<@\d+><@|,\s*$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#  MIT License
+#
+#  Copyright (c) 2023 Kacper Wojciuch
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from spis import bot as modul_bota
+from spis.bot import SpisBot, StanBota
+from spis.dziennik import DODANIE
+from spis.format_zapisu import zserializuj_segment
+from spis.zadanie import Ogloszenie
+
+
+def _ogloszenie(tresc: str) -> Ogloszenie:
+    return Ogloszenie(datetime.now() + timedelta(days=1), tresc, 1, datetime.now())
+
+
+class _ZawodnyMagazyn:
+    """Magazyn lokalny, którego zapis kończy się błędem, a w trakcie zapisu w spisie pojawia się nowe ogłoszenie"""
+
+    def __init__(self, petla: asyncio.AbstractEventLoop, stan: StanBota):
+        self.petla = petla
+        self.stan = stan
+
+    def zapisz(self, _serwer, _dane):
+        asyncio.run_coroutine_threadsafe(self._zmien(), self.petla).result()
+        raise OSError("Brak miejsca na dysku")
+
+    async def _zmien(self):
+        self.stan.dodaj(_ogloszenie("w trakcie"))
+
+
+class TestZapisSpisu(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.bot = SpisBot()
+        self.bot.zmien_stan(StanBota())
+        self.stan = self.bot.stany[None]
+        self.wyslane: list[bytes] = []
+
+        async def wyslij_zapis(_kanal, nazwa, dane):
+            self.wyslane.append(dane)
+            return nazwa, len(dane), len(self.wyslane)
+
+        patcher = mock.patch.object(modul_bota, "wyslij_zapis", wyslij_zapis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        self.bot.autozapis.zatrzymaj()
+        for stan in self.bot.stany.values():
+            stan.harmonogram.zatrzymaj()
+
+    async def test_migawka_sprzed_zapisu_lokalnego(self):
+        """Punkt kontrolny zawiera stan z chwili rozpoczęcia zapisu, mimo niepowodzenia zapisu lokalnego"""
+        self.bot.magazyn = _ZawodnyMagazyn(asyncio.get_running_loop(), self.stan)
+        self.stan.dodaj(_ogloszenie("przed"))
+        self.assertIs(await self.bot.zapisz_spis(None), True)
+
+        wyslany = modul_bota._wczytaj_stan(self.wyslane[0])
+        self.assertEqual([z.tresc for z in wyslany.lista_zadan], ["przed"])
+        self.assertEqual([(r, z.tresc) for r, z in self.stan.dziennik.wpisy], [(DODANIE, "w trakcie")])
+        self.assertLess(self.stan.zapisana_wersja, self.stan.wersja)
+
+    async def test_spis_serwera_dodany_w_trakcie_zapisu(self):
+        """Dodanie spisu serwera w trakcie zapisu wymusza kolejny punkt kontrolny z listą spisów serwerów"""
+        self.stan.dodaj(_ogloszenie("przed"))
+        await self.bot.zapisz_spis(None)  # Pierwszy zapis jest zawsze punktem kontrolnym
+        self.stan.dodaj(_ogloszenie("segment"))
+        zapis = asyncio.create_task(self.bot.zapisz_spis(None))
+        await asyncio.sleep(0)
+        self.bot.dodaj_spis(42)
+        self.assertIs(await zapis, True)
+        self.assertIsNone(self.stan.segmenty_dziennika)
+
+
+
+class TestOdtwarzanie(unittest.TestCase):
+
+    def test_podwojny_segment(self):
+        """Segment wysłany dwukrotnie (np. po przekroczeniu czasu odpowiedzi) jest odtwarzany tak jak jeden"""
+        stan = StanBota()
+        punkt_kontrolny = modul_bota._zserializuj_stan(stan.migawka())
+        stan.dodaj(_ogloszenie("a"))
+        stan.dodaj(_ogloszenie("b"))
+        stan.edytuj(stan.znajdz("1"), tresc="b po edycji")
+        segment = zserializuj_segment(datetime.now(), stan.dziennik.segment())
+
+        odtworzony = SpisBot._odtworz_spis(punkt_kontrolny, [segment, segment])
+        odtworzony.harmonogram.zatrzymaj()
+        self.assertEqual([z.tresc for z in odtworzony.lista_zadan], ["a", "b po edycji"])
+        self.assertEqual(sorted(odtworzony.indeks), ["0", "1"])
+        self.assertEqual(len(odtworzony.harmonogram), 2)
+
+if __name__ == "__main__":
+    unittest.main()